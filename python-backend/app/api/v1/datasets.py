@@ -1,38 +1,251 @@
 
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+import logging
+import os
+import random
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Query
+from typing import Dict, Any, List, Optional
 from services.dataset_selection import DatasetSelection
+from services.model_selection import ModelSelection
+from app.core.exceptions import FileProcessingError, JsonStoreConflict, WorkerPoolSaturated
+from app.utils.arrow_store import ensure_arrow_copy
+from app.utils.dataset_formats import PREVIEW_CELL_CHARS, truncate_cells
+from app.utils.dataset_profile import get_profile
+from app.utils.dataset_validation import run_validation
+from app.utils.file_utils import resolve_upload_path
+from app.utils.row_index import read_rows
+from app.utils.row_sample import sample_rows
+from app.utils.token_stats import run_token_stats
+from app.utils.validation import parse_column_list
+from app.utils.worker_pool import csv_pool
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/datasets", tags=["datasets"])
 
+async def _ingest_dataset(dataset: Dict[str, Any]) -> None:
+    """Convert an accepted dataset to Arrow IPC, then profile it from that copy"""
+    file_path = resolve_upload_path(dataset.get("filePath", ""))
+    if not file_path:
+        return
+    filename = os.path.basename(file_path)
+    try:
+        await csv_pool.run(ensure_arrow_copy, file_path, filename)
+    except Exception as e:
+        logger.warning(f"Could not convert dataset {dataset.get('uid')} to Arrow: {e}")
+    try:
+        await csv_pool.run(
+            get_profile, file_path, filename,
+            dataset.get("inputColumn") or "input", dataset.get("targetColumn") or "output"
+        )
+    except Exception as e:
+        logger.warning(f"Could not profile dataset {dataset.get('uid')}: {e}")
+
 @router.get("")
-async def get_datasets():
-    return DatasetSelection.load_datasets()
+async def get_datasets(raw: bool = Query(False)):
+    """Stored datasets with trimmed previews and profile stats; raw=true returns them exactly as stored"""
+    if raw:
+        return DatasetSelection.load_datasets()
+    return [
+        DatasetSelection.with_profile(DatasetSelection.trim_preview(ds))
+        for ds in DatasetSelection.load_datasets()
+    ]
 
 @router.get("/{uid}")
 async def get_dataset(uid: str):
     ds = DatasetSelection.get_dataset_by_uid(uid)
     if not ds:
         raise HTTPException(status_code=404, detail="Dataset not found")
-    return ds
+    return DatasetSelection.with_profile(DatasetSelection.trim_preview(ds))
+
+@router.get("/{uid}/profile")
+async def get_dataset_profile(uid: str, refresh: bool = Query(False)):
+    ds = DatasetSelection.get_dataset_by_uid(uid)
+    if not ds:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    file_path = resolve_upload_path(ds.get("filePath", ""))
+    if not file_path:
+        raise HTTPException(status_code=404, detail="Dataset file not found")
+    try:
+        profile = await csv_pool.run(
+            get_profile, file_path, os.path.basename(file_path),
+            ds.get("inputColumn") or "input", ds.get("targetColumn") or "output",
+            force=refresh
+        )
+    except FileProcessingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except WorkerPoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return {"uid": ds.get("uid"), **profile}
+
+@router.get("/{uid}/tokens")
+async def get_dataset_tokens(
+    uid: str,
+    tokenizer: Optional[str] = Query(None),
+    model_id: Optional[str] = Query(None),
+    refresh: bool = Query(False)
+):
+    ds = DatasetSelection.get_dataset_by_uid(uid)
+    if not ds:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    file_path = resolve_upload_path(ds.get("filePath", ""))
+    if not file_path:
+        raise HTTPException(status_code=404, detail="Dataset file not found")
+    context_lengths = ModelSelection.context_lengths()
+    if model_id:
+        if model_id not in context_lengths:
+            raise HTTPException(status_code=404, detail="Model not found")
+        context_lengths = {model_id: context_lengths[model_id]}
+    try:
+        report = await run_token_stats(
+            file_path,
+            os.path.basename(file_path),
+            ds.get("inputColumn") or "input",
+            ds.get("targetColumn") or "output",
+            tokenizer=tokenizer,
+            context_lengths=context_lengths,
+            refresh=refresh
+        )
+    except FileProcessingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except WorkerPoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return {"uid": ds.get("uid"), **report}
+
+@router.get("/{uid}/validation")
+async def validate_dataset(uid: str, columns: Optional[str] = Query(None)):
+    ds = DatasetSelection.get_dataset_by_uid(uid)
+    if not ds:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    file_path = resolve_upload_path(ds.get("filePath", ""))
+    if not file_path:
+        raise HTTPException(status_code=404, detail="Dataset file not found")
+    try:
+        return await run_validation(
+            file_path,
+            os.path.basename(file_path),
+            ds.get("inputColumn") or "input",
+            ds.get("targetColumn") or "output",
+            projection=parse_column_list(columns)
+        )
+    except FileProcessingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except WorkerPoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+@router.get("/{uid}/rows")
+async def get_dataset_rows(
+    uid: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=1000),
+    max_cell_chars: int = Query(PREVIEW_CELL_CHARS, ge=0)
+):
+    ds = DatasetSelection.get_dataset_by_uid(uid)
+    if not ds:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    file_path = resolve_upload_path(ds.get("filePath", ""))
+    if not file_path:
+        raise HTTPException(status_code=404, detail="Dataset file not found")
+    try:
+        page = await csv_pool.run(read_rows, file_path, os.path.basename(file_path), offset, limit)
+    except FileProcessingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except WorkerPoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    page["truncated_cells"] = truncate_cells(page["rows"], max_cell_chars, first_row=offset)
+    page["max_cell_chars"] = max_cell_chars
+    return {"uid": ds.get("uid"), **page}
+
+@router.get("/{uid}/sample")
+async def get_dataset_sample(
+    uid: str,
+    k: int = Query(20, ge=1, le=1000),
+    seed: Optional[int] = Query(None, ge=0),
+    max_cell_chars: int = Query(PREVIEW_CELL_CHARS, ge=0)
+):
+    ds = DatasetSelection.get_dataset_by_uid(uid)
+    if not ds:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    file_path = resolve_upload_path(ds.get("filePath", ""))
+    if not file_path:
+        raise HTTPException(status_code=404, detail="Dataset file not found")
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 32)
+    try:
+        sample = await csv_pool.run(sample_rows, file_path, os.path.basename(file_path), k, seed)
+    except FileProcessingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except WorkerPoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    truncated = []
+    for number, row in zip(sample["row_numbers"], sample["rows"]):
+        truncated.extend(truncate_cells([row], max_cell_chars, first_row=number))
+    sample["truncated_cells"] = truncated
+    sample["max_cell_chars"] = max_cell_chars
+    return {"uid": ds.get("uid"), **sample}
+
+@router.get("/{uid}/rows/{row}/cells/{column}")
+async def get_dataset_cell(uid: str, row: int, column: str):
+    ds = DatasetSelection.get_dataset_by_uid(uid)
+    if not ds:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    file_path = resolve_upload_path(ds.get("filePath", ""))
+    if not file_path:
+        raise HTTPException(status_code=404, detail="Dataset file not found")
+    if row < 0:
+        raise HTTPException(status_code=404, detail="Row not found")
+    try:
+        page = await csv_pool.run(read_rows, file_path, os.path.basename(file_path), row, 1)
+    except FileProcessingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except WorkerPoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    if not page["rows"]:
+        raise HTTPException(status_code=404, detail="Row not found")
+    if column not in page["rows"][0]:
+        raise HTTPException(status_code=404, detail="Column not found")
+    value = page["rows"][0][column]
+    return {
+        "uid": ds.get("uid"),
+        "row": row,
+        "column": column,
+        "value": value,
+        "length": len(value) if value is not None else 0
+    }
 
 @router.post("")
-async def add_dataset(dataset: Dict[str, Any]):
-    ok = DatasetSelection.add_dataset(dataset)
+async def add_dataset(dataset: Dict[str, Any], background_tasks: BackgroundTasks):
+    try:
+        ok = DatasetSelection.add_dataset(dataset)
+    except JsonStoreConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     if not ok:
         raise HTTPException(status_code=500, detail="Failed to add dataset")
+    background_tasks.add_task(_ingest_dataset, dataset)
+    return {"success": True}
+
+@router.put("")
+async def save_datasets(datasets: List[Dict[str, Any]]):
+    """Replace the whole dataset list (the Next.js datasets route saves it this way)"""
+    if not DatasetSelection.save_datasets(datasets):
+        raise HTTPException(status_code=500, detail="Failed to save datasets")
     return {"success": True}
 
 @router.put("/{uid}")
 async def update_dataset(uid: str, updates: Dict[str, Any]):
-    ok = DatasetSelection.update_dataset(uid, updates)
+    try:
+        ok = DatasetSelection.update_dataset(uid, updates)
+    except JsonStoreConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     if not ok:
         raise HTTPException(status_code=404, detail="Dataset not found or update failed")
     return {"success": True}
 
 @router.delete("/{uid}")
 async def delete_dataset(uid: str):
-    ok = DatasetSelection.delete_dataset(uid)
+    try:
+        ok = DatasetSelection.delete_dataset(uid)
+    except JsonStoreConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
     if not ok:
         raise HTTPException(status_code=404, detail="Dataset not found or delete failed")
     return {"success": True}
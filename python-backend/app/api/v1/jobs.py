@@ -51,27 +51,35 @@ async def get_past_jobs():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get past jobs: {str(e)}")
 
+@router.get("/master")
+async def get_master_jobs():
+    """jobs.json including jobs created since the journal was last compacted"""
+    try:
+        return JobConfiguration.get_all_jobs()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get jobs: {str(e)}")
+
 @router.get("/statistics")
 async def get_job_statistics():
     try:
-        current_jobs = JobConfiguration.load_json_file("current-jobs.json")
-        past_jobs = JobConfiguration.load_json_file("past-jobs.json")
-        current_list = current_jobs.get("jobs", [])
-        past_list = past_jobs.get("jobs", [])
+        current = JobConfiguration.job_status_counts("current-jobs.json")
+        past = JobConfiguration.job_status_counts("past-jobs.json")
+        current_total = sum(current.values())
+        past_total = sum(past.values())
         stats = {
-            "total": len(current_list) + len(past_list),
+            "total": current_total + past_total,
             "current": {
-                "total": len(current_list),
-                "running": len([j for j in current_list if j.get("status") == "running"]),
-                "queued": len([j for j in current_list if j.get("status") == "queued"]),
-                "created": len([j for j in current_list if j.get("status") == "created"])
+                "total": current_total,
+                "running": current.get("running", 0),
+                "queued": current.get("queued", 0),
+                "created": current.get("created", 0)
             },
             "past": {
-                "total": len(past_list),
-                "completed": len([j for j in past_list if j.get("status") == "completed"]),
-                "failed": len([j for j in past_list if j.get("status") == "failed"])
+                "total": past_total,
+                "completed": past.get("completed", 0),
+                "failed": past.get("failed", 0)
             },
-            "success_rate": f"{(len([j for j in past_list if j.get('status') == 'completed']) / len(past_list) * 100):.1f}%" if past_list else "0%",
+            "success_rate": f"{(past.get('completed', 0) / past_total * 100):.1f}%" if past_total else "0%",
             "last_updated": datetime.now().isoformat()
         }
         return stats
@@ -81,27 +89,28 @@ async def get_job_statistics():
 @router.get("/{uid}")
 async def get_job_by_uid(uid: str):
     try:
-        current_jobs = JobConfiguration.load_json_file("current-jobs.json")
-        for job in current_jobs.get("jobs", []):
-            if job.get("uid") == uid:
-                if job.get("status") == "running":
-                    try:
-                        current_idx = get_current_training_index()
-                        if training_data and current_idx < len(training_data):
-                            job["live_metrics"] = {
-                                "current_loss": training_data[current_idx].train_loss,
-                                "validation_loss": training_data[current_idx].validation_loss,
-                                "current_epoch": training_data[current_idx].epoch,
-                                "current_step": training_data[current_idx].step,
-                                "last_updated": datetime.now().isoformat()
-                            }
-                    except Exception as e:
-                        logging.warning(f"Could not add live metrics to job {uid}: {e}")
-                return job
-        past_jobs = JobConfiguration.load_json_file("past-jobs.json")
-        for job in past_jobs.get("jobs", []):
-            if job.get("uid") == uid:
-                return job
+        job = JobConfiguration.find_job("current-jobs.json", uid)
+        if job:
+            if job.get("status") == "running":
+                try:
+                    current_idx = get_current_training_index()
+                    if training_data and current_idx < len(training_data):
+                        job = {**job, "live_metrics": {
+                            "current_loss": training_data[current_idx].train_loss,
+                            "validation_loss": training_data[current_idx].validation_loss,
+                            "current_epoch": training_data[current_idx].epoch,
+                            "current_step": training_data[current_idx].step,
+                            "last_updated": datetime.now().isoformat()
+                        }}
+                except Exception as e:
+                    logging.warning(f"Could not add live metrics to job {uid}: {e}")
+            return job
+        job = JobConfiguration.find_job("past-jobs.json", uid)
+        if job:
+            return job
+        job = JobConfiguration.find_job("jobs.json", uid)
+        if job:
+            return job
         raise HTTPException(status_code=404, detail=f"Job UID not found: {uid}")
     except HTTPException:
         raise
@@ -0,0 +1,170 @@
+from fastapi import APIRouter, File, HTTPException, Header, Query, Request, UploadFile
+from typing import Dict, Any, Optional
+from pydantic import BaseModel
+from services.upload_sessions import UploadSessions, DEFAULT_CHUNK_SIZE
+from app.core.exceptions import (
+    FileProcessingError,
+    UploadSessionConflict,
+    UploadSessionNotFound,
+    ValidationError,
+    WorkerPoolSaturated,
+)
+from app.utils.csv_preview import DEFAULT_PREVIEW_ROWS, MAX_PREVIEW_ROWS
+from app.utils.dataset_formats import PREVIEW_CELL_CHARS, SUPPORTED_DATASET_EXTENSIONS, build_dataset_preview, detect_format
+from app.utils.file_utils import save_uploaded_file
+from app.utils.preview_cache import preview_cache, preview_cache_key
+from app.utils.row_count import run_dataset_preview
+from app.utils.validation import parse_column_list
+from app.utils.worker_pool import csv_pool
+
+router = APIRouter(prefix="/api/uploads", tags=["uploads"])
+
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    total_size: int
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+
+
+class UploadSessionComplete(BaseModel):
+    sha256: Optional[str] = None
+
+
+def _raise_for(e: Exception):
+    if isinstance(e, UploadSessionNotFound):
+        raise HTTPException(status_code=404, detail=str(e))
+    if isinstance(e, UploadSessionConflict):
+        raise HTTPException(status_code=409, detail=str(e))
+    if isinstance(e, (ValidationError, FileProcessingError)):
+        raise HTTPException(status_code=400, detail=str(e))
+    if isinstance(e, WorkerPoolSaturated):
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+
+@router.post("")
+async def create_upload_session(session: UploadSessionCreate):
+    try:
+        return UploadSessions.create(session.filename, session.total_size, session.chunk_size)
+    except Exception as e:
+        _raise_for(e)
+
+
+@router.post("/file")
+async def upload_file(
+    file: UploadFile = File(...),
+    preview_rows: int = Query(DEFAULT_PREVIEW_ROWS, ge=1, le=MAX_PREVIEW_ROWS)
+):
+    """Single-request upload for files small enough not to need resumable chunks"""
+    if not detect_format(file.filename):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Only {', '.join(SUPPORTED_DATASET_EXTENSIONS)} files are supported"
+        )
+    try:
+        result = await save_uploaded_file(file)
+    except Exception as e:
+        _raise_for(e)
+    stored_path = result.pop("path")
+    cache_key = preview_cache_key(result["sha256"], result["filename"], preview_rows=preview_rows, max_cell_chars=PREVIEW_CELL_CHARS, columns=None)
+    preview = preview_cache.get(cache_key)
+    if preview is None:
+        try:
+            preview = await run_dataset_preview(stored_path, result["filename"], preview_rows)
+            preview["content_hash"] = result["sha256"]
+            preview_cache.put(cache_key, preview)
+        except (FileProcessingError, WorkerPoolSaturated) as e:
+            result["preview"] = None
+            result["preview_error"] = str(e)
+            return result
+    preview = {**preview, "filename": result["filename"]}
+    if preview["statistics"]["total_rows"] is None and result["rows"] is not None:
+        # Compressed previews stop after the head; the upload pass already counted every row
+        preview["statistics"] = {**preview["statistics"], "total_rows": result["rows"]}
+    result["preview"] = preview
+    return result
+
+
+@router.get("/{session_id}")
+async def get_upload_session(session_id: str):
+    try:
+        return UploadSessions.get(session_id)
+    except Exception as e:
+        _raise_for(e)
+
+
+@router.put("/{session_id}/chunks/{index}")
+async def upload_chunk(
+    session_id: str,
+    index: int,
+    request: Request,
+    x_chunk_sha256: Optional[str] = Header(None)
+):
+    try:
+        return await UploadSessions.write_chunk(session_id, index, request.stream(), x_chunk_sha256)
+    except Exception as e:
+        _raise_for(e)
+
+
+@router.get("/{session_id}/preview")
+async def preview_upload(
+    session_id: str,
+    preview_rows: int = Query(DEFAULT_PREVIEW_ROWS, ge=1, le=MAX_PREVIEW_ROWS),
+    max_cell_chars: int = Query(PREVIEW_CELL_CHARS, ge=0),
+    columns: Optional[str] = Query(None, description="Comma-separated columns to return")
+) -> Dict[str, Any]:
+    """Preview the contiguous prefix received so far; available once chunk 0 has landed"""
+    try:
+        session = UploadSessions.get(session_id)
+        available = session["contiguous_bytes"]
+        if not available:
+            raise HTTPException(status_code=409, detail="No data available yet, upload chunk 0 first")
+        preview = await csv_pool.run(
+            build_dataset_preview, UploadSessions.data_path(session_id), session["filename"], preview_rows, available,
+            max_cell_chars=max_cell_chars, columns=parse_column_list(columns)
+        )
+        preview["is_partial"] = available < session["total_size"]
+        preview["statistics"]["file_size_kb"] = round(session["total_size"] / 1024, 2)
+        preview["statistics"]["received_bytes"] = session["received_bytes"]
+        return preview
+    except HTTPException:
+        raise
+    except Exception as e:
+        _raise_for(e)
+
+
+@router.post("/{session_id}/complete")
+async def complete_upload(
+    session_id: str,
+    body: Optional[UploadSessionComplete] = None,
+    preview_rows: int = Query(DEFAULT_PREVIEW_ROWS, ge=1, le=MAX_PREVIEW_ROWS),
+    max_cell_chars: int = Query(PREVIEW_CELL_CHARS, ge=0),
+    columns: Optional[str] = Query(None, description="Comma-separated columns to return")
+):
+    try:
+        result = await UploadSessions.complete(session_id, body.sha256 if body else None)
+    except Exception as e:
+        _raise_for(e)
+    # The file is stored at this point; a preview failure is reported, not raised
+    stored_path = result.pop("path")
+    projection = parse_column_list(columns)
+    try:
+        preview = await run_dataset_preview(stored_path, result["filename"], preview_rows, max_cell_chars, projection)
+        preview["content_hash"] = result["sha256"]
+        preview_cache.put(
+            preview_cache_key(result["sha256"], result["filename"], preview_rows=preview_rows, max_cell_chars=max_cell_chars, columns=projection),
+            preview
+        )
+        result["preview"] = preview
+    except (FileProcessingError, WorkerPoolSaturated) as e:
+        result["preview"] = None
+        result["preview_error"] = str(e)
+    return result
+
+
+@router.delete("/{session_id}")
+async def abort_upload(session_id: str):
+    try:
+        return {"success": UploadSessions.abort(session_id)}
+    except Exception as e:
+        _raise_for(e)
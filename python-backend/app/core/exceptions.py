@@ -16,6 +16,14 @@ class JobNotFound(FTDPException):
     """Raised when a job is not found"""
     pass
 
+class UploadSessionNotFound(FTDPException):
+    """Raised when a chunked upload session is not found"""
+    pass
+
+class UploadSessionConflict(FTDPException):
+    """Raised when a chunked upload session is being completed, or no longer accepts chunks"""
+    pass
+
 class ValidationError(FTDPException):
     """Raised when validation fails"""
     pass
@@ -32,6 +40,14 @@ class TrainingError(FTDPException):
     """Raised when training operation fails"""
     pass
 
+class WorkerPoolSaturated(FTDPException):
+    """Raised when the file processing pool has no queue capacity left"""
+    pass
+
+class JsonStoreConflict(FTDPException):
+    """Raised when a JSON data file keeps changing underneath an update"""
+    pass
+
 def dataset_not_found_handler(request, exc: DatasetNotFound):
     return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dataset not found")
 
@@ -41,6 +57,9 @@ def model_not_found_handler(request, exc: ModelNotFound):
 def job_not_found_handler(request, exc: JobNotFound):
     return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
 
+def upload_session_conflict_handler(request, exc: UploadSessionConflict):
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+
 def validation_error_handler(request, exc: ValidationError):
     return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
 
@@ -52,3 +71,9 @@ def file_processing_error_handler(request, exc: FileProcessingError):
 
 def training_error_handler(request, exc: TrainingError):
     return HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Training error: {str(exc)}")
+
+def json_store_conflict_handler(request, exc: JsonStoreConflict):
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+
+def worker_pool_saturated_handler(request, exc: WorkerPoolSaturated):
+    return HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc), headers={"Retry-After": "5"})
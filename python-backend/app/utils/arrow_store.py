@@ -0,0 +1,177 @@
+import csv
+import json
+import logging
+import os
+import uuid
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.core.exceptions import FileProcessingError
+from app.utils.compression import open_dataset
+from app.utils.csv_dialect import read_file_header, sniff_file_dialect
+from app.utils.csv_encoding import DecodingReader, detect_file_encoding
+from app.utils.csv_preview import MAX_HEAD_BYTES
+from app.utils.dataset_formats import cell_to_str, detect_format
+
+logger = logging.getLogger(__name__)
+
+ARROW_SUFFIX = ".arrow"
+
+# Convert accepted datasets to Arrow IPC at ingest (needs the optional pyarrow package)
+ARROW_INGEST = os.environ.get("FTDP_ARROW_INGEST", "1") != "0"
+
+# Rows per record batch in the converted file
+ARROW_BATCH_ROWS = int(os.environ.get("FTDP_ARROW_BATCH_ROWS", "65536"))
+
+_SOURCE_SIZE = b"ftdp.source_size"
+_SOURCE_MTIME = b"ftdp.source_mtime_ns"
+_SOURCE_FORMAT = b"ftdp.source_format"
+
+
+def arrow_path_for(file_path: str) -> str:
+    """Arrow IPC copy stored next to the dataset file"""
+    return file_path + ARROW_SUFFIX
+
+
+def arrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _csv_batches(file_path: str) -> Iterator[Dict[str, List[Optional[str]]]]:
+    """Records as the row index sees them: every non-blank record, short rows padded with nulls"""
+    encoding = detect_file_encoding(file_path)
+    dialect = sniff_file_dialect(file_path, encoding)
+    columns, data_start, _ = read_file_header(file_path, dialect, encoding, MAX_HEAD_BYTES)
+    with open_dataset(file_path) as raw:
+        raw.seek(data_start)
+        reader = csv.reader(
+            DecodingReader(raw, encoding), delimiter=dialect["delimiter"], quotechar=dialect["quotechar"]
+        )
+        batch: Dict[str, List[Optional[str]]] = {col: [] for col in columns}
+        size = 0
+        yielded = False
+        for fields in reader:
+            if not fields:
+                continue
+            for i, col in enumerate(columns):
+                batch[col].append(fields[i] if i < len(fields) else None)
+            size += 1
+            if size >= ARROW_BATCH_ROWS:
+                yield batch
+                batch = {col: [] for col in columns}
+                size = 0
+                yielded = True
+        if size or not yielded:
+            yield batch
+
+
+def _jsonl_batches(file_path: str) -> Iterator[Dict[str, List[Optional[str]]]]:
+    """Records with every value as text; raises FileProcessingError if keys differ between batches"""
+    columns: Optional[List[str]] = None
+    records: List[Dict[str, Any]] = []
+
+    def flush() -> Dict[str, List[Optional[str]]]:
+        nonlocal columns
+        keys = list(dict.fromkeys(key for record in records for key in record))
+        if columns is None:
+            columns = keys
+        elif any(key not in columns for key in keys):
+            raise FileProcessingError("JSONL records do not share one set of keys")
+        return {col: [cell_to_str(record.get(col)) for record in records] for col in columns}
+
+    with open_dataset(file_path) as raw:
+        for number, data in enumerate(raw):
+            if not data.strip():
+                continue
+            try:
+                record = json.loads(data.decode('utf-8-sig' if number == 0 else 'utf-8', errors='replace'))
+            except json.JSONDecodeError:
+                record = None
+            records.append(record if isinstance(record, dict) else {})
+            if len(records) >= ARROW_BATCH_ROWS:
+                yield flush()
+                records = []
+    if records or columns is None:
+        yield flush()
+
+
+def convert_to_arrow(file_path: str, filename: str) -> Optional[str]:
+    """Write a memory-mappable Arrow IPC (Feather v2) copy of a CSV or JSONL dataset.
+
+    Every column is stored as text, row for row as the row index pages it.
+    Returns the path, or None when pyarrow is missing or the format needs no copy.
+    """
+    file_format = detect_format(filename)
+    if file_format not in ("csv", "jsonl") or not arrow_available():
+        return None
+    import pyarrow as pa
+
+    stat = os.stat(file_path)
+    target = arrow_path_for(file_path)
+    tmp_path = f"{target}.{uuid.uuid4().hex[:8]}.tmp"
+    batches = _csv_batches(file_path) if file_format == "csv" else _jsonl_batches(file_path)
+    writer = None
+    rows = 0
+    try:
+        for batch in batches:
+            record_batch = pa.RecordBatch.from_pydict({col: pa.array(values, pa.string()) for col, values in batch.items()})
+            if writer is None:
+                schema = record_batch.schema.with_metadata({
+                    _SOURCE_SIZE: str(stat.st_size),
+                    _SOURCE_MTIME: str(stat.st_mtime_ns),
+                    _SOURCE_FORMAT: file_format,
+                })
+                writer = pa.ipc.new_file(tmp_path, schema)
+            writer.write_batch(record_batch)
+            rows += record_batch.num_rows
+        writer.close()
+        writer = None
+        os.replace(tmp_path, target)
+    except Exception:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logger.info(f"Converted {filename} to Arrow IPC: {rows} rows")
+    return target
+
+
+def open_arrow_table(file_path: str) -> Optional[Any]:
+    """Zero-copy pyarrow Table over the memory-mapped Arrow copy, or None if it is missing or stale"""
+    arrow_path = arrow_path_for(file_path)
+    if not os.path.exists(arrow_path) or not arrow_available():
+        return None
+    import pyarrow as pa
+
+    try:
+        # Closing the map releases its file descriptor; the table's buffers keep the mapping itself alive
+        with pa.memory_map(arrow_path, 'r') as source:
+            reader = pa.ipc.open_file(source)
+            metadata = reader.schema.metadata or {}
+            stat = os.stat(file_path)
+            if (
+                metadata.get(_SOURCE_SIZE) != str(stat.st_size).encode()
+                or metadata.get(_SOURCE_MTIME) != str(stat.st_mtime_ns).encode()
+            ):
+                return None
+            return reader.read_all()
+    except (OSError, pa.ArrowInvalid) as e:
+        logger.warning(f"Ignoring unreadable Arrow copy {arrow_path}: {e}")
+        return None
+
+
+def ensure_arrow_copy(file_path: str, filename: str) -> Optional[str]:
+    """Convert a dataset unless ingest conversion is disabled or a current copy exists; runs in a worker process"""
+    if not ARROW_INGEST:
+        return None
+    if open_arrow_table(file_path) is not None:
+        return arrow_path_for(file_path)
+    try:
+        return convert_to_arrow(file_path, filename)
+    except FileProcessingError as e:
+        logger.info(f"Keeping {filename} as text only: {e}")
+        return None
@@ -0,0 +1,167 @@
+import gzip
+import io
+import zlib
+from typing import BinaryIO, Callable, Optional, Tuple
+
+from app.core.exceptions import FileProcessingError
+
+# Filename suffix -> compression; stripped before the dataset format is detected
+COMPRESSION_EXTENSIONS = {
+    ".gz": "gzip",
+    ".zst": "zstd",
+}
+
+_MAGIC = (
+    (b"\x1f\x8b", "gzip"),
+    (b"\x28\xb5\x2f\xfd", "zstd"),
+)
+
+# Leading bytes needed to recognise every format in _MAGIC
+MAGIC_BYTES = max(len(magic) for magic, _ in _MAGIC)
+
+# Decompressed bytes discarded per read while seeking forward
+_SKIP_CHUNK = 1024 * 1024
+
+
+def split_compression(filename: str) -> Tuple[str, Optional[str]]:
+    """Filename without its compression suffix, and the compression it names"""
+    name = filename or ""
+    for extension, compression in COMPRESSION_EXTENSIONS.items():
+        if name.lower().endswith(extension):
+            return name[:-len(extension)], compression
+    return name, None
+
+
+def detect_compression(file_path: str) -> Optional[str]:
+    """Compression of a file on disk from its magic bytes (spooled uploads have no meaningful name)"""
+    with open(file_path, 'rb') as f:
+        return sniff_compression(f.read(MAGIC_BYTES))
+
+
+def sniff_compression(head: bytes) -> Optional[str]:
+    """Compression named by the first MAGIC_BYTES of a stream"""
+    for magic, compression in _MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise FileProcessingError("Zstandard support requires the optional 'zstandard' package")
+    return zstandard
+
+
+class _GzipFile(gzip.GzipFile):
+    """GzipFile that reports corrupt or truncated data as FileProcessingError"""
+
+    def _checked(self, read: Callable[..., bytes], *args) -> bytes:
+        try:
+            return read(*args)
+        except (EOFError, zlib.error, gzip.BadGzipFile) as e:
+            raise FileProcessingError(f"Corrupt gzip data: {e}")
+
+    def read(self, size: int = -1) -> bytes:
+        return self._checked(super().read, size)
+
+    def read1(self, size: int = -1) -> bytes:
+        return self._checked(super().read1, size)
+
+    def readline(self, size: int = -1) -> bytes:
+        return self._checked(super().readline, size)
+
+
+class _ZstdRaw(io.RawIOBase):
+    """Raw stream over a zstd file that can seek forward by decompressing and discarding"""
+
+    def __init__(self, file_path: str):
+        zstandard = _import_zstandard()
+        self._file = open(file_path, 'rb')
+        self._reader = zstandard.ZstdDecompressor().stream_reader(self._file, read_across_frames=True)
+        self._error = zstandard.ZstdError
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        try:
+            read = self._reader.readinto(buffer)
+        except self._error as e:
+            raise FileProcessingError(f"Corrupt zstd data: {e}")
+        self._pos += read
+        return read
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("Compressed streams cannot seek from the end")
+        if offset < self._pos:
+            raise io.UnsupportedOperation("Compressed streams only seek forward")
+        while self._pos < offset:
+            data = self._reader.read(min(_SKIP_CHUNK, offset - self._pos))
+            if not data:
+                break
+            self._pos += len(data)
+        return self._pos
+
+    def close(self) -> None:
+        if not self.closed:
+            self._reader.close()
+            self._file.close()
+        super().close()
+
+
+def open_dataset(file_path: str) -> BinaryIO:
+    """Binary stream of a dataset's contents, decompressing gzip and zstd files on the fly.
+
+    Offsets (seek/tell) refer to the decompressed data; compressed streams
+    seek forward by decompressing, so byte-range parallelism does not apply.
+    """
+    compression = detect_compression(file_path)
+    if compression == "gzip":
+        return _GzipFile(file_path, 'rb')
+    if compression == "zstd":
+        return io.BufferedReader(_ZstdRaw(file_path))
+    return open(file_path, 'rb')
+
+
+def is_compressed(file_path: str) -> bool:
+    return detect_compression(file_path) is not None
+
+
+def make_decompressor(compression: Optional[str]) -> Callable[[bytes], bytes]:
+    """Incremental decompressor: feed successive compressed chunks, get the decompressed bytes of each"""
+    if compression is None:
+        return lambda chunk: chunk
+    if compression == "zstd":
+        zstandard = _import_zstandard()
+        new_decompressor = zstandard.ZstdDecompressor().decompressobj
+        error = zstandard.ZstdError
+    else:
+        new_decompressor = lambda: zlib.decompressobj(16 + zlib.MAX_WBITS)
+        error = zlib.error
+    state = {"decompressor": new_decompressor()}
+
+    def feed(chunk: bytes) -> bytes:
+        decompressor = state["decompressor"]
+        try:
+            out = decompressor.decompress(chunk)
+            # Concatenated gzip members / zstd frames read as one stream, as open_dataset reads them
+            while decompressor.eof and decompressor.unused_data:
+                rest = decompressor.unused_data
+                decompressor = state["decompressor"] = new_decompressor()
+                out += decompressor.decompress(rest)
+        except error as e:
+            raise FileProcessingError(f"Corrupt {compression} data: {e}")
+        return out
+    return feed
@@ -0,0 +1,122 @@
+import csv
+import logging
+import sys
+from typing import Dict, Any, List, Tuple
+
+from app.utils.compression import open_dataset
+from app.utils.csv_encoding import decode_text
+from app.utils.csv_scan import find_record_end
+
+logger = logging.getLogger(__name__)
+
+# Long cells are reported by validation rather than rejected by the parser, so lift the csv
+# module's default 131072-character field limit. Every module that builds a csv.reader imports
+# this one, so worker processes get the same limit.
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+# Bytes read from the start of a file to detect its dialect
+SNIFF_SAMPLE_BYTES = 64 * 1024
+
+CANDIDATE_DELIMITERS = ",;\t|"
+
+REQUIRED_COLUMNS = ('input', 'output')
+
+DEFAULT_DIALECT: Dict[str, Any] = {
+    "delimiter": ",",
+    "quotechar": '"',
+    "has_header": True,
+}
+
+
+def _complete_lines(sample: str) -> str:
+    """Drop a trailing partial line so the sniffer only sees whole rows"""
+    cut = sample.rfind("\n")
+    return sample[:cut + 1] if cut > 0 else sample
+
+
+def _looks_like_required_header(first_line: str, delimiter: str, quotechar: str) -> bool:
+    fields = next(csv.reader([first_line], delimiter=delimiter, quotechar=quotechar), [])
+    names = {field.strip() for field in fields}
+    return all(col in names for col in REQUIRED_COLUMNS)
+
+
+def sniff_dialect(sample: str) -> Dict[str, Any]:
+    """Detect delimiter, quote character and header presence from a leading sample"""
+    sample = _complete_lines(sample)
+    if not sample.strip():
+        return dict(DEFAULT_DIALECT)
+
+    sniffer = csv.Sniffer()
+    try:
+        sniffed = sniffer.sniff(sample, delimiters=CANDIDATE_DELIMITERS)
+        delimiter = sniffed.delimiter
+        quotechar = sniffed.quotechar or '"'
+    except csv.Error:
+        # Single-column files or unusual quoting; fall back to the most frequent candidate
+        first_line = sample.splitlines()[0]
+        delimiter = max(CANDIDATE_DELIMITERS, key=first_line.count)
+        if not first_line.count(delimiter):
+            delimiter = ","
+        quotechar = '"'
+
+    first_line = sample.splitlines()[0]
+    if _looks_like_required_header(first_line, delimiter, quotechar):
+        has_header = True
+    else:
+        try:
+            has_header = sniffer.has_header(sample)
+        except csv.Error:
+            has_header = True
+
+    return {
+        "delimiter": delimiter,
+        "quotechar": quotechar,
+        "has_header": has_header,
+    }
+
+
+def read_csv_options(dialect: Dict[str, Any]) -> Dict[str, Any]:
+    """Explicit pandas.read_csv settings for a sniffed dialect (C engine, no re-detection)"""
+    return {
+        "sep": dialect["delimiter"],
+        "quotechar": dialect["quotechar"],
+        "header": 0 if dialect["has_header"] else None,
+        "engine": "c",
+        "on_bad_lines": "skip",
+    }
+
+
+def sniff_file_dialect(file_path: str, encoding: str = "utf-8") -> Dict[str, Any]:
+    """Detect the dialect of a CSV file on disk (decompressed if needed) from its first few kilobytes"""
+    with open_dataset(file_path) as f:
+        return sniff_dialect(f.read(SNIFF_SAMPLE_BYTES).decode(encoding, errors="replace"))
+
+
+def read_file_header(
+    file_path: str,
+    dialect: Dict[str, Any],
+    encoding: str = "utf-8",
+    max_bytes: int = 64 * 1024 * 1024
+) -> Tuple[List[str], int, int]:
+    """Column names, the byte offset where data rows start, and the newlines before it.
+
+    Files without a header get positional names ("0", "1", ...) and start at 0.
+    """
+    quotechar = dialect["quotechar"].encode(encoding)
+    with open_dataset(file_path) as f:
+        head = f.read(SNIFF_SAMPLE_BYTES)
+        header_end = find_record_end(head, 1, quotechar)
+        while header_end == -1 and len(head) < max_bytes:
+            more = f.read(len(head))
+            if not more:
+                break
+            head += more
+            header_end = find_record_end(head, 1, quotechar)
+    if header_end == -1:
+        header_end = len(head)
+
+    header_text = decode_text(head[:header_end], encoding)
+    fields = next(csv.reader([header_text], delimiter=dialect["delimiter"], quotechar=dialect["quotechar"]), [])
+    if not dialect["has_header"]:
+        return [str(i) for i in range(len(fields))], 0, 0
+    return [field.strip() for field in fields], header_end, head[:header_end].count(b"\n")
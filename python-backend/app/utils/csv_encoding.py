@@ -0,0 +1,129 @@
+import codecs
+import logging
+from typing import BinaryIO
+
+from app.core.exceptions import FileProcessingError
+from app.utils.compression import open_dataset
+from app.utils.csv_scan import CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Bytes inspected to choose between utf-8 and latin-1 when there is no BOM
+ENCODING_SAMPLE_BYTES = 64 * 1024
+
+_UNSUPPORTED_BOMS = (
+    (codecs.BOM_UTF32_LE, "UTF-32"),
+    (codecs.BOM_UTF32_BE, "UTF-32"),
+    (codecs.BOM_UTF16_LE, "UTF-16"),
+    (codecs.BOM_UTF16_BE, "UTF-16"),
+)
+
+
+def detect_encoding(sample: bytes) -> str:
+    """Detect the text encoding of a CSV from its BOM and a leading sample.
+
+    Returns 'utf-8-sig' for a UTF-8 BOM, 'utf-8' when the sample decodes as
+    UTF-8 (a multi-byte character cut at the sample end is tolerated) and
+    'latin-1' otherwise. Only ASCII-compatible encodings are accepted, since
+    row counting and splitting work on raw bytes.
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    for bom, name in _UNSUPPORTED_BOMS:
+        if sample.startswith(bom):
+            raise FileProcessingError(f"{name} encoded files are not supported, please save the file as UTF-8")
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample[:ENCODING_SAMPLE_BYTES], final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+
+def _fallback(error: UnicodeDecodeError, encoding: str) -> str:
+    """Text of the bytes a strict decode choked on: the valid prefix as detected, the rest as latin-1"""
+    logger.warning(f"Invalid {encoding} byte at offset {error.start} of a chunk, decoding the rest as latin-1")
+    return error.object[:error.start].decode("utf-8") + error.object[error.start:].decode("latin-1")
+
+
+def decode_text(data: bytes, encoding: str) -> str:
+    """Decode bytes in the detected encoding, falling back to latin-1 from the first byte that does not fit"""
+    try:
+        return data.decode(encoding)
+    except UnicodeDecodeError as e:
+        return _fallback(e, encoding)
+
+
+def detect_file_encoding(file_path: str) -> str:
+    """Detect the encoding of a file on disk (decompressed if needed) from its first few kilobytes"""
+    with open_dataset(file_path) as f:
+        return detect_encoding(f.read(ENCODING_SAMPLE_BYTES))
+
+
+class DecodingReader:
+    """Read-only text stream that decodes a binary stream one chunk at a time.
+
+    Suitable as input for pandas.read_csv or csv.reader; at most one chunk of
+    decoded text is held at any time. Decoding is strict: when bytes past the
+    detection sample turn out not to be UTF-8, the rest of the stream is
+    decoded as latin-1, as a file that failed detection would have been.
+    """
+
+    def __init__(self, raw: BinaryIO, encoding: str, chunk_size: int = CHUNK_SIZE):
+        self.raw = raw
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._buffer = ""
+        self._eof = False
+
+    def _decode(self, data: bytes, final: bool = False) -> str:
+        try:
+            return self._decoder.decode(data, final=final)
+        except UnicodeDecodeError as e:
+            # e.object is the decoder's pending bytes plus data (after any BOM), so nothing is lost
+            text = _fallback(e, self.encoding)
+            self.encoding = "latin-1"
+            self._decoder = codecs.getincrementaldecoder("latin-1")()
+            return text
+
+    def _fill(self) -> None:
+        data = self.raw.read(self.chunk_size)
+        if not data:
+            self._buffer += self._decode(b"", final=True)
+            self._eof = True
+        else:
+            self._buffer += self._decode(data)
+
+    def read(self, size: int = -1) -> str:
+        if size is None or size < 0:
+            parts = [self._buffer]
+            self._buffer = ""
+            while not self._eof:
+                self._fill()
+                parts.append(self._buffer)
+                self._buffer = ""
+            return "".join(parts)
+        while len(self._buffer) < size and not self._eof:
+            self._fill()
+        text, self._buffer = self._buffer[:size], self._buffer[size:]
+        return text
+
+    def readline(self) -> str:
+        while "\n" not in self._buffer and not self._eof:
+            self._fill()
+        cut = self._buffer.find("\n")
+        end = cut + 1 if cut != -1 else len(self._buffer)
+        line, self._buffer = self._buffer[:end], self._buffer[end:]
+        return line
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        line = self.readline()
+        if not line:
+            raise StopIteration
+        return line
+
+    def close(self) -> None:
+        self.raw.close()
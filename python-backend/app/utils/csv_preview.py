@@ -0,0 +1,232 @@
+import csv
+import io
+import logging
+import os
+from typing import Any, BinaryIO, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from app.core.exceptions import FileProcessingError
+from app.utils.compression import open_dataset
+from app.utils.csv_dialect import REQUIRED_COLUMNS, SNIFF_SAMPLE_BYTES, read_csv_options, sniff_dialect
+from app.utils.csv_encoding import DecodingReader, decode_text, detect_encoding
+from app.utils.csv_scan import CHUNK_SIZE, RecordCounter, find_record_end
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PREVIEW_ROWS = 5
+
+# Largest preview the API will return
+MAX_PREVIEW_ROWS = int(os.environ.get("FTDP_MAX_PREVIEW_ROWS", "5000"))
+
+# Columns returned next to the required ones when no projection is given
+PREVIEW_EXTRA_COLUMNS = int(os.environ.get("FTDP_PREVIEW_EXTRA_COLUMNS", "20"))
+
+# Upper bound on the bytes kept for the preview rows, so a file whose first
+# rows never terminate (e.g. an unbalanced quote) cannot be buffered whole
+MAX_HEAD_BYTES = 64 * 1024 * 1024
+
+
+class StreamingCsvPreview:
+    """Consumes an upload chunk by chunk, keeping only the bytes of the leading rows.
+
+    The dialect is sniffed from the first SNIFF_SAMPLE_BYTES; the remainder of
+    the stream is only counted, so memory use does not depend on the file size.
+    Call finish() once the stream is exhausted.
+    """
+
+    def __init__(self, max_rows: int = DEFAULT_PREVIEW_ROWS, max_head_bytes: int = MAX_HEAD_BYTES):
+        self.max_rows = max_rows
+        self.max_head_bytes = max_head_bytes
+        self.encoding: Optional[str] = None
+        self.dialect: Optional[Dict[str, Any]] = None
+        self.counter: Optional[RecordCounter] = None
+        self._head = bytearray()
+        self._head_complete = False
+
+    def feed(self, chunk: bytes) -> None:
+        """Consume the next chunk of the upload"""
+        if not self._head_complete:
+            self._head += chunk
+        if self.counter is None:
+            if len(self._head) < SNIFF_SAMPLE_BYTES:
+                return
+            self._start_counting()
+        else:
+            self.counter.feed(chunk)
+        if not self._head_complete and (
+            self.counter.complete_records > self.max_rows or len(self._head) >= self.max_head_bytes
+        ):
+            self._head_complete = True
+
+    def finish(self) -> None:
+        """Flush a stream shorter than the sniffing sample"""
+        if self.counter is None:
+            self._start_counting()
+
+    def _start_counting(self) -> None:
+        sample = bytes(self._head[:SNIFF_SAMPLE_BYTES])
+        self.encoding = detect_encoding(sample)
+        self.dialect = sniff_dialect(_cut_at_newline(sample).decode(self.encoding, errors="replace"))
+        self.counter = RecordCounter(quotechar=self.dialect["quotechar"].encode(self.encoding))
+        self.counter.feed(bytes(self._head))
+
+    @property
+    def head_complete(self) -> bool:
+        """Whether the bytes of the preview rows have all been seen"""
+        return self._head_complete
+
+    @property
+    def total_bytes(self) -> int:
+        return self.counter.bytes_seen if self.counter else len(self._head)
+
+    @property
+    def total_rows(self) -> int:
+        """Data rows in the stream, excluding the header"""
+        header_rows = 1 if self.dialect and self.dialect["has_header"] else 0
+        return max(self.counter.records - header_rows, 0) if self.counter else 0
+
+    def head_bytes(self) -> bytes:
+        """Header plus up to max_rows records, cut on a record boundary when possible"""
+        end = find_record_end(bytes(self._head), self.max_rows + 1, self.counter.quotechar)
+        if end == -1:
+            return bytes(self._head)
+        return bytes(self._head[:end])
+
+
+def _cut_at_newline(data: bytes) -> bytes:
+    """Trim a partial trailing line so a multi-byte character is never split"""
+    cut = data.rfind(b"\n")
+    return data[:cut + 1] if cut > 0 else data
+
+
+def project_columns(
+    columns: Sequence[str],
+    requested: Optional[Sequence[str]] = None,
+    max_extra: int = PREVIEW_EXTRA_COLUMNS
+) -> List[str]:
+    """Columns to parse, in file order: the requested ones, or the required ones plus the first max_extra others"""
+    if requested:
+        unknown = [col for col in requested if col not in columns]
+        if unknown:
+            raise FileProcessingError(f"Unknown column(s): {', '.join(unknown)}")
+        wanted = set(requested)
+    else:
+        others = [col for col in columns if col not in REQUIRED_COLUMNS]
+        wanted = set(REQUIRED_COLUMNS) | set(others[:max_extra])
+    return [col for col in columns if col in wanted]
+
+
+def frame_to_rows(df: pd.DataFrame) -> List[Dict[str, Optional[str]]]:
+    """DataFrame rows as {column: str or None} dicts, converting whole columns at once"""
+    if df.empty:
+        return []
+    values = df.astype(str).to_numpy(dtype=object)
+    values[df.isna().to_numpy()] = None
+    columns = df.columns.tolist()
+    return [dict(zip(columns, row)) for row in values.tolist()]
+
+
+def parse_csv_stream(
+    raw: BinaryIO,
+    encoding: str,
+    dialect: Dict[str, Any],
+    nrows: Optional[int] = None,
+    usecols: Optional[List[int]] = None
+) -> pd.DataFrame:
+    """Parse a binary CSV stream in a single pass of the C engine, decoding it chunk by chunk.
+
+    usecols (field positions) is applied by the tokenizer, so other fields are never materialized.
+    """
+    return pd.read_csv(DecodingReader(raw, encoding), nrows=nrows, usecols=usecols, **read_csv_options(dialect))
+
+
+def read_header_fields(head: bytes, encoding: str, dialect: Dict[str, Any]) -> List[str]:
+    """Column names from the first record (positional names when the file has no header)"""
+    end = find_record_end(head, 1, dialect["quotechar"].encode(encoding))
+    text = decode_text(head if end == -1 else head[:end], encoding)
+    fields = next(csv.reader(io.StringIO(text, newline=""), delimiter=dialect["delimiter"], quotechar=dialect["quotechar"]), [])
+    if not dialect["has_header"]:
+        return [str(i) for i in range(len(fields))]
+    return [field.strip() for field in fields]
+
+
+def build_csv_preview(
+    file_path: str,
+    filename: str,
+    preview_rows: int = DEFAULT_PREVIEW_ROWS,
+    max_bytes: Optional[int] = None,
+    count_rows: bool = True,
+    columns: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """Stream a CSV file from disk and build the preview response.
+
+    Runs in a worker process; client-side problems are raised as
+    FileProcessingError so the caller can map them to a 400. With max_bytes
+    only that prefix of the file is read (e.g. an upload still in progress).
+    With count_rows=False reading stops after the preview rows and
+    statistics.total_rows is left as None for the caller to fill in. Only the
+    projected columns (see project_columns) are parsed; the rest are listed in
+    skipped_columns.
+    """
+    preview = StreamingCsvPreview(max_rows=preview_rows)
+    remaining = max_bytes
+    with open_dataset(file_path) as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            preview.feed(chunk)
+            if not count_rows and preview.head_complete:
+                break
+    preview.finish()
+
+    if preview.encoding == "latin-1":
+        logger.warning(f"File {filename} decoded with latin-1 encoding")
+    head = preview.head_bytes()
+    all_columns = read_header_fields(head, preview.encoding, preview.dialect)
+    selected = set(project_columns(all_columns, columns))
+    usecols = [i for i, name in enumerate(all_columns) if name in selected]
+    try:
+        df = parse_csv_stream(
+            io.BytesIO(head), preview.encoding, preview.dialect, nrows=preview_rows,
+            usecols=usecols if len(usecols) < len(all_columns) else None
+        )
+    except Exception as csv_error:
+        logger.error(f"CSV parsing error for {filename}: {str(csv_error)}")
+        raise FileProcessingError(f"Failed to parse CSV file: {str(csv_error)}")
+    if df.empty:
+        raise FileProcessingError("CSV file appears to be empty or has no valid data")
+
+    df.columns = [str(col).strip() for col in df.columns]
+    parsed_columns = df.columns.tolist()
+    validation_errors = []
+    has_input = 'input' in all_columns
+    has_output = 'output' in all_columns
+    if not has_input:
+        validation_errors.append('Missing required "input" column')
+    if not has_output:
+        validation_errors.append('Missing required "output" column')
+    preview_data = frame_to_rows(df.head(preview_rows))
+    preview_rows = len(preview_data)
+    total_rows = preview.total_rows if count_rows else None
+    file_size_kb = (preview.total_bytes if count_rows else os.path.getsize(file_path)) / 1024
+    return {
+        "filename": filename,
+        "columns": parsed_columns,
+        "skipped_columns": [name for name in all_columns if name not in selected],
+        "data": preview_data,
+        "validation_errors": validation_errors,
+        "dialect": preview.dialect,
+        "encoding": preview.encoding,
+        "statistics": {
+            "total_rows": total_rows,
+            "total_columns": len(all_columns),
+            "file_size_kb": round(file_size_kb, 2),
+            "preview_rows": preview_rows,
+            "has_required_columns": has_input and has_output
+        },
+        "isNewUpload": True
+    }
@@ -0,0 +1,305 @@
+import os
+import re
+import logging
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from app.utils.compression import is_compressed
+
+logger = logging.getLogger(__name__)
+
+# Default read size for streaming scans over uploads and stored datasets
+CHUNK_SIZE = 1024 * 1024
+
+# A newline followed by an empty line; a bare "\r" also ends a line, so "\r\r\n" is blank too
+_BLANK_LINE = re.compile(rb"\n(?=\r*\n)")
+
+# The end of a chunk that may still turn into a blank line: a newline and any "\r"s after it
+_LINE_START_TAIL = re.compile(rb"\n\r*\Z")
+
+
+class RecordCounter:
+    """Quote-aware CSV record counter that consumes a byte stream in constant memory.
+
+    Newlines inside quoted fields are not record boundaries, and blank lines are
+    not counted, matching how pandas tokenizes the file. With quotechar=None
+    every newline ends a record (e.g. JSON Lines).
+    """
+
+    def __init__(self, quotechar: Optional[bytes] = b'"', in_quotes: bool = False, line_start: bool = True):
+        self.quotechar = quotechar
+        self.in_quotes = in_quotes
+        self.newlines = 0
+        self.blank_lines = 0
+        self.bytes_seen = 0
+        # Unquoted tail of the previous chunk that may still start a blank line.
+        # The start of the stream behaves like the byte after a newline; a
+        # counter started mid-file (line_start=False) assumes it does not.
+        self._carry = b"\n" if line_start and not in_quotes else b""
+        self._open_record = False
+
+    def feed(self, chunk: bytes) -> None:
+        """Consume the next chunk of the stream"""
+        if not chunk:
+            return
+        self.bytes_seen += len(chunk)
+
+        in_quotes = self.in_quotes
+        carry = self._carry
+        segments = chunk.split(self.quotechar) if self.quotechar else (chunk,)
+        for i, segment in enumerate(segments):
+            if i:
+                # Every quote character toggles the state and breaks line adjacency
+                in_quotes = not in_quotes
+                carry = b""
+            if in_quotes or not segment:
+                continue
+            self.newlines += segment.count(b"\n")
+            text = carry + segment if carry else segment
+            self.blank_lines += len(_BLANK_LINE.findall(text))
+            tail = _LINE_START_TAIL.search(text)
+            if tail is None:
+                carry = b""
+            else:
+                # Any run of "\r"s behaves like one
+                carry = b"\n\r" if tail.end() - tail.start() > 1 else b"\n"
+
+        self.in_quotes = in_quotes
+        self._carry = carry
+        self._open_record = in_quotes or not (chunk.endswith(b"\n") or carry == b"\n\r")
+
+    @property
+    def complete_records(self) -> int:
+        """Records terminated by a newline so far (header included)"""
+        return self.newlines - self.blank_lines
+
+    @property
+    def records(self) -> int:
+        """All records seen so far, including an unterminated trailing one (header included)"""
+        return self.complete_records + (1 if self.bytes_seen and self._open_record else 0)
+
+
+def count_records(stream: BinaryIO, chunk_size: int = CHUNK_SIZE, quotechar: bytes = b'"') -> int:
+    """Count CSV records (header included) in a binary stream without loading it"""
+    counter = RecordCounter(quotechar=quotechar)
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        counter.feed(chunk)
+    return counter.records
+
+
+def find_record_end(data: bytes, records: int, quotechar: bytes = b'"') -> int:
+    """Byte offset just past the newline that terminates the given number of records, or -1"""
+    if records <= 0:
+        return 0
+
+    seen = 0
+    pos = 0
+    in_quotes = False
+    line_has_content = False
+    for i, segment in enumerate(data.split(quotechar)):
+        if i:
+            in_quotes = not in_quotes
+            line_has_content = True
+            pos += 1
+        if not in_quotes:
+            start = 0
+            newline = segment.find(b"\n")
+            while newline != -1:
+                if line_has_content or segment[start:newline].strip(b"\r"):
+                    seen += 1
+                    if seen == records:
+                        return pos + newline + 1
+                line_has_content = False
+                start = newline + 1
+                newline = segment.find(b"\n", start)
+            if start < len(segment):
+                line_has_content = True
+        pos += len(segment)
+    return -1
+
+
+def split_at_record_boundaries(
+    file_path: str,
+    parts: int,
+    quotechar: Optional[bytes] = b'"',
+    start: int = 0,
+    start_newlines: int = 0,
+    chunk_size: int = CHUNK_SIZE
+) -> List[Tuple[int, Optional[int], int]]:
+    """Split [start, EOF) into about `parts` byte ranges that begin on record boundaries.
+
+    Returns (range_start, range_end, newlines_before_range) tuples; the newline
+    count covers every physical line before the range so callers can report
+    file line numbers. One sequential, quote-aware byte scan is needed to find
+    the boundaries. A compressed file is one range whose end is None (the end
+    of the decompressed stream), since it cannot be entered mid-way.
+    """
+    if is_compressed(file_path):
+        return [(start, None, start_newlines)]
+    size = os.path.getsize(file_path)
+    if parts <= 1 or size - start <= chunk_size:
+        return [(start, size, start_newlines)]
+
+    targets = [start + (size - start) * i // parts for i in range(1, parts)]
+    boundaries = [(start, start_newlines)]
+    target = 0
+    pos = 0
+    newlines = 0
+    in_quotes = False
+    with open(file_path, 'rb') as f:
+        while target < len(targets):
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            segment_pos = pos
+            segments = chunk.split(quotechar) if quotechar else (chunk,)
+            for i, segment in enumerate(segments):
+                if i:
+                    in_quotes = not in_quotes
+                    segment_pos += 1
+                segment_end = segment_pos + len(segment)
+                while not in_quotes and target < len(targets) and targets[target] < segment_end:
+                    newline = segment.find(b"\n", max(targets[target] - segment_pos, 0))
+                    if newline == -1:
+                        break
+                    boundary = segment_pos + newline + 1
+                    if boundary > boundaries[-1][0] and boundary < size:
+                        boundaries.append((boundary, newlines + chunk.count(b"\n", 0, boundary - pos)))
+                    while target < len(targets) and targets[target] < boundary:
+                        target += 1
+                segment_pos = segment_end
+            newlines += chunk.count(b"\n")
+            pos += len(chunk)
+
+    ends = [b[0] for b in boundaries[1:]] + [size]
+    return [(b_start, b_end, b_newlines) for (b_start, b_newlines), b_end in zip(boundaries, ends)]
+
+
+def iter_record_starts(
+    stream: BinaryIO,
+    quotechar: Optional[bytes] = b'"',
+    start: int = 0,
+    chunk_size: int = CHUNK_SIZE
+) -> Iterator[int]:
+    """Yield the byte offset of every non-blank record in a binary stream positioned at `start`.
+
+    Uses the same quote and blank-line rules as RecordCounter, so the number of
+    offsets yielded equals the records it counts.
+    """
+    pos = start
+    record_start = start
+    in_quotes = False
+    # 0: nothing on the current line yet, 1: only "\r"s, 2: content
+    line_state = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        segment_pos = pos
+        segments = chunk.split(quotechar) if quotechar else (chunk,)
+        for i, segment in enumerate(segments):
+            if i:
+                in_quotes = not in_quotes
+                line_state = 2
+                segment_pos += 1
+            if not in_quotes and segment:
+                line_start = 0
+                newline = segment.find(b"\n")
+                while newline != -1:
+                    piece = segment[line_start:newline]
+                    if line_state == 2 or piece.strip(b"\r"):
+                        yield record_start
+                    record_start = segment_pos + newline + 1
+                    line_state = 0
+                    line_start = newline + 1
+                    newline = segment.find(b"\n", line_start)
+                piece = segment[line_start:]
+                if piece:
+                    line_state = 2 if line_state == 2 or piece.strip(b"\r") else 1
+            segment_pos += len(segment)
+        pos += len(chunk)
+    if line_state == 2:
+        yield record_start
+
+
+def split_byte_ranges(size: int, parts: int, min_range: int = CHUNK_SIZE) -> List[Tuple[int, int]]:
+    """Split [0, size) into at most `parts` equal byte ranges of at least min_range bytes"""
+    parts = max(1, min(parts, size // max(min_range, 1)))
+    bounds = [size * i // parts for i in range(parts + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def count_range(
+    file_path: str,
+    start: int,
+    end: int,
+    quotechar: Optional[bytes] = b'"',
+    chunk_size: int = CHUNK_SIZE
+) -> Dict[str, Any]:
+    """Count newlines and blank lines in [start, end) for both possible quote states at `start`.
+
+    A range that does not begin at the start of the file cannot know whether it
+    opens inside a quoted field, so it is counted speculatively both ways in a
+    single read; reconcile_range_counts() picks the right result per range.
+    """
+    counters = {
+        state: RecordCounter(quotechar=quotechar, in_quotes=state, line_start=start == 0)
+        for state in ((False,) if start == 0 or not quotechar else (False, True))
+    }
+    # Whether the range opens with an empty line ("\r"s then a newline); None while it holds only "\r"s
+    starts_blank = None
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            if starts_blank is None:
+                lead = chunk.lstrip(b"\r")
+                if lead:
+                    starts_blank = lead.startswith(b"\n")
+            for counter in counters.values():
+                counter.feed(chunk)
+    return {
+        "start": start,
+        "bytes": end - start - remaining,
+        "starts_blank": starts_blank,
+        "states": {
+            state: {
+                "newlines": counter.newlines,
+                "blank_lines": counter.blank_lines,
+                "in_quotes": counter.in_quotes,
+                "carry": counter._carry,
+            }
+            for state, counter in counters.items()
+        },
+    }
+
+
+def reconcile_range_counts(ranges: List[Dict[str, Any]]) -> int:
+    """Records (header included) in a file from count_range() results of consecutive ranges"""
+    in_quotes = False
+    carry = b"\n"
+    newlines = 0
+    blank_lines = 0
+    for result in sorted(ranges, key=lambda r: r["start"]):
+        state = result["states"][in_quotes]
+        newlines += state["newlines"]
+        blank_lines += state["blank_lines"]
+        if not in_quotes and result["start"] and carry and result["starts_blank"] is None:
+            # A range of nothing but "\r"s extends the previous range's empty line
+            carry = b"\n\r" if result["bytes"] else carry
+            continue
+        # A blank line whose first newline ends the previous range
+        if not in_quotes and result["start"] and carry and result["starts_blank"]:
+            blank_lines += 1
+        in_quotes = state["in_quotes"]
+        carry = state["carry"]
+    if not any(result["bytes"] for result in ranges):
+        return 0
+    open_record = in_quotes or not carry
+    return newlines - blank_lines + (1 if open_record else 0)
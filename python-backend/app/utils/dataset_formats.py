@@ -0,0 +1,262 @@
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.core.exceptions import FileProcessingError
+from app.utils.compression import COMPRESSION_EXTENSIONS, detect_compression, open_dataset, split_compression
+from app.utils.csv_dialect import REQUIRED_COLUMNS
+from app.utils.csv_preview import DEFAULT_PREVIEW_ROWS, build_csv_preview, project_columns
+from app.utils.csv_scan import CHUNK_SIZE, RecordCounter
+
+logger = logging.getLogger(__name__)
+
+# Extension -> format name; checked longest first
+DATASET_FORMATS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".parquet": "parquet",
+}
+
+# Text formats may also be stored gzip or zstd compressed (e.g. data.csv.gz)
+COMPRESSIBLE_FORMATS = ("csv", "jsonl")
+
+SUPPORTED_DATASET_EXTENSIONS = tuple(DATASET_FORMATS) + tuple(
+    extension + suffix
+    for extension, file_format in DATASET_FORMATS.items() if file_format in COMPRESSIBLE_FORMATS
+    for suffix in COMPRESSION_EXTENSIONS
+)
+
+# Cap on per-line JSON errors listed in a preview
+MAX_REPORTED_LINE_ERRORS = 5
+
+# Preview cells longer than this are cut; the full value is fetched per cell
+PREVIEW_CELL_CHARS = int(os.environ.get("FTDP_PREVIEW_CELL_CHARS", "2000"))
+
+
+def detect_format(filename: str) -> Optional[str]:
+    """Dataset format for a filename, or None if unsupported; a .gz/.zst suffix is looked through"""
+    name, compression = split_compression((filename or "").lower())
+    for extension in sorted(DATASET_FORMATS, key=len, reverse=True):
+        if name.endswith(extension):
+            file_format = DATASET_FORMATS[extension]
+            if compression and file_format not in COMPRESSIBLE_FORMATS:
+                return None
+            return file_format
+    return None
+
+
+def _required_column_errors(columns: List[str]) -> List[str]:
+    return [f'Missing required "{col}" column' for col in REQUIRED_COLUMNS if col not in columns]
+
+
+def _preview_response(
+    filename: str,
+    file_format: str,
+    columns: List[str],
+    preview_data: List[Dict[str, Any]],
+    total_rows: Optional[int],
+    size_bytes: int,
+    validation_errors: Optional[List[str]] = None,
+    selected: Optional[List[str]] = None,
+    **extra: Any
+) -> Dict[str, Any]:
+    column_errors = _required_column_errors(columns)
+    if selected is None:
+        selected = columns
+    return {
+        "filename": filename,
+        "format": file_format,
+        "columns": selected,
+        "skipped_columns": [col for col in columns if col not in selected],
+        "data": preview_data,
+        "validation_errors": column_errors + (validation_errors or []),
+        **extra,
+        "statistics": {
+            "total_rows": total_rows,
+            "total_columns": len(columns),
+            "file_size_kb": round(size_bytes / 1024, 2),
+            "preview_rows": len(preview_data),
+            "has_required_columns": not column_errors
+        },
+        "isNewUpload": True
+    }
+
+
+def truncate_cells(rows: List[Dict[str, Any]], max_chars: Optional[int], first_row: int = 0) -> List[Dict[str, Any]]:
+    """Cut string cells longer than max_chars in place and describe each cut cell"""
+    truncated: List[Dict[str, Any]] = []
+    if not max_chars:
+        return truncated
+    for i, row in enumerate(rows):
+        for col, value in row.items():
+            if isinstance(value, str) and len(value) > max_chars:
+                row[col] = value[:max_chars]
+                truncated.append({"row": first_row + i, "column": col, "length": len(value)})
+    return truncated
+
+
+def cell_to_str(value: Any) -> Optional[str]:
+    """Cell value as the text every dataset reader returns: None stays None, nested JSON is re-serialized"""
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def build_jsonl_preview(
+    file_path: str,
+    filename: str,
+    preview_rows: int = DEFAULT_PREVIEW_ROWS,
+    max_bytes: Optional[int] = None,
+    count_rows: bool = True,
+    requested_columns: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """Stream a JSON Lines file: parse the first records, count the rest by newlines"""
+    counter = RecordCounter(quotechar=None)
+    rows: List[Dict[str, Any]] = []
+    line_errors: List[str] = []
+    columns: List[str] = []
+    pending = b""
+    line_number = 0
+    remaining = max_bytes
+
+    with open_dataset(file_path) as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            if remaining is not None:
+                remaining -= len(chunk)
+            counter.feed(chunk)
+            if len(rows) >= preview_rows:
+                continue
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                line_number += 1
+                if len(rows) >= preview_rows:
+                    break
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line.decode('utf-8-sig' if line_number == 1 else 'utf-8', errors='replace'))
+                except json.JSONDecodeError as e:
+                    if len(line_errors) < MAX_REPORTED_LINE_ERRORS:
+                        line_errors.append(f"Line {line_number}: invalid JSON ({e.msg})")
+                    continue
+                if not isinstance(record, dict):
+                    if len(line_errors) < MAX_REPORTED_LINE_ERRORS:
+                        line_errors.append(f"Line {line_number}: expected a JSON object")
+                    continue
+                for key in record:
+                    if key not in columns:
+                        columns.append(key)
+                rows.append(record)
+            if len(rows) >= preview_rows:
+                pending = b""
+                if not count_rows:
+                    break
+
+    size_bytes = os.path.getsize(file_path)
+    at_eof = max_bytes is None or max_bytes >= size_bytes
+    if pending.strip() and len(rows) < preview_rows and at_eof:
+        try:
+            record = json.loads(pending.decode('utf-8', errors='replace'))
+            if isinstance(record, dict):
+                for key in record:
+                    if key not in columns:
+                        columns.append(key)
+                rows.append(record)
+        except json.JSONDecodeError as e:
+            line_errors.append(f"Line {line_number + 1}: invalid JSON ({e.msg})")
+
+    if not rows:
+        raise FileProcessingError("JSONL file appears to be empty or has no valid records")
+
+    selected = project_columns(columns, requested_columns)
+    preview_data = [{col: cell_to_str(row.get(col)) for col in selected} for row in rows]
+    return _preview_response(
+        filename, "jsonl", columns, preview_data,
+        counter.records if count_rows else None,
+        counter.bytes_seen if count_rows else size_bytes,
+        validation_errors=line_errors, selected=selected, encoding="utf-8"
+    )
+
+
+def _import_parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise FileProcessingError("Parquet support requires the optional 'pyarrow' package")
+    return pq
+
+
+def build_parquet_preview(
+    file_path: str,
+    filename: str,
+    preview_rows: int = DEFAULT_PREVIEW_ROWS,
+    requested_columns: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """Preview a Parquet file from its footer metadata and the projected columns of the first row group"""
+    pq = _import_parquet()
+    try:
+        parquet_file = pq.ParquetFile(file_path)
+    except Exception as e:
+        raise FileProcessingError(f"Failed to read Parquet file: {str(e)}")
+
+    metadata = parquet_file.metadata
+    columns = [str(name) for name in parquet_file.schema_arrow.names]
+    selected = project_columns(columns, requested_columns)
+    preview_data: List[Dict[str, Any]] = []
+    if metadata.num_row_groups:
+        first_group = parquet_file.read_row_group(0, columns=selected).slice(0, preview_rows)
+        for record in first_group.to_pylist():
+            preview_data.append({col: cell_to_str(record.get(col)) for col in selected})
+
+    return _preview_response(
+        filename, "parquet", columns, preview_data, metadata.num_rows, os.path.getsize(file_path),
+        selected=selected,
+        schema={field.name: str(field.type) for field in parquet_file.schema_arrow},
+        row_groups=metadata.num_row_groups
+    )
+
+
+def build_dataset_preview(
+    file_path: str,
+    filename: str,
+    preview_rows: int = DEFAULT_PREVIEW_ROWS,
+    max_bytes: Optional[int] = None,
+    count_rows: bool = True,
+    max_cell_chars: Optional[int] = PREVIEW_CELL_CHARS,
+    columns: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """Format-aware preview of a dataset file, projected and with long cells truncated; runs in a worker process"""
+    file_format = detect_format(filename)
+    compression = detect_compression(file_path) if file_format in COMPRESSIBLE_FORMATS else None
+    if compression and max_bytes is not None and max_bytes < os.path.getsize(file_path):
+        raise FileProcessingError("Previews of compressed files are available once the upload is complete")
+    if file_format == "csv":
+        preview = build_csv_preview(file_path, filename, preview_rows, max_bytes, count_rows, columns)
+        preview["format"] = "csv"
+    elif file_format == "jsonl":
+        preview = build_jsonl_preview(file_path, filename, preview_rows, max_bytes, count_rows, columns)
+    elif file_format == "parquet":
+        if max_bytes is not None and max_bytes < os.path.getsize(file_path):
+            raise FileProcessingError("Parquet previews are available once the upload is complete")
+        preview = build_parquet_preview(file_path, filename, preview_rows, columns)
+    else:
+        raise FileProcessingError(
+            f"Unsupported file type, expected one of: {', '.join(SUPPORTED_DATASET_EXTENSIONS)}"
+        )
+    if compression:
+        statistics = preview["statistics"]
+        preview["compression"] = compression
+        if count_rows:
+            statistics["uncompressed_size_kb"] = statistics["file_size_kb"]
+        statistics["file_size_kb"] = round(os.path.getsize(file_path) / 1024, 2)
+    preview["truncated_cells"] = truncate_cells(preview["data"], max_cell_chars)
+    preview["max_cell_chars"] = max_cell_chars
+    return preview
@@ -0,0 +1,232 @@
+import io
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.exceptions import FileProcessingError
+from app.utils.arrow_store import open_arrow_table
+from app.utils.compression import open_dataset
+from app.utils.csv_dialect import read_csv_options, sniff_file_dialect
+from app.utils.csv_encoding import DecodingReader, detect_file_encoding
+from app.utils.dataset_formats import detect_format
+from app.utils.file_utils import hash_file
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SUFFIX = ".profile.json"
+
+# Rows parsed per vectorized pass
+PROFILE_CHUNK_ROWS = int(os.environ.get("FTDP_PROFILE_CHUNK_ROWS", "100000"))
+
+# Text lengths below this are tallied exactly in a dense histogram
+_DENSE_LENGTHS = 1 << 16
+
+# Longer ones go into log-scaled buckets, this many per doubling (within 1.1% of the true length)
+_LONG_BUCKETS_PER_OCTAVE = 64
+_LONG_BUCKET_BASE = 16 * _LONG_BUCKETS_PER_OCTAVE
+_LONG_BUCKETS = 63 * _LONG_BUCKETS_PER_OCTAVE - _LONG_BUCKET_BASE
+
+PERCENTILES = (50, 90, 99)
+
+
+def profile_path_for(file_path: str) -> str:
+    """Sidecar profile stored next to the dataset file"""
+    return file_path + PROFILE_SUFFIX
+
+
+class LengthHistogram:
+    """Text-length distribution in fixed memory: exact below 64K characters, log-bucketed above"""
+
+    def __init__(self):
+        self.dense = np.zeros(_DENSE_LENGTHS, dtype=np.int64)
+        self.long = np.zeros(_LONG_BUCKETS, dtype=np.int64)
+        self.long_min: Optional[int] = None
+        self.long_max: Optional[int] = None
+        self.count = 0
+        self.total = 0
+
+    def add(self, lengths: np.ndarray) -> None:
+        if not len(lengths):
+            return
+        lengths = lengths.astype(np.int64, copy=False)
+        short = lengths[lengths < _DENSE_LENGTHS]
+        self.dense += np.bincount(short, minlength=_DENSE_LENGTHS)
+        long = lengths[lengths >= _DENSE_LENGTHS]
+        if len(long):
+            buckets = np.floor(np.log2(long) * _LONG_BUCKETS_PER_OCTAVE).astype(np.int64) - _LONG_BUCKET_BASE
+            self.long += np.bincount(np.clip(buckets, 0, _LONG_BUCKETS - 1), minlength=_LONG_BUCKETS)
+            low, high = int(long.min()), int(long.max())
+            self.long_min = low if self.long_min is None else min(self.long_min, low)
+            self.long_max = high if self.long_max is None else max(self.long_max, high)
+        self.count += len(lengths)
+        self.total += int(lengths.sum())
+
+    def _value_at(self, rank: int) -> int:
+        cumulative = np.cumsum(self.dense)
+        if rank < cumulative[-1]:
+            return int(np.searchsorted(cumulative, rank, side="right"))
+        rank -= int(cumulative[-1])
+        if rank == 0:
+            return self.long_min
+        if rank == int(self.long.sum()) - 1:
+            return self.long_max
+        bucket = int(np.searchsorted(np.cumsum(self.long), rank, side="right"))
+        # Geometric middle of the bucket, kept within the lengths actually seen
+        value = round(2 ** ((bucket + _LONG_BUCKET_BASE + 0.5) / _LONG_BUCKETS_PER_OCTAVE))
+        return min(max(value, self.long_min), self.long_max)
+
+    def summary(self) -> Optional[Dict[str, Any]]:
+        if not self.count:
+            return None
+        result = {
+            "min": self._value_at(0),
+            "max": self._value_at(self.count - 1),
+            "mean": round(self.total / self.count, 2),
+        }
+        for pct in PERCENTILES:
+            result[f"p{pct}"] = self._value_at(min(self.count - 1, int(self.count * pct / 100)))
+        return result
+
+
+def _iter_frames(file_path: str, file_format: str) -> Iterator[pd.DataFrame]:
+    table = open_arrow_table(file_path) if file_format in ("csv", "jsonl") else None
+    if table is not None:
+        for batch in table.to_batches(max_chunksize=PROFILE_CHUNK_ROWS):
+            frame = batch.to_pandas()
+            # read_csv parses empty fields as missing; match it so profiles agree across sources
+            yield frame.mask(frame == "") if file_format == "csv" else frame
+    elif file_format == "csv":
+        encoding = detect_file_encoding(file_path)
+        dialect = sniff_file_dialect(file_path, encoding)
+        with open_dataset(file_path) as raw:
+            reader = pd.read_csv(
+                DecodingReader(raw, encoding), chunksize=PROFILE_CHUNK_ROWS, dtype=str, **read_csv_options(dialect)
+            )
+            for chunk in reader:
+                chunk.columns = [str(col).strip() for col in chunk.columns]
+                yield chunk
+    elif file_format == "jsonl":
+        with io.TextIOWrapper(open_dataset(file_path), encoding='utf-8-sig', errors='replace') as text:
+            for chunk in pd.read_json(text, lines=True, chunksize=PROFILE_CHUNK_ROWS, dtype=False):
+                yield chunk
+    elif file_format == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise FileProcessingError("Parquet support requires the optional 'pyarrow' package")
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=PROFILE_CHUNK_ROWS):
+            yield batch.to_pandas()
+    else:
+        raise FileProcessingError(f"Unsupported file type: {file_path}")
+
+
+def build_profile(file_path: str, filename: str, input_column: str, target_column: str) -> Dict[str, Any]:
+    """Row count, per-column nulls and text length percentiles, one chunk of rows at a time"""
+    file_format = detect_format(filename)
+    started = time.time()
+    rows = 0
+    columns: List[str] = []
+    null_counts: Dict[str, int] = {}
+    lengths = {input_column: LengthHistogram(), target_column: LengthHistogram()}
+
+    for chunk in _iter_frames(file_path, file_format):
+        rows += len(chunk)
+        for col in chunk.columns:
+            if col not in null_counts:
+                columns.append(col)
+                null_counts[col] = rows - len(chunk)
+        nulls = chunk.isna().sum()
+        for col in columns:
+            null_counts[col] += int(nulls[col]) if col in nulls.index else len(chunk)
+        for col, histogram in lengths.items():
+            if col in chunk.columns:
+                histogram.add(chunk[col].dropna().astype(str).str.len().to_numpy())
+
+    return {
+        "format": file_format,
+        "rows": rows,
+        "columns": columns,
+        "null_counts": null_counts,
+        "text_lengths": {col: histogram.summary() for col, histogram in lengths.items()},
+        "input_column": input_column,
+        "target_column": target_column,
+        "duration_ms": round((time.time() - started) * 1000, 2),
+    }
+
+
+def read_cached_profile(file_path: str) -> Optional[Dict[str, Any]]:
+    """The stored profile if the dataset file is unchanged since it was computed (stat only, no data read)"""
+    try:
+        with open(profile_path_for(file_path), 'r', encoding='utf-8') as f:
+            profile = json.load(f)
+        stat = os.stat(file_path)
+    except (OSError, ValueError):
+        return None
+    if profile.get("size_bytes") != stat.st_size or profile.get("mtime_ns") != stat.st_mtime_ns:
+        return None
+    return profile
+
+
+def _write_profile(file_path: str, profile: Dict[str, Any]) -> None:
+    target = profile_path_for(file_path)
+    tmp_path = f"{target}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=2)
+    os.replace(tmp_path, target)
+
+
+def get_profile(
+    file_path: str,
+    filename: str,
+    input_column: str = "input",
+    target_column: str = "output",
+    force: bool = False
+) -> Dict[str, Any]:
+    """Stored profile for a dataset, recomputed only when its content changes; runs in a worker process"""
+    stat = os.stat(file_path)
+    if not force:
+        cached = read_cached_profile(file_path)
+        if cached and cached.get("input_column") == input_column and cached.get("target_column") == target_column:
+            return cached
+
+    content_hash = hash_file(file_path)
+    previous = None
+    try:
+        with open(profile_path_for(file_path), 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    if (
+        not force and previous
+        and previous.get("sha256") == content_hash
+        and previous.get("input_column") == input_column
+        and previous.get("target_column") == target_column
+    ):
+        # Touched but not modified: keep the stats, refresh the mtime key
+        profile = previous
+    else:
+        profile = build_profile(file_path, filename, input_column, target_column)
+        profile["sha256"] = content_hash
+        profile["computed_at"] = time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime())
+        logger.info(f"Profiled {filename}: {profile['rows']} rows in {profile['duration_ms']}ms")
+    profile["size_bytes"] = stat.st_size
+    profile["mtime_ns"] = stat.st_mtime_ns
+    _write_profile(file_path, profile)
+    return profile
+
+
+def format_size(size_bytes: int) -> str:
+    """Human-readable size in the style used by datasets.json (e.g. "2.3 MB")"""
+    size = float(size_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
@@ -0,0 +1,334 @@
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.core.exceptions import FileProcessingError
+from app.utils.compression import open_dataset
+from app.utils.csv_dialect import read_file_header, sniff_file_dialect
+from app.utils.csv_encoding import DecodingReader, detect_file_encoding
+from app.utils.csv_preview import MAX_HEAD_BYTES, project_columns
+from app.utils.csv_scan import split_at_record_boundaries
+from app.utils.dataset_formats import detect_format
+from app.utils.worker_pool import csv_pool
+
+logger = logging.getLogger(__name__)
+
+# Cells longer than this (in characters) are reported as over-long
+MAX_CELL_CHARS = int(os.environ.get("FTDP_VALIDATION_MAX_CELL_CHARS", "100000"))
+
+# Files smaller than this are validated by a single worker
+PARALLEL_VALIDATION_MIN_BYTES = 64 * 1024 * 1024
+
+# Line numbers kept per finding category
+MAX_SAMPLES = 20
+
+
+class ByteRange:
+    """Binary reader limited to [start, end) of an open file; end None reads to the end of the stream.
+
+    Lets a worker decode and parse one planned range with the usual readers; token_stats uses it too.
+    """
+
+    def __init__(self, raw, start: int, end: Optional[int]):
+        raw.seek(start)
+        self.raw = raw
+        self.remaining = None if end is None else end - start
+
+    def read(self, size: int = -1) -> bytes:
+        if self.remaining is None:
+            return self.raw.read(-1 if size is None else size)
+        if self.remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.raw.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def readline(self) -> bytes:
+        if self.remaining is None:
+            return self.raw.readline()
+        if self.remaining <= 0:
+            return b""
+        line = self.raw.readline(self.remaining)
+        self.remaining -= len(line)
+        return line
+
+    def close(self) -> None:
+        self.raw.close()
+
+
+def _empty_report(columns: List[str]) -> Dict[str, Any]:
+    return {
+        "rows": 0,
+        "malformed": {"count": 0, "samples": []},
+        "empty_cells": {col: {"count": 0, "samples": []} for col in columns},
+        "long_cells": {"count": 0, "samples": []},
+    }
+
+
+def _sample(bucket: Dict[str, Any], item: Any) -> None:
+    bucket["count"] += 1
+    if len(bucket["samples"]) < MAX_SAMPLES:
+        bucket["samples"].append(item)
+
+
+def _check_cells(report: Dict[str, Any], line: int, values: Dict[str, Any], required: List[str], max_cell_chars: int) -> None:
+    for col in required:
+        value = values.get(col)
+        if value is None or (isinstance(value, str) and not value.strip()):
+            _sample(report["empty_cells"][col], line)
+    for col, value in values.items():
+        if isinstance(value, str) and len(value) > max_cell_chars:
+            _sample(report["long_cells"], {"line": line, "column": col, "length": len(value)})
+
+
+def plan_csv_validation(file_path: str, parts: int) -> Dict[str, Any]:
+    """Detect encoding, dialect and header, and split the data rows into record-aligned ranges"""
+    encoding = detect_file_encoding(file_path)
+    dialect = sniff_file_dialect(file_path, encoding)
+    header, header_end, header_newlines = read_file_header(file_path, dialect, encoding, MAX_HEAD_BYTES)
+    ranges = split_at_record_boundaries(
+        file_path, parts, dialect["quotechar"].encode(encoding), start=header_end, start_newlines=header_newlines
+    )
+    return {"encoding": encoding, "dialect": dialect, "header": header, "ranges": ranges}
+
+
+def validate_csv_range(
+    file_path: str,
+    plan: Dict[str, Any],
+    start: int,
+    end: int,
+    newlines_before: int,
+    required: List[str],
+    max_cell_chars: int = MAX_CELL_CHARS,
+    checked: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Validate every record in one byte range of a CSV file; runs in a worker process.
+
+    With checked, only those columns are pulled out of each record and inspected.
+    """
+    header = plan["header"]
+    dialect = plan["dialect"]
+    positions = [(i, name) for i, name in enumerate(header) if checked is None or name in checked]
+    report = _empty_report(required)
+    with open_dataset(file_path) as raw:
+        reader = csv.reader(
+            DecodingReader(ByteRange(raw, start, end), plan["encoding"]),
+            delimiter=dialect["delimiter"],
+            quotechar=dialect["quotechar"]
+        )
+        line = newlines_before + 1
+        while True:
+            record_line = line
+            try:
+                row = next(reader)
+            except StopIteration:
+                break
+            except csv.Error as e:
+                _sample(report["malformed"], {"line": record_line, "error": str(e)})
+                line = newlines_before + reader.line_num + 1
+                continue
+            line = newlines_before + reader.line_num + 1
+            if not row:
+                continue
+            report["rows"] += 1
+            if len(row) != len(header):
+                _sample(report["malformed"], {
+                    "line": record_line,
+                    "error": f"Expected {len(header)} fields, saw {len(row)}"
+                })
+                continue
+            _check_cells(report, record_line, {name: row[i] for i, name in positions}, required, max_cell_chars)
+    return report
+
+
+def validate_jsonl_range(
+    file_path: str,
+    start: int,
+    end: int,
+    newlines_before: int,
+    required: List[str],
+    max_cell_chars: int = MAX_CELL_CHARS,
+    checked: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """Validate every line in one byte range of a JSON Lines file; runs in a worker process"""
+    report = _empty_report(required)
+    report["columns"] = []
+    with open_dataset(file_path) as raw:
+        source = ByteRange(raw, start, end)
+        line = newlines_before
+        while True:
+            data = source.readline()
+            if not data:
+                break
+            line += 1
+            if not data.strip():
+                continue
+            report["rows"] += 1
+            try:
+                record = json.loads(data.decode('utf-8-sig' if line == 1 else 'utf-8', errors='replace'))
+            except json.JSONDecodeError as e:
+                _sample(report["malformed"], {"line": line, "error": f"Invalid JSON: {e.msg}"})
+                continue
+            if not isinstance(record, dict):
+                _sample(report["malformed"], {"line": line, "error": "Expected a JSON object"})
+                continue
+            for key in record:
+                if key not in report["columns"]:
+                    report["columns"].append(key)
+            values = {
+                k: v if isinstance(v, str) or v is None else json.dumps(v)
+                for k, v in record.items() if checked is None or k in checked
+            }
+            _check_cells(report, line, values, required, max_cell_chars)
+    return report
+
+
+def validate_parquet_file(
+    file_path: str,
+    required: List[str],
+    max_cell_chars: int = MAX_CELL_CHARS,
+    columns: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """Validate a Parquet file batch by batch (row numbers are reported instead of lines).
+
+    Only the required columns, plus any requested ones, are read.
+    """
+    try:
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise FileProcessingError("Parquet support requires the optional 'pyarrow' package")
+
+    parquet_file = pq.ParquetFile(file_path)
+    report = _empty_report(required)
+    report["columns"] = [str(name) for name in parquet_file.schema_arrow.names]
+    present = [col for col in required if col in report["columns"]]
+    if columns:
+        present = project_columns(report["columns"], list(dict.fromkeys([*present, *columns])))
+    row_offset = 0
+    for batch in parquet_file.iter_batches(columns=present or None):
+        for col in present:
+            values = batch.column(batch.schema.get_field_index(col)).cast("string")
+            if col in required:
+                empty = pc.or_kleene(pc.is_null(values), pc.equal(pc.utf8_trim_whitespace(values), ""))
+                for index in pc.indices_nonzero(pc.fill_null(empty, True)).to_pylist():
+                    _sample(report["empty_cells"][col], {"row": row_offset + index + 1})
+            lengths = pc.fill_null(pc.utf8_length(values), 0)
+            for index in pc.indices_nonzero(pc.greater(lengths, max_cell_chars)).to_pylist():
+                _sample(report["long_cells"], {
+                    "row": row_offset + index + 1, "column": col, "length": lengths[index].as_py()
+                })
+        row_offset += batch.num_rows
+    report["rows"] = parquet_file.metadata.num_rows
+    report["checked"] = present
+    return report
+
+
+def merge_reports(reports: List[Dict[str, Any]], required: List[str]) -> Dict[str, Any]:
+    """Combine per-range reports, keeping the earliest samples of each category"""
+    merged = _empty_report(required)
+    for report in reports:
+        merged["rows"] += report["rows"]
+        for key in ("malformed", "long_cells"):
+            merged[key]["count"] += report[key]["count"]
+            merged[key]["samples"].extend(report[key]["samples"])
+        for col in required:
+            merged["empty_cells"][col]["count"] += report["empty_cells"][col]["count"]
+            merged["empty_cells"][col]["samples"].extend(report["empty_cells"][col]["samples"])
+    merged["malformed"]["samples"] = merged["malformed"]["samples"][:MAX_SAMPLES]
+    merged["long_cells"]["samples"] = merged["long_cells"]["samples"][:MAX_SAMPLES]
+    for col in required:
+        merged["empty_cells"][col]["samples"] = merged["empty_cells"][col]["samples"][:MAX_SAMPLES]
+    return merged
+
+
+async def run_validation(
+    file_path: str,
+    filename: str,
+    input_column: str = "input",
+    output_column: str = "output",
+    max_cell_chars: int = MAX_CELL_CHARS,
+    projection: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """Scan a whole dataset file in bounded memory, split across the worker pool for large files.
+
+    With a projection only the required and projected columns are inspected.
+    """
+    started = time.time()
+    file_format = detect_format(filename)
+    required = [input_column, output_column]
+    size = os.path.getsize(file_path)
+    parts = csv_pool.max_workers if size >= PARALLEL_VALIDATION_MIN_BYTES else 1
+
+    if file_format == "csv":
+        plan = await csv_pool.run(plan_csv_validation, file_path, parts)
+        columns = plan["header"]
+        checked = None
+        if projection:
+            present = [col for col in required if col in columns]
+            checked = project_columns(columns, list(dict.fromkeys([*present, *projection])))
+        reports = await asyncio.gather(*(
+            csv_pool.run(validate_csv_range, file_path, plan, start, end, newlines, required, max_cell_chars, checked)
+            for start, end, newlines in plan["ranges"]
+        ))
+        extra = {"encoding": plan["encoding"], "dialect": plan["dialect"]}
+    elif file_format == "jsonl":
+        checked = list(dict.fromkeys([*required, *projection])) if projection else None
+        ranges = await csv_pool.run(split_at_record_boundaries, file_path, parts, None)
+        reports = await asyncio.gather(*(
+            csv_pool.run(validate_jsonl_range, file_path, start, end, newlines, required, max_cell_chars, checked)
+            for start, end, newlines in ranges
+        ))
+        columns = []
+        for report in reports:
+            columns.extend(col for col in report["columns"] if col not in columns)
+        if checked is not None:
+            checked = [col for col in columns if col in checked]
+        extra = {"encoding": "utf-8"}
+    elif file_format == "parquet":
+        reports = [await csv_pool.run(validate_parquet_file, file_path, required, max_cell_chars, projection)]
+        columns = reports[0]["columns"]
+        checked = reports[0]["checked"]
+        extra = {}
+    else:
+        raise FileProcessingError(f"Unsupported file type: {filename}")
+
+    merged = merge_reports(list(reports), required)
+    errors = [f'Missing required "{col}" column' for col in required if col not in columns]
+    if merged["malformed"]["count"]:
+        errors.append(f"{merged['malformed']['count']} malformed row(s)")
+    warnings = [
+        f'{bucket["count"]} row(s) with empty "{col}"'
+        for col, bucket in merged["empty_cells"].items() if bucket["count"] and col in columns
+    ]
+    if merged["long_cells"]["count"]:
+        warnings.append(f"{merged['long_cells']['count']} cell(s) longer than {max_cell_chars} characters")
+
+    report = {
+        "filename": filename,
+        "format": file_format,
+        "is_valid": not errors,
+        "errors": errors,
+        "warnings": warnings,
+        "columns": columns,
+        "skipped_columns": [] if checked is None else [col for col in columns if col not in checked],
+        **extra,
+        "total_rows": merged["rows"],
+        "malformed_rows": merged["malformed"],
+        "empty_cells": merged["empty_cells"],
+        "long_cells": {**merged["long_cells"], "max_cell_chars": max_cell_chars},
+        "file_size_kb": round(size / 1024, 2),
+        "workers": len(reports),
+        "duration_ms": round((time.time() - started) * 1000, 2),
+    }
+    logger.info(
+        f"Validated {filename}: {report['total_rows']} rows, {merged['malformed']['count']} malformed, "
+        f"{len(reports)} worker(s), {report['duration_ms']}ms"
+    )
+    return report
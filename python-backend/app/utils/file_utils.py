@@ -1,17 +1,34 @@
+import asyncio
 import os
 import shutil
 import tempfile
 import csv
 import json
 import uuid
+import hashlib
 from pathlib import Path
 from typing import Optional, Dict, Any, List, Union
 import logging
 import aiofiles
 import pandas as pd
 
+from app.core.exceptions import FileProcessingError
+from app.utils.compression import MAGIC_BYTES, make_decompressor, open_dataset, sniff_compression
+from app.utils.csv_dialect import sniff_file_dialect
+from app.utils.csv_encoding import detect_file_encoding
+from app.utils.csv_preview import StreamingCsvPreview, frame_to_rows, parse_csv_stream
+from app.utils.csv_scan import CHUNK_SIZE, RecordCounter
+from app.utils.dataset_formats import COMPRESSIBLE_FORMATS, build_dataset_preview, detect_format
+from app.utils.validation import sanitize_filename
+
 logger = logging.getLogger(__name__)
 
+# Root for stored uploads; dataset filePath values like /uploads/datasets/x.csv resolve under it
+UPLOADS_DIR = os.environ.get(
+    "FTDP_UPLOADS_DIR",
+    str(Path(__file__).resolve().parent.parent.parent / "uploads")
+)
+
 def ensure_directory_exists(directory_path: str) -> bool:
     """Ensure directory exists, create if it doesn't"""
     try:
@@ -52,7 +69,10 @@ def clean_temp_files(temp_dir: str) -> bool:
 def validate_csv_file(file_path: str) -> Dict[str, Any]:
     """Validate CSV file format and structure"""
     try:
-        df = pd.read_csv(file_path, nrows=5)  # Read first 5 rows for validation
+        encoding = detect_file_encoding(file_path)
+        dialect = sniff_file_dialect(file_path, encoding)
+        with open_dataset(file_path) as raw:
+            df = parse_csv_stream(raw, encoding, dialect, nrows=5)  # Read first 5 rows for validation
         
         validation_result = {
             "is_valid": True,
@@ -92,18 +112,12 @@ def validate_csv_file(file_path: str) -> Dict[str, Any]:
 def preview_csv_file(file_path: str, max_rows: int = 5) -> Dict[str, Any]:
     """Generate preview of CSV file content"""
     try:
-        df = pd.read_csv(file_path, nrows=max_rows)
+        encoding = detect_file_encoding(file_path)
+        dialect = sniff_file_dialect(file_path, encoding)
+        with open_dataset(file_path) as raw:
+            df = parse_csv_stream(raw, encoding, dialect, nrows=max_rows)
         
-        preview_data = []
-        for _, row in df.iterrows():
-            row_dict = {}
-            for col in df.columns:
-                value = row[col]
-                if pd.isna(value):
-                    row_dict[col] = None
-                else:
-                    row_dict[col] = str(value)
-            preview_data.append(row_dict)
+        preview_data = frame_to_rows(df)
         
         return {
             "success": True,
@@ -122,28 +136,169 @@ def preview_csv_file(file_path: str, max_rows: int = 5) -> Dict[str, Any]:
             "preview_rows": 0
         }
 
-async def save_uploaded_file(file_content: bytes, filename: str, upload_dir: str = "uploads") -> str:
-    """Save uploaded file to specified directory"""
+def validate_dataset_file(file_path: str) -> Dict[str, Any]:
+    """Validate a CSV, JSONL or Parquet dataset file"""
+    if detect_format(file_path) == "csv":
+        return validate_csv_file(file_path)
+    try:
+        preview = build_dataset_preview(file_path, os.path.basename(file_path))
+        return {
+            "is_valid": not preview["validation_errors"],
+            "errors": preview["validation_errors"],
+            "warnings": [],
+            "columns": preview["columns"],
+            "row_count": preview["statistics"]["total_rows"],
+            "has_required_columns": preview["statistics"]["has_required_columns"]
+        }
+    except Exception as e:
+        return {
+            "is_valid": False,
+            "errors": [f"Failed to validate dataset: {str(e)}"],
+            "warnings": [],
+            "columns": [],
+            "row_count": 0,
+            "has_required_columns": False
+        }
+
+def preview_dataset_file(file_path: str, max_rows: int = 5) -> Dict[str, Any]:
+    """Generate preview of a CSV, JSONL or Parquet dataset file"""
+    if detect_format(file_path) == "csv":
+        return preview_csv_file(file_path, max_rows)
+    try:
+        preview = build_dataset_preview(file_path, os.path.basename(file_path), max_rows)
+        return {
+            "success": True,
+            "data": preview["data"],
+            "columns": preview["columns"],
+            "preview_rows": len(preview["data"])
+        }
+    except Exception as e:
+        logger.error(f"Failed to preview dataset {file_path}: {e}")
+        return {
+            "success": False,
+            "error": str(e),
+            "data": [],
+            "columns": [],
+            "preview_rows": 0
+        }
+
+class UploadRowCounter:
+    """Counts the data rows of a CSV or JSONL upload from its chunks as they arrive.
+
+    Compression is recognised from the stream's magic bytes, and gzip/zstd
+    chunks are decompressed incrementally before they reach the counter.
+    """
+
+    def __init__(self, file_format: str):
+        self.file_format = file_format
+        self.compression: Optional[str] = None
+        self._counter = StreamingCsvPreview(max_rows=0) if file_format == "csv" else RecordCounter(quotechar=None)
+        self._decompress = None
+        self._head = b""
+
+    def feed(self, chunk: bytes) -> None:
+        """Consume the next chunk of the upload as it was sent"""
+        if self._decompress is None:
+            self._head += chunk
+            if len(self._head) < MAGIC_BYTES:
+                return
+            self._start()
+            chunk, self._head = self._head, b""
+        self._counter.feed(self._decompress(chunk))
+
+    def finish(self) -> int:
+        """Data rows in the whole upload, excluding a CSV header"""
+        if self._decompress is None:
+            self._start()
+            self._counter.feed(self._decompress(self._head))
+            self._head = b""
+        if self.file_format == "csv":
+            self._counter.finish()
+            return self._counter.total_rows
+        return self._counter.records
+
+    def _start(self) -> None:
+        self.compression = sniff_compression(self._head)
+        self._decompress = make_decompressor(self.compression)
+
+
+async def _stream_upload(
+    upload: Any,
+    file_path: str,
+    chunk_size: int = CHUNK_SIZE,
+    counter: Optional[UploadRowCounter] = None
+) -> Dict[str, Any]:
+    """Copy an UploadFile to file_path chunk by chunk, hashing (and optionally counting) each chunk once"""
+    hasher = hashlib.sha256()
+    size = 0
     try:
-        # Ensure upload directory exists
-        ensure_directory_exists(upload_dir)
-        
-        # Generate unique filename to avoid conflicts
-        file_id = str(uuid.uuid4())[:8]
-        file_extension = Path(filename).suffix
-        safe_filename = f"{file_id}_{filename}"
-        file_path = os.path.join(upload_dir, safe_filename)
-        
-        # Save file asynchronously
         async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(file_content)
-        
-        logger.info(f"Successfully saved uploaded file: {safe_filename}")
-        return file_path
-        
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                size += len(chunk)
+                if counter is None:
+                    await f.write(chunk)
+                else:
+                    # Decompressing and counting run off the event loop while the chunk is written
+                    await asyncio.gather(f.write(chunk), asyncio.to_thread(counter.feed, chunk))
+    except Exception:
+        delete_file_safe(file_path)
+        raise
+    return {"path": file_path, "sha256": hasher.hexdigest(), "size_bytes": size}
+
+async def save_uploaded_file(
+    upload: Any,
+    filename: Optional[str] = None,
+    upload_dir: Optional[str] = None,
+    chunk_size: int = CHUNK_SIZE
+) -> Dict[str, Any]:
+    """Stream an UploadFile into the uploads directory, hashing and counting its rows on the way through.
+
+    Data is written under a temporary name and renamed into place once
+    complete, so a partial upload never appears under its final name.
+    Compressed uploads (gzip/zstd, recognised by their magic bytes) are
+    stored as sent; rows are counted on the decompressed stream.
+    """
+    filename = sanitize_filename(os.path.basename(filename or upload.filename or ""))
+    if not filename:
+        raise FileProcessingError("Uploaded file has no name")
+    upload_dir = upload_dir or os.path.join(get_uploads_directory(), "datasets")
+    ensure_directory_exists(upload_dir)
+
+    file_format = detect_format(filename)
+    counter = UploadRowCounter(file_format) if file_format in COMPRESSIBLE_FORMATS else None
+
+    file_id = uuid.uuid4().hex[:8]
+    tmp_path = os.path.join(upload_dir, f".{file_id}_{filename}.part")
+    saved = await _stream_upload(upload, tmp_path, chunk_size, counter)
+
+    file_path = os.path.join(upload_dir, f"{file_id}_{filename}")
+    try:
+        rows = counter.finish() if counter else None
+        os.replace(tmp_path, file_path)
     except Exception as e:
+        delete_file_safe(tmp_path)
         logger.error(f"Failed to save uploaded file {filename}: {e}")
-        raise e
+        raise
+    logger.info(f"Successfully saved uploaded file: {file_path} ({saved['size_bytes']} bytes)")
+    return {
+        "path": file_path,
+        "filePath": to_upload_url_path(file_path),
+        "filename": filename,
+        "sha256": saved["sha256"],
+        "size_bytes": saved["size_bytes"],
+        "rows": rows,
+        "compression": counter.compression if counter else None,
+    }
+
+async def spool_upload(upload: Any, directory: Optional[str] = None, chunk_size: int = CHUNK_SIZE) -> Dict[str, Any]:
+    """Stream an UploadFile to a temporary file, hashing it on the way through"""
+    directory = directory or get_temp_directory()
+    ensure_directory_exists(directory)
+    return await _stream_upload(upload, os.path.join(directory, f"upload_{uuid.uuid4().hex}"), chunk_size)
 
 def delete_file_safe(file_path: str) -> bool:
     """Safely delete a file with error handling"""
@@ -183,6 +338,40 @@ def get_temp_directory() -> str:
     ensure_directory_exists(temp_dir)
     return temp_dir
 
+def get_uploads_directory() -> str:
+    """Get or create the root directory that stored uploads live under"""
+    ensure_directory_exists(UPLOADS_DIR)
+    return UPLOADS_DIR
+
+def to_upload_url_path(file_path: str) -> str:
+    """Express a file inside the uploads directory as the /uploads/... path stored in datasets.json"""
+    relative = Path(file_path).resolve().relative_to(Path(UPLOADS_DIR).resolve())
+    return "/uploads/" + relative.as_posix()
+
+def resolve_upload_path(file_path: str) -> Optional[str]:
+    """Map a stored /uploads/... dataset path to the file on disk, if it exists"""
+    if not file_path:
+        return None
+    relative = file_path.replace("\\", "/").lstrip("/")
+    if relative.startswith("uploads/"):
+        relative = relative[len("uploads/"):]
+    uploads_root = Path(UPLOADS_DIR).resolve()
+    candidate = (uploads_root / relative).resolve()
+    if uploads_root not in candidate.parents or not candidate.is_file():
+        return None
+    return str(candidate)
+
+def hash_file(file_path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """SHA-256 of a file, read in chunks"""
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
 def cleanup_old_files(directory: str, max_age_hours: int = 24) -> int:
     """Clean up old files in directory older than specified hours"""
     import time
@@ -192,13 +381,13 @@ def cleanup_old_files(directory: str, max_age_hours: int = 24) -> int:
     max_age_seconds = max_age_hours * 3600
     
     try:
-        for filename in os.listdir(directory):
-            file_path = os.path.join(directory, filename)
-            if os.path.isfile(file_path):
-                file_age = current_time - os.path.getmtime(file_path)
-                if file_age > max_age_seconds:
-                    if delete_file_safe(file_path):
-                        cleaned_count += 1
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    file_age = current_time - entry.stat(follow_symlinks=False).st_mtime
+                    if file_age > max_age_seconds:
+                        if delete_file_safe(entry.path):
+                            cleaned_count += 1
     except Exception as e:
         logger.error(f"Failed to cleanup old files in {directory}: {e}")
     
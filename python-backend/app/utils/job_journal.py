@@ -0,0 +1,336 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Optional
+
+from app.utils.json_store import file_lock, file_version, write_durably
+from app.utils.sqlite_store import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_SUFFIX = ".journal.jsonl"
+
+# How often the background task folds the journal into jobs.json (0 disables it)
+JOURNAL_COMPACT_SECONDS = int(os.environ.get("FTDP_JOB_JOURNAL_COMPACT_SECONDS", "60"))
+
+# Key of the journal's first line, recording the sequence number of the last event folded into the snapshot
+_FOLDED_KEY = "folded"
+
+# Snapshot field older versions kept that number in; read once and dropped from jobs.json
+_LEGACY_FOLDED_SEQ = "_journalSeq"
+
+# Passes over snapshot + journal before a read settles for what it has
+_REFRESH_ATTEMPTS = 5
+
+
+def journal_path_for(snapshot_path: str) -> str:
+    return snapshot_path + JOURNAL_SUFFIX
+
+
+class JobJournal:
+    """jobs.json as a snapshot plus an append-only JSONL journal of create/update events.
+
+    Creating or updating a job appends one fsynced line under an advisory lock,
+    so its cost does not depend on how many jobs exist. Reads are served from
+    an in-memory view that applies only the journal bytes appended since the
+    last read; the view is rebuilt from snapshot + journal when another process
+    compacts. Compaction folds the journal into the snapshot (which keeps the
+    jobs.json layout untouched) and then restarts the journal with a header
+    line holding the last folded sequence number, followed by the events
+    appended since. A crash between the two leaves the old journal, whose
+    events are replayed over a snapshot that already has them: creates are
+    skipped by uid and updates set the same fields again, so replay is
+    idempotent.
+    """
+
+    def __init__(self, snapshot_path: str, compact_seconds: int = JOURNAL_COMPACT_SECONDS):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path_for(snapshot_path)
+        self.compact_seconds = compact_seconds
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._document: Optional[Dict[str, Any]] = None
+        self._by_uid: Dict[str, int] = {}
+        self._snapshot_version = None
+        self._folded_seq = 0
+        self._last_seq = 0
+        self._journal_ino: Optional[int] = None
+        self._offset = 0
+        self._header_bytes = 0
+        self.appended = 0
+        self.compactions = 0
+        self.last_compaction: Dict[str, Any] = {}
+
+    # View maintenance; callers hold self._lock
+
+    def _current_snapshot_version(self):
+        try:
+            return file_version(os.stat(self.snapshot_path))
+        except FileNotFoundError:
+            return None
+
+    def _load_snapshot(self, version) -> None:
+        document: Any = None
+        if version is not None:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                document = json.load(f)
+        if not isinstance(document, dict):
+            document = {"jobs": []}
+        if not isinstance(document.get("jobs"), list):
+            document["jobs"] = []
+        legacy_seq = document.pop(_LEGACY_FOLDED_SEQ, 0)
+        self._document = document
+        self._by_uid = {}
+        for position, job in enumerate(document["jobs"]):
+            if isinstance(job, dict) and job.get("uid") is not None:
+                self._by_uid.setdefault(job["uid"], position)
+        self._snapshot_version = version
+        self._folded_seq = self._last_seq = int(legacy_seq or 0)
+        self._journal_ino = None
+        self._offset = 0
+        self._header_bytes = 0
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        if _FOLDED_KEY in event:
+            self._folded_seq = max(self._folded_seq, int(event[_FOLDED_KEY]))
+            self._last_seq = max(self._last_seq, self._folded_seq)
+            return
+        seq = event.get("seq", 0)
+        if seq <= self._folded_seq:
+            return
+        self._last_seq = max(self._last_seq, seq)
+        jobs = self._document["jobs"]
+        if event.get("op") == "create":
+            job = event.get("job") or {}
+            uid = job.get("uid")
+            if uid is not None:
+                if uid in self._by_uid:
+                    return
+                self._by_uid[uid] = len(jobs)
+            jobs.append(job)
+        elif event.get("op") == "update":
+            position = self._by_uid.get(event.get("uid"))
+            if position is not None:
+                # Replace rather than mutate, so a reader holding the old record sees it whole
+                jobs[position] = {**jobs[position], **(event.get("changes") or {})}
+
+    def _read_tail(self) -> None:
+        """Apply journal lines appended since the last read; leaves a partially written last line alone"""
+        try:
+            f = open(self.journal_path, "rb")
+        except FileNotFoundError:
+            if self._offset:
+                self._document = None
+            return
+        with f:
+            ino = os.fstat(f.fileno()).st_ino
+            if self._journal_ino is not None and ino != self._journal_ino:
+                # Replaced by a compaction in another process; rebuild from the new snapshot
+                self._document = None
+                return
+            self._journal_ino = ino
+            f.seek(self._offset)
+            tail = f.read()
+        end = tail.rfind(b"\n") + 1
+        for position, line in enumerate(tail[:end].splitlines(keepends=True)):
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line)
+                self._apply(event)
+            except (json.JSONDecodeError, AttributeError, TypeError, ValueError) as e:
+                logger.warning(f"Skipping unreadable job journal entry: {e}")
+                continue
+            if position == 0 and self._offset == 0 and _FOLDED_KEY in event:
+                self._header_bytes = len(line)
+        self._offset += end
+
+    def _refresh(self) -> None:
+        for _ in range(_REFRESH_ATTEMPTS):
+            version = self._current_snapshot_version()
+            if self._document is None or version != self._snapshot_version:
+                self._load_snapshot(version)
+            self._read_tail()
+            if self._document is not None and self._current_snapshot_version() == version:
+                return
+            self._document = None
+        if self._document is None:
+            self._load_snapshot(self._current_snapshot_version())
+            self._read_tail()
+
+    # Reads
+
+    def load(self) -> Dict[str, Any]:
+        """jobs.json with every journaled event applied; shared, so it must not be mutated"""
+        with self._lock:
+            self._refresh()
+            return self._document
+
+    def get(self, uid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh()
+            position = self._by_uid.get(uid)
+            return self._document["jobs"][position] if position is not None else None
+
+    # Writes
+
+    def _append(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock, file_lock(self.journal_path):
+            self._refresh()
+            with open(self.journal_path, "ab") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size > self._offset:
+                    # A writer died mid-line; drop the torn bytes before appending
+                    logger.warning(f"Truncating {size - self._offset} torn bytes from {self.journal_path}")
+                    f.truncate(self._offset)
+                event = {"seq": self._last_seq + 1, **event}
+                data = (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8")
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+                self._journal_ino = os.fstat(f.fileno()).st_ino
+            self._offset += len(data)
+            self._apply(event)
+            self.appended += 1
+            return event
+
+    def append_create(self, job: Dict[str, Any]) -> None:
+        self._append({"op": "create", "job": job})
+
+    def append_update(self, uid: str, changes: Dict[str, Any]) -> bool:
+        """Journal field changes to an existing job; False if no job has that uid"""
+        if self.get(uid) is None:
+            return False
+        self._append({"op": "update", "uid": uid, "changes": changes})
+        return True
+
+    def _replace_journal(self, tail: bytes) -> int:
+        """Durably replace the journal with the given bytes; returns the new journal's inode"""
+        tmp_path = f"{self.journal_path}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(tail)
+                f.flush()
+                os.fsync(f.fileno())
+                ino = os.fstat(f.fileno()).st_ino
+            os.replace(tmp_path, self.journal_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if hasattr(os, "O_DIRECTORY"):
+            dir_fd = os.open(os.path.dirname(self.journal_path), os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        return ino
+
+    def compact(self) -> Dict[str, Any]:
+        """Fold the journal into the snapshot and restart the journal; safe to call from a worker thread.
+
+        Appends and reads wait only while the view is copied and while the journal
+        is swapped, not while the snapshot is serialized and fsynced. Events
+        appended meanwhile are carried over into the new journal.
+        """
+        started = time.monotonic()
+        # Serializes compactions across processes, so each writes a newer snapshot than the last
+        with file_lock(self.snapshot_path):
+            with self._lock:
+                self._refresh()
+                folded_seq = self._last_seq
+                events = folded_seq - self._folded_seq
+                if events == 0 and self._offset == self._header_bytes:
+                    return {"events": 0}
+                journal_ino, journal_offset = self._journal_ino, self._offset
+                # Jobs are replaced, never mutated, in the view, so a shallow copy is a stable snapshot
+                document = {**self._document, "jobs": list(self._document["jobs"])}
+
+            write_durably(self.snapshot_path, document)
+            snapshot_version = self._current_snapshot_version()
+
+            with self._lock, file_lock(self.journal_path):
+                try:
+                    with open(self.journal_path, "rb") as f:
+                        current_ino = os.fstat(f.fileno()).st_ino
+                        f.seek(journal_offset)
+                        tail = f.read()
+                except FileNotFoundError:
+                    current_ino, tail = None, b""
+                if journal_ino is None or current_ino == journal_ino:
+                    # Keep only what was appended after the copy; it all has seq > folded_seq
+                    header = (json.dumps({_FOLDED_KEY: folded_seq}) + "\n").encode("utf-8")
+                    new_ino = self._replace_journal(header + tail)
+                    view_current = self._journal_ino == current_ino and self._offset >= journal_offset
+                    self._snapshot_version = snapshot_version
+                    self._folded_seq = folded_seq
+                    if view_current:
+                        self._journal_ino = new_ino
+                        self._offset += len(header) - journal_offset
+                        self._header_bytes = len(header)
+                    else:
+                        self._document = None
+                else:
+                    # Replaced behind our back; replaying its events over the new snapshot is idempotent
+                    self._document = None
+                self.compactions += 1
+                self.last_compaction = {
+                    "events": events,
+                    "jobs": len(document["jobs"]),
+                    "duration_ms": round((time.monotonic() - started) * 1000, 1),
+                }
+        logger.info(f"Compacted job journal: {events} events into {len(document['jobs'])} jobs")
+        return self.last_compaction
+
+    # Background compaction
+
+    async def _run(self) -> None:
+        try:
+            # Replay snapshot + journal once at startup so the first request does not pay for it
+            await asyncio.to_thread(self.load)
+        except Exception as e:
+            logger.error(f"Job journal replay failed: {e}")
+        while True:
+            await asyncio.sleep(self.compact_seconds)
+            try:
+                await asyncio.to_thread(self.compact)
+            except Exception as e:
+                logger.error(f"Job journal compaction failed: {e}")
+
+    def start(self) -> None:
+        """Start compacting in the background on the running event loop"""
+        if self._task is None and self.compact_seconds > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            # Leave jobs.json complete for the Next.js routes that read it directly
+            try:
+                await asyncio.to_thread(self.compact)
+            except Exception as e:
+                logger.error(f"Job journal compaction failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "compact_seconds": self.compact_seconds,
+                "pending_events": self._last_seq - self._folded_seq,
+                "journal_bytes": self._offset,
+                "appended": self.appended,
+                "compactions": self.compactions,
+                "last_compaction": self.last_compaction,
+            }
+
+
+# Shared journal for src/data/jobs.json, compacted by the app lifespan
+job_journal = JobJournal(str(DATA_DIR / "jobs.json"))
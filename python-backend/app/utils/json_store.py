@@ -0,0 +1,306 @@
+import copy
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from app.core.exceptions import JsonStoreConflict
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+LOCK_SUFFIX = ".lock"
+
+# Read-modify-write attempts before an update gives up on a document that keeps changing
+JSON_UPDATE_RETRIES = int(os.environ.get("FTDP_JSON_UPDATE_RETRIES", "8"))
+
+# Re-reads of a file that does not parse, in case a writer that rewrites it in place was caught mid-write
+JSON_DECODE_RETRIES = 5
+
+_MISSING = object()
+
+# (st_mtime_ns, st_size, st_ino); a replace-by-rename always changes the inode
+Version = Tuple[int, int, int]
+
+
+def file_version(stat: os.stat_result) -> Version:
+    """Version of a file from its stat result, for cheap change detection"""
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+def lock_path_for(path: str) -> str:
+    """Sidecar file that writers lock; the data file itself is replaced on every write"""
+    return path + LOCK_SUFFIX
+
+
+@contextmanager
+def file_lock(path: str, shared: bool = False, blocking: bool = True) -> Iterator[None]:
+    """Advisory lock on path's sidecar, shared by every process writing path.
+
+    Exclusive unless shared is set; msvcrt has no shared locks, so shared holders
+    exclude each other there. With blocking=False a lock that is held elsewhere
+    raises BlockingIOError instead of waiting.
+    """
+    with open(lock_path_for(path), "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), (fcntl.LOCK_SH if shared else fcntl.LOCK_EX) | (0 if blocking else fcntl.LOCK_NB))
+        else:
+            f.seek(0)
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+            except OSError as e:
+                if blocking:
+                    raise
+                raise BlockingIOError(str(e)) from e
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def write_durably(path: str, document: Any) -> bytes:
+    """Write to a temp file in the same directory, fsync it, rename it over path, then fsync the directory.
+
+    Returns the bytes written.
+    """
+    data = json.dumps(document, indent=2, ensure_ascii=False).encode("utf-8")
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(os.path.dirname(path), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    return data
+
+
+class JsonStore:
+    """Parsed JSON documents kept in memory and revalidated with one os.stat per read.
+
+    A cached document is reused while the file's mtime, size and inode are
+    unchanged, so files rewritten by the Next.js API routes are still picked up.
+    Documents returned by load() are shared between requests and must not be
+    mutated. Writers use update(), which applies a change to a private copy and
+    commits it only if the file still has the version and the content that were
+    read, retrying otherwise; the compare-and-write runs under an advisory lock
+    on a sidecar file, so concurrent workers never lose each other's updates.
+    Content is compared by a digest of the bytes, because a rewrite of the same
+    size within one mtime tick onto a reused inode leaves the stat version unchanged.
+    """
+
+    def __init__(self, max_retries: int = JSON_UPDATE_RETRIES):
+        self.max_retries = max(1, max_retries)
+        self._documents: Dict[str, Tuple[Version, str, Any]] = {}
+        self._indexes: Dict[str, Dict[str, Tuple[Version, Dict[Any, Any]]]] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path: Any) -> str:
+        return os.path.abspath(os.fspath(path))
+
+    def _count(self, key: str, counter: str) -> None:
+        counters = self._counters.setdefault(
+            key, {"hits": 0, "misses": 0, "reloads": 0, "torn_reads": 0, "writes": 0, "conflicts": 0, "index_builds": 0}
+        )
+        counters[counter] += 1
+
+    def _read(self, key: str) -> Tuple[Optional[Version], Optional[str], Any]:
+        """(version, content digest, document) of a file, or (None, None, _MISSING) if it does not exist.
+
+        A file that does not parse is read again a few times, since a writer that
+        rewrites it in place may have been caught mid-write; if it never parses,
+        the last good copy is returned when there is one.
+        """
+        for attempt in range(JSON_DECODE_RETRIES):
+            try:
+                stat = os.stat(key)
+            except FileNotFoundError:
+                self._evict(key)
+                return None, None, _MISSING
+            version = file_version(stat)
+            with self._lock:
+                cached = self._documents.get(key)
+                if cached is not None and cached[0] == version:
+                    self._count(key, "hits")
+                    return cached
+                if attempt == 0:
+                    self._count(key, "reloads" if cached is not None else "misses")
+            with open(key, "rb") as f:
+                data = f.read()
+            try:
+                document = json.loads(data.decode("utf-8"))
+                break
+            except ValueError as e:
+                with self._lock:
+                    self._count(key, "torn_reads")
+                if attempt + 1 < JSON_DECODE_RETRIES:
+                    time.sleep(0.01 * (2 ** attempt))
+                    continue
+                if cached is None:
+                    raise
+                logger.warning(f"{os.path.basename(key)} does not parse ({e}); serving the last good copy")
+                return cached
+        entry = (version, _digest(data), document)
+        with self._lock:
+            self._documents[key] = entry
+        return entry
+
+    def _evict(self, key: str) -> None:
+        with self._lock:
+            self._documents.pop(key, None)
+            self._indexes.pop(key, None)
+
+    def _current_version(self, key: str) -> Optional[Version]:
+        try:
+            return file_version(os.stat(key))
+        except FileNotFoundError:
+            return None
+
+    def _unchanged(self, key: str, version: Optional[Version], digest: Optional[str]) -> bool:
+        """Whether the file still has the version and content that were read; callers hold the file lock"""
+        if self._current_version(key) != version:
+            return False
+        if version is None:
+            return True
+        with open(key, "rb") as f:
+            return _digest(f.read()) == digest
+
+    def _commit(self, key: str, document: Any) -> None:
+        data = write_durably(key, document)
+        with self._lock:
+            self._documents[key] = (file_version(os.stat(key)), _digest(data), document)
+            self._count(key, "writes")
+
+    def load(self, path: Any, default: Any = _MISSING) -> Any:
+        """Parsed contents of a JSON file, re-read only when the file changed.
+
+        Returns default when the file does not exist, or raises FileNotFoundError
+        if no default is given; json.JSONDecodeError propagates only when the
+        file never parses and no earlier copy of it was cached.
+        """
+        key = self._key(path)
+        _, _, document = self._read(key)
+        if document is _MISSING:
+            if default is _MISSING:
+                raise FileNotFoundError(key)
+            return default
+        return document
+
+    def index(self, path: Any, name: str, build: Callable[[Any], Dict[Any, Any]]) -> Dict[Any, Any]:
+        """Lookup table derived from a document by build(), kept with the cached document.
+
+        It is built at most once per version of the file, so lookups stay O(1)
+        however the file was changed; a missing file gives an empty table.
+        Like the document it indexes, the table is shared and must not be mutated.
+        """
+        key = self._key(path)
+        version, _, document = self._read(key)
+        if document is _MISSING:
+            return {}
+        with self._lock:
+            cached = self._indexes.get(key, {}).get(name)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+        table = build(document)
+        with self._lock:
+            self._indexes.setdefault(key, {})[name] = (version, table)
+            self._count(key, "index_builds")
+        return table
+
+    def update(self, path: Any, apply: Callable[[Any], Any], default: Any = _MISSING) -> Any:
+        """Optimistic read-modify-write of a document.
+
+        apply() receives a private deep copy (or default, if the file does not
+        exist) and returns the document to write, or None to leave the file as
+        it is. It may run more than once, so it must not have side effects.
+        Returns what apply() returned; raises JsonStoreConflict when the file
+        changed between read and write on every attempt.
+        """
+        key = self._key(path)
+        for attempt in range(self.max_retries):
+            version, digest, document = self._read(key)
+            if document is _MISSING:
+                if default is _MISSING:
+                    raise FileNotFoundError(key)
+                document = default
+            updated = apply(copy.deepcopy(document))
+            if updated is None:
+                return None
+            with file_lock(key):
+                if self._unchanged(key, version, digest):
+                    self._commit(key, updated)
+                    return updated
+            # Drop the cached copy too: it may match the stat version while the content differs
+            self._evict(key)
+            with self._lock:
+                self._count(key, "conflicts")
+            logger.info(f"{os.path.basename(key)} changed during update, retrying (attempt {attempt + 1})")
+            time.sleep(random.uniform(0, 0.005 * (2 ** attempt)))
+        raise JsonStoreConflict(f"{os.path.basename(key)} kept changing during update; try again")
+
+    def save(self, path: Any, document: Any) -> None:
+        """Durably replace a document regardless of its current contents; the caller must not modify it afterwards"""
+        key = self._key(path)
+        with file_lock(key):
+            self._commit(key, document)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._documents.clear()
+            self._indexes.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "documents": len(self._documents),
+                "files": {key: dict(counters) for key, counters in self._counters.items()},
+            }
+
+
+def index_records(records: Any, fields: Tuple[str, ...], key: Callable[[Any], Any] = lambda value: value) -> Dict[Any, Any]:
+    """Records by each value of the given fields; the first record with a value wins, as in a linear scan"""
+    table: Dict[Any, Any] = {}
+    if not isinstance(records, list):
+        return table
+    for record in records:
+        if not isinstance(record, dict):
+            continue
+        for field in fields:
+            value = record.get(field)
+            if isinstance(value, (str, int, float)):
+                table.setdefault(key(value), record)
+    return table
+
+
+# Shared instance used by the services that read src/data
+json_store = JsonStore()
@@ -0,0 +1,91 @@
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.utils.dataset_formats import detect_format
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_CACHE_MAX_ENTRIES = int(os.environ.get("FTDP_PREVIEW_CACHE_ENTRIES", "256"))
+PREVIEW_CACHE_MAX_BYTES = int(os.environ.get("FTDP_PREVIEW_CACHE_MB", "64")) * 1024 * 1024
+
+
+class PreviewCache:
+    """LRU cache of preview responses keyed by upload content hash.
+
+    Bounded both by entry count and by the approximate serialized size of the
+    cached responses.
+    """
+
+    def __init__(self, max_entries: int = PREVIEW_CACHE_MAX_ENTRIES, max_bytes: int = PREVIEW_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached response for key, marking it most recently used"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a response, evicting least recently used entries to stay within bounds"""
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            logger.info(f"Preview for {key[:12]} too large to cache ({size} bytes)")
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self.total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def preview_cache_key(content_hash: str, filename: str, **options: Any) -> str:
+    """Cache key for a content hash, the format its filename selects and the options that shape the preview.
+
+    The same bytes previewed as .csv and as .jsonl are parsed differently, so they never share an entry.
+    """
+    suffix = ",".join(f"{name}={options[name]}" for name in sorted(options))
+    return f"{content_hash}:{detect_format(filename)}:{suffix}"
+
+
+# Shared instance used by the preview endpoints
+preview_cache = PreviewCache()
@@ -0,0 +1,68 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional, Sequence
+
+from app.utils.compression import is_compressed
+from app.utils.csv_preview import DEFAULT_PREVIEW_ROWS
+from app.utils.csv_scan import count_range, reconcile_range_counts, split_byte_ranges
+from app.utils.dataset_formats import PREVIEW_CELL_CHARS, build_dataset_preview, detect_format
+from app.utils.worker_pool import csv_pool
+
+logger = logging.getLogger(__name__)
+
+# CSV/JSONL files at least this large have their rows counted across the worker pool
+PARALLEL_COUNT_MIN_BYTES = int(os.environ.get("FTDP_PARALLEL_COUNT_MIN_MB", "256")) * 1024 * 1024
+
+
+async def count_file_records(file_path: str, quotechar: Optional[bytes] = b'"', parts: Optional[int] = None) -> int:
+    """Exact record count (header included), one byte range per worker"""
+    ranges = split_byte_ranges(os.path.getsize(file_path), parts or csv_pool.max_workers)
+    results = await asyncio.gather(*(
+        csv_pool.run(count_range, file_path, start, end, quotechar) for start, end in ranges
+    ))
+    return reconcile_range_counts(list(results))
+
+
+async def run_dataset_preview(
+    file_path: str,
+    filename: str,
+    preview_rows: int = DEFAULT_PREVIEW_ROWS,
+    max_cell_chars: Optional[int] = PREVIEW_CELL_CHARS,
+    columns: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """Build a dataset preview in the worker pool, counting rows of large files in parallel.
+
+    Compressed files are only inflated as far as the preview rows, so their
+    total_rows is left as None.
+    """
+    file_format = detect_format(filename)
+    if file_format in ("csv", "jsonl") and is_compressed(file_path):
+        return await csv_pool.run(
+            build_dataset_preview, file_path, filename, preview_rows,
+            count_rows=False, max_cell_chars=max_cell_chars, columns=columns
+        )
+    if (
+        file_format not in ("csv", "jsonl")
+        or csv_pool.max_workers < 2
+        or os.path.getsize(file_path) < PARALLEL_COUNT_MIN_BYTES
+    ):
+        return await csv_pool.run(
+            build_dataset_preview, file_path, filename, preview_rows,
+            max_cell_chars=max_cell_chars, columns=columns
+        )
+
+    preview = await csv_pool.run(
+        build_dataset_preview, file_path, filename, preview_rows,
+        count_rows=False, max_cell_chars=max_cell_chars, columns=columns
+    )
+    if file_format == "csv":
+        quotechar = preview["dialect"]["quotechar"].encode(preview["encoding"])
+        header_rows = 1 if preview["dialect"]["has_header"] else 0
+    else:
+        quotechar = None
+        header_rows = 0
+    records = await count_file_records(file_path, quotechar)
+    preview["statistics"]["total_rows"] = max(records - header_rows, 0)
+    logger.info(f"Counted {records} records in {filename} across {csv_pool.max_workers} workers")
+    return preview
@@ -0,0 +1,238 @@
+import csv
+import hashlib
+import io
+import json
+import logging
+import mmap
+import os
+import struct
+import uuid
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.exceptions import FileProcessingError
+from app.utils.arrow_store import open_arrow_table
+from app.utils.compression import open_dataset
+from app.utils.csv_dialect import read_file_header, sniff_file_dialect
+from app.utils.csv_encoding import decode_text, detect_file_encoding
+from app.utils.csv_preview import MAX_HEAD_BYTES
+from app.utils.csv_scan import iter_record_starts
+from app.utils.dataset_formats import cell_to_str, detect_format
+from app.utils.file_utils import UPLOADS_DIR, ensure_directory_exists
+
+logger = logging.getLogger(__name__)
+
+# Sidecar indexes live here, one per stored dataset file
+INDEX_DIR = os.environ.get("FTDP_ROW_INDEX_DIR", str(Path(UPLOADS_DIR) / ".index"))
+
+INDEX_MAGIC = b"FTDPRIX1"
+
+# magic, dataset size, dataset mtime_ns, row count, metadata length
+_HEADER = struct.Struct("=8sQQQQ")
+
+
+def index_path_for(file_path: str) -> str:
+    """Sidecar index location for a dataset file"""
+    absolute = os.path.abspath(file_path)
+    digest = hashlib.sha1(absolute.encode("utf-8")).hexdigest()[:16]
+    return str(Path(INDEX_DIR) / f"{digest}_{os.path.basename(absolute)}.rowidx")
+
+
+def _padded(length: int) -> int:
+    return (length + 7) // 8 * 8
+
+
+class RowIndex:
+    """Memory-mapped row-offset index: row i spans bytes offsets[i]..offsets[i + 1] of the dataset.
+
+    File layout: header, JSON metadata (encoding, dialect, columns) padded to
+    8 bytes, then row_count + 1 native uint64 offsets, the last being the
+    dataset size.
+    """
+
+    def __init__(self, index_path: str):
+        self._file = open(index_path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise FileProcessingError(f"Row index is empty: {index_path}")
+        magic, self.file_size, self.mtime_ns, self.rows, meta_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != INDEX_MAGIC:
+            self.close()
+            raise FileProcessingError(f"Not a row index: {index_path}")
+        meta_start = _HEADER.size
+        self.meta: Dict[str, Any] = json.loads(self._mmap[meta_start:meta_start + meta_length])
+        self._offsets = memoryview(self._mmap)[meta_start + _padded(meta_length):].cast("Q")
+
+    def is_current(self, file_path: str) -> bool:
+        """Whether the index still describes the dataset file on disk"""
+        stat = os.stat(file_path)
+        return stat.st_size == self.file_size and stat.st_mtime_ns == self.mtime_ns
+
+    def span(self, start: int, stop: int) -> Tuple[int, int]:
+        """Byte range holding rows [start, stop)"""
+        start = max(0, min(start, self.rows))
+        stop = max(start, min(stop, self.rows))
+        return self._offsets[start], self._offsets[stop]
+
+    def close(self) -> None:
+        if hasattr(self, "_offsets"):
+            self._offsets.release()
+        self._mmap.close()
+        self._file.close()
+
+
+def build_row_index(file_path: str, filename: str) -> str:
+    """Scan a CSV or JSONL dataset once and write its sidecar row-offset index"""
+    file_format = detect_format(filename)
+    if file_format == "csv":
+        encoding = detect_file_encoding(file_path)
+        dialect = sniff_file_dialect(file_path, encoding)
+        columns, data_start, _ = read_file_header(file_path, dialect, encoding, MAX_HEAD_BYTES)
+        quotechar: Optional[bytes] = dialect["quotechar"].encode(encoding)
+        meta = {"format": "csv", "encoding": encoding, "dialect": dialect, "columns": columns}
+    elif file_format == "jsonl":
+        data_start = 0
+        quotechar = None
+        meta = {"format": "jsonl", "encoding": "utf-8"}
+    else:
+        raise FileProcessingError(f"Row indexes are only built for CSV and JSONL files: {filename}")
+
+    stat = os.stat(file_path)
+    offsets = array("Q")
+    with open_dataset(file_path) as f:
+        f.seek(data_start)
+        offsets.extend(iter_record_starts(f, quotechar, start=data_start))
+        # Offsets are into the decompressed stream, so the end is where the scan stopped
+        offsets.append(f.tell())
+
+    meta_bytes = json.dumps(meta).encode("utf-8")
+    index_path = index_path_for(file_path)
+    ensure_directory_exists(str(Path(index_path).parent))
+    tmp_path = f"{index_path}.{uuid.uuid4().hex[:8]}.tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(offsets) - 1, len(meta_bytes)))
+        out.write(meta_bytes.ljust(_padded(len(meta_bytes)), b"\0"))
+        offsets.tofile(out)
+    os.replace(tmp_path, index_path)
+    logger.info(f"Built row index for {filename}: {len(offsets) - 1} rows")
+    return index_path
+
+
+def open_row_index(file_path: str, filename: str) -> RowIndex:
+    """Open the dataset's row index, (re)building it if missing or stale"""
+    index_path = index_path_for(file_path)
+    if os.path.exists(index_path):
+        try:
+            index = RowIndex(index_path)
+            if index.is_current(file_path):
+                return index
+            index.close()
+        except (FileProcessingError, struct.error, ValueError):
+            logger.warning(f"Discarding unreadable row index {index_path}")
+    return RowIndex(build_row_index(file_path, filename))
+
+
+def delete_row_index(file_path: str) -> bool:
+    """Remove a dataset's sidecar index, if any"""
+    try:
+        os.remove(index_path_for(file_path))
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def parse_rows(data: bytes, meta: Dict[str, Any]) -> Tuple[List[str], List[Dict[str, Any]]]:
+    """Columns and text rows of whole records read from an indexed file, decoded as the index describes"""
+    text = decode_text(data, meta["encoding"])
+    if meta["format"] == "jsonl":
+        columns: List[str] = []
+        records = []
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = None
+            if not isinstance(record, dict):
+                record = {}
+            for key in record:
+                if key not in columns:
+                    columns.append(key)
+            records.append(record)
+        return columns, [{col: cell_to_str(record.get(col)) for col in columns} for record in records]
+
+    columns = meta["columns"]
+    dialect = meta["dialect"]
+    reader = csv.reader(io.StringIO(text, newline=""), delimiter=dialect["delimiter"], quotechar=dialect["quotechar"])
+    rows = []
+    for fields in reader:
+        if not fields:
+            continue
+        fields = fields + [None] * (len(columns) - len(fields))
+        rows.append(dict(zip(columns, fields)))
+    return columns, rows
+
+
+def _read_parquet_rows(file_path: str, offset: int, limit: int) -> Dict[str, Any]:
+    """Parquet already stores row-group row counts, so only the overlapping groups are read"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise FileProcessingError("Parquet support requires the optional 'pyarrow' package")
+
+    parquet_file = pq.ParquetFile(file_path)
+    metadata = parquet_file.metadata
+    columns = [str(name) for name in parquet_file.schema_arrow.names]
+    rows: List[Dict[str, Any]] = []
+    group_start = 0
+    for group in range(metadata.num_row_groups):
+        group_rows = metadata.row_group(group).num_rows
+        group_end = group_start + group_rows
+        if group_end > offset and len(rows) < limit:
+            table = parquet_file.read_row_group(group)
+            first = max(offset - group_start, 0)
+            for record in table.slice(first, limit - len(rows)).to_pylist():
+                rows.append({col: cell_to_str(record.get(col)) for col in columns})
+        group_start = group_end
+        if len(rows) >= limit:
+            break
+    return {"format": "parquet", "columns": columns, "rows": rows, "total_rows": metadata.num_rows}
+
+
+def read_rows(file_path: str, filename: str, offset: int, limit: int) -> Dict[str, Any]:
+    """Rows [offset, offset + limit) of a stored dataset with one seek; runs in a worker process.
+
+    A current Arrow copy, when present, is sliced directly without parsing any text.
+    """
+    file_format = detect_format(filename)
+    table = open_arrow_table(file_path) if file_format != "parquet" else None
+    if table is not None:
+        result = {
+            "format": file_format,
+            "columns": table.column_names,
+            "rows": table.slice(offset, limit).to_pylist(),
+            "total_rows": table.num_rows,
+        }
+    elif file_format == "parquet":
+        result = _read_parquet_rows(file_path, offset, limit)
+    else:
+        index = open_row_index(file_path, filename)
+        try:
+            start, end = index.span(offset, offset + limit)
+            with open_dataset(file_path) as f:
+                f.seek(start)
+                data = f.read(end - start)
+            columns, rows = parse_rows(data, index.meta)
+            result = {
+                "format": index.meta["format"],
+                "columns": index.meta.get("columns", columns),
+                "rows": rows,
+                "total_rows": index.rows,
+            }
+        finally:
+            index.close()
+    return {**result, "offset": offset, "limit": limit}
@@ -0,0 +1,208 @@
+import csv
+import json
+import logging
+import math
+import os
+import random
+import struct
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.exceptions import FileProcessingError
+from app.utils.arrow_store import open_arrow_table
+from app.utils.compression import is_compressed, open_dataset
+from app.utils.csv_dialect import read_file_header, sniff_file_dialect
+from app.utils.csv_encoding import DecodingReader, detect_file_encoding
+from app.utils.csv_preview import MAX_HEAD_BYTES
+from app.utils.dataset_formats import cell_to_str, detect_format
+from app.utils.row_index import RowIndex, parse_rows, index_path_for
+
+logger = logging.getLogger(__name__)
+
+
+def _uniform(rng: random.Random) -> float:
+    """Uniform draw from the open interval (0, 1)"""
+    while True:
+        value = rng.random()
+        if value > 0.0:
+            return value
+
+
+def reservoir_sample(items: Iterator[Any], k: int, rng: random.Random) -> Tuple[List[Tuple[int, Any]], int]:
+    """k uniformly random (position, item) pairs from a stream in one pass, and the stream length.
+
+    Uses Li's Algorithm L: after the reservoir fills, the number of items to
+    skip before the next replacement is drawn directly, so only O(k log(n/k))
+    random numbers are needed and skipped items are never kept.
+    """
+    numbered = enumerate(items)
+    reservoir = list(islice(numbered, k))
+    seen = len(reservoir)
+    if seen < k or k == 0:
+        return reservoir, seen + sum(1 for _ in numbered)
+    w = math.exp(math.log(_uniform(rng)) / k)
+    while True:
+        skip = int(math.log(_uniform(rng)) / math.log(1.0 - w))
+        skipped = sum(1 for _ in islice(numbered, skip))
+        seen += skipped
+        if skipped < skip:
+            break
+        picked = next(numbered, None)
+        if picked is None:
+            break
+        seen += 1
+        reservoir[rng.randrange(k)] = picked
+        w *= math.exp(math.log(_uniform(rng)) / k)
+    return reservoir, seen
+
+
+def _csv_records(file_path: str) -> Tuple[List[str], Iterator[List[str]]]:
+    encoding = detect_file_encoding(file_path)
+    dialect = sniff_file_dialect(file_path, encoding)
+    columns, data_start, _ = read_file_header(file_path, dialect, encoding, MAX_HEAD_BYTES)
+
+    def records() -> Iterator[List[str]]:
+        with open_dataset(file_path) as raw:
+            raw.seek(data_start)
+            reader = csv.reader(
+                DecodingReader(raw, encoding), delimiter=dialect["delimiter"], quotechar=dialect["quotechar"]
+            )
+            for fields in reader:
+                if fields:
+                    yield fields
+    return columns, records()
+
+
+def _jsonl_lines(file_path: str) -> Iterator[bytes]:
+    """Non-blank lines, left unparsed so skipped lines cost no JSON decoding"""
+    with open_dataset(file_path) as raw:
+        for line in raw:
+            if line.strip():
+                yield line
+
+
+def _sample_stream(file_path: str, file_format: str, k: int, rng: random.Random) -> Dict[str, Any]:
+    if file_format == "csv":
+        columns, records = _csv_records(file_path)
+        picked, total = reservoir_sample(records, k, rng)
+        picked.sort()
+        rows = [
+            {col: fields[i] if i < len(fields) else None for i, col in enumerate(columns)}
+            for _, fields in picked
+        ]
+    else:
+        picked, total = reservoir_sample(_jsonl_lines(file_path), k, rng)
+        picked.sort()
+        columns = []
+        records = []
+        for _, line in picked:
+            try:
+                record = json.loads(line.decode('utf-8-sig', errors='replace'))
+            except json.JSONDecodeError:
+                record = None
+            if not isinstance(record, dict):
+                record = {}
+            columns.extend(key for key in record if key not in columns)
+            records.append(record)
+        rows = [{col: cell_to_str(record.get(col)) for col in columns} for record in records]
+    return {
+        "method": "reservoir",
+        "columns": columns,
+        "row_numbers": [position for position, _ in picked],
+        "rows": rows,
+        "total_rows": total,
+    }
+
+
+def _open_current_index(file_path: str) -> Optional[RowIndex]:
+    """The dataset's row index if one has already been built and is current; never builds one"""
+    index_path = index_path_for(file_path)
+    if not os.path.exists(index_path) or is_compressed(file_path):
+        return None
+    try:
+        index = RowIndex(index_path)
+    except (FileProcessingError, struct.error, ValueError):
+        return None
+    if index.is_current(file_path):
+        return index
+    index.close()
+    return None
+
+
+def _sample_index(file_path: str, index: RowIndex, k: int, rng: random.Random) -> Dict[str, Any]:
+    numbers = sorted(rng.sample(range(index.rows), min(k, index.rows)))
+    columns: List[str] = list(index.meta.get("columns", []))
+    rows = []
+    with open(file_path, "rb") as f:
+        for number in numbers:
+            start, end = index.span(number, number + 1)
+            f.seek(start)
+            row_columns, parsed = parse_rows(f.read(end - start), index.meta)
+            columns.extend(col for col in row_columns if col not in columns)
+            rows.append(parsed[0] if parsed else {})
+    if index.meta["format"] == "jsonl":
+        rows = [{col: row.get(col) for col in columns} for row in rows]
+    return {"method": "index", "columns": columns, "row_numbers": numbers, "rows": rows, "total_rows": index.rows}
+
+
+def _sample_parquet(file_path: str, k: int, rng: random.Random) -> Dict[str, Any]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise FileProcessingError("Parquet support requires the optional 'pyarrow' package")
+    parquet_file = pq.ParquetFile(file_path)
+    metadata = parquet_file.metadata
+    columns = [str(name) for name in parquet_file.schema_arrow.names]
+    numbers = sorted(rng.sample(range(metadata.num_rows), min(k, metadata.num_rows)))
+    rows: List[Dict[str, Any]] = []
+    group_start = 0
+    position = 0
+    for group in range(metadata.num_row_groups):
+        group_end = group_start + metadata.row_group(group).num_rows
+        local = []
+        while position < len(numbers) and numbers[position] < group_end:
+            local.append(numbers[position] - group_start)
+            position += 1
+        if local:
+            # Only row groups holding a sampled row are read
+            for record in parquet_file.read_row_group(group).take(local).to_pylist():
+                rows.append({col: cell_to_str(record.get(col)) for col in columns})
+        group_start = group_end
+    return {"method": "parquet", "columns": columns, "row_numbers": numbers, "rows": rows, "total_rows": metadata.num_rows}
+
+
+def sample_rows(file_path: str, filename: str, k: int, seed: int) -> Dict[str, Any]:
+    """k uniformly random rows of a stored dataset in memory bounded by k; runs in a worker process.
+
+    Rows are drawn directly when the row count is already known (Arrow copy,
+    existing row index, Parquet metadata), otherwise by one reservoir-sampling
+    pass. The same seed and method always return the same rows.
+    """
+    file_format = detect_format(filename)
+    if file_format not in ("csv", "jsonl", "parquet"):
+        raise FileProcessingError(f"Unsupported file type: {filename}")
+    rng = random.Random(seed)
+
+    if file_format == "parquet":
+        result = _sample_parquet(file_path, k, rng)
+    else:
+        table = open_arrow_table(file_path)
+        index = None if table is not None else _open_current_index(file_path)
+        if table is not None:
+            numbers = sorted(rng.sample(range(table.num_rows), min(k, table.num_rows)))
+            result = {
+                "method": "arrow",
+                "columns": table.column_names,
+                "row_numbers": numbers,
+                "rows": table.take(numbers).to_pylist(),
+                "total_rows": table.num_rows,
+            }
+        elif index is not None:
+            try:
+                result = _sample_index(file_path, index, k, rng)
+            finally:
+                index.close()
+        else:
+            result = _sample_stream(file_path, file_format, k, rng)
+    logger.info(f"Sampled {len(result['rows'])} of {result['total_rows']} rows from {filename} ({result['method']})")
+    return {"format": file_format, **result, "k": k, "seed": seed}
@@ -0,0 +1,523 @@
+import argparse
+import copy
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from app.utils.json_store import write_durably
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parents[3] / "src" / "data"
+
+# "json" keeps src/data/*.json as the store of record; "sqlite" moves it to SQLITE_PATH, with the
+# JSON files kept as an export format
+STORAGE_BACKEND = os.environ.get("FTDP_STORAGE_BACKEND", "json")
+SQLITE_ENABLED = STORAGE_BACKEND == "sqlite"
+
+# Rewrite the JSON file a write touched before it commits, and import files changed on disk. Off by
+# default: each mirrored write costs a whole-file rewrite again, and the Next.js routes read through
+# the backend API anyway. Only for deployments where something else still reads src/data directly.
+SQLITE_MIRROR_JSON = os.environ.get("FTDP_SQLITE_MIRROR_JSON", "0") != "0"
+
+SQLITE_PATH = os.environ.get("FTDP_SQLITE_PATH", str(DATA_DIR / "ftdp.sqlite3"))
+
+# Data file -> (record collection, key of the record container; "" for a top-level list)
+DATA_FILES: Dict[str, Tuple[Optional[str], Optional[str]]] = {
+    "datasets.json": ("datasets", ""),
+    "models.json": ("models", "models"),
+    "jobs.json": ("jobs", "jobs"),
+    "current-jobs.json": ("current-jobs", "jobs"),
+    "past-jobs.json": ("past-jobs", "jobs"),
+    "hyperparameter-config.json": ("hyperparameters", "configs"),
+    "metadata.json": (None, None),
+}
+
+_SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    name TEXT PRIMARY KEY,
+    body TEXT,
+    records_type TEXT
+);
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    collection TEXT NOT NULL,
+    uid TEXT,
+    alias TEXT,
+    position INTEGER NOT NULL,
+    status TEXT,
+    created_at TEXT,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_uid ON records (collection, uid, position);
+CREATE INDEX IF NOT EXISTS records_alias ON records (collection, alias, position);
+CREATE INDEX IF NOT EXISTS records_status ON records (collection, status);
+CREATE INDEX IF NOT EXISTS records_created_at ON records (collection, created_at);
+CREATE INDEX IF NOT EXISTS records_position ON records (collection, position);
+CREATE TABLE IF NOT EXISTS mirrors (
+    name TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+"""
+
+
+def _text(value: Any) -> Optional[str]:
+    return None if value is None or value == "" else str(value)
+
+
+def _record_columns(record: Any, key: Optional[str] = None) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
+    """(uid, alias, status, created_at) of a record; records are found by uid, or by id where both exist"""
+    if not isinstance(record, dict):
+        return _text(key), None, None, None
+    uid = _text(key) or _text(record.get("uid")) or _text(record.get("id"))
+    alias = _text(record.get("id"))
+    return uid, alias if alias != uid else None, _text(record.get("status")), _text(record.get("createdAt"))
+
+
+# One branch per index; an OR of the two would make SQLite walk the collection in position order
+_FIND_RECORD = """
+SELECT id, uid, body, position FROM records WHERE collection = :collection AND uid = :uid
+UNION ALL
+SELECT id, uid, body, position FROM records WHERE collection = :collection AND alias = :uid
+ORDER BY position LIMIT 1
+"""
+
+_RECORD_IDS = """
+SELECT id FROM records WHERE collection = :collection AND uid = :uid
+UNION
+SELECT id FROM records WHERE collection = :collection AND alias = :uid
+"""
+
+
+def _collection_for(name: str) -> Tuple[Optional[str], Optional[str]]:
+    return DATA_FILES.get(name, (None, None))
+
+
+def _file_for(collection: str) -> str:
+    return next(name for name, (col, _) in DATA_FILES.items() if col == collection)
+
+
+def _signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class SqliteStore:
+    """Records of the src/data JSON files in one SQLite database in WAL mode.
+
+    Each list entry of a data file (dataset, model, job, hyperparameter config)
+    is a row indexed by uid, status and createdAt; whatever else the file holds
+    is kept as its document, with the record container left as a placeholder
+    so load_document() returns the file exactly as it was imported.
+
+    A new database imports the JSON files once, under the write lock. With
+    mirror_json the files also stay in step with the database afterwards: a
+    write rewrites the files it touched before it commits, and a file changed
+    by someone else is imported again on its next use.
+    """
+
+    def __init__(
+        self,
+        db_path: str = SQLITE_PATH,
+        mirror_json: bool = SQLITE_MIRROR_JSON,
+        import_on_create: bool = True,
+        data_dir: str = str(DATA_DIR)
+    ):
+        self.db_path = db_path
+        self.mirror_json = mirror_json
+        self.import_on_create = import_on_create
+        self.data_dir = data_dir
+        self._local = threading.local()
+        # Data file -> signature last seen matching the database, so a read in step costs one os.stat
+        self._seen: Dict[str, Optional[Tuple[int, int]]] = {}
+        self.imports = 0
+        self.exports = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+            self._local.dirty = set()
+            if conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+                # Checked again under the write lock, so only one worker creates or upgrades the schema
+                with self.transaction() as tx:
+                    version = tx.execute("PRAGMA user_version").fetchone()[0]
+                    if version < _SCHEMA_VERSION:
+                        for statement in _SCHEMA.split(";"):
+                            if statement.strip():
+                                tx.execute(statement)
+                        tx.execute(f"PRAGMA user_version={_SCHEMA_VERSION}")
+                        if not version and self.import_on_create:
+                            self._import_files(tx)
+                        elif version and self.mirror_json:
+                            # Databases from before mirroring may hold writes the JSON files never saw
+                            stored = [name for (name,) in tx.execute("SELECT name FROM documents")]
+                            logger.info(f"Upgraded {self.db_path}; exporting {stored} to {self.data_dir}")
+                            self._local.dirty.update(stored)
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction that takes the database write lock up front.
+
+        The JSON files it touched are rewritten before it commits, so they are
+        written in commit order and a failed export rolls the write back.
+        """
+        conn = getattr(self._local, "conn", None) or self._connect()
+        if conn.in_transaction:
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            self._export_dirty(conn)
+        except BaseException:
+            self._local.dirty.clear()
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # JSON mirror
+
+    def _mark(self, name: str) -> None:
+        """Export a data file when the current transaction commits"""
+        if self.mirror_json:
+            self._local.dirty.add(name)
+
+    def _record_mirror(self, conn: sqlite3.Connection, name: str, signature: Tuple[int, int]) -> None:
+        conn.execute(
+            "INSERT OR REPLACE INTO mirrors (name, mtime_ns, size) VALUES (?, ?, ?)", (name, *signature)
+        )
+        self._seen[name] = signature
+
+    def _export_dirty(self, conn: sqlite3.Connection) -> None:
+        dirty = self._local.dirty
+        while dirty:
+            name = dirty.pop()
+            path = os.path.join(self.data_dir, name)
+            write_durably(path, self._load(conn, name))
+            self._record_mirror(conn, name, _signature(path))
+            self.exports += 1
+
+    def _import_files(self, conn: sqlite3.Connection) -> None:
+        """First import of the JSON data files into a new database; runs in the schema transaction"""
+        imported = []
+        for name in DATA_FILES:
+            path = os.path.join(self.data_dir, name)
+            signature = _signature(path)
+            if signature is None:
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                self._replace(conn, name, json.load(f))
+            self._record_mirror(conn, name, signature)
+            imported.append(name)
+        logger.info(f"Created {self.db_path}; imported {imported} from {self.data_dir}")
+
+    def _sync(self, name: str) -> None:
+        """Import a data file again if it changed since the database last matched it"""
+        if not self.mirror_json:
+            return
+        conn = self._connect()
+        path = os.path.join(self.data_dir, name)
+        signature = _signature(path)
+        if signature is None or (self._seen.get(name) == signature and not conn.in_transaction):
+            return
+        with self.transaction() as tx:
+            # Re-read under the write lock: another worker may already have imported or written it
+            signature = _signature(path)
+            row = tx.execute("SELECT mtime_ns, size FROM mirrors WHERE name = ?", (name,)).fetchone()
+            if signature is None or row == signature:
+                self._seen[name] = signature
+                return
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    document = json.load(f)
+            except ValueError as e:
+                # Most likely caught mid-write by a non-atomic writer; keep the database copy and retry next time
+                logger.warning(f"Not importing {path}: {e}")
+                return
+            self._replace(tx, name, document)
+            self._record_mirror(tx, name, signature)
+            self.imports += 1
+            logger.info(f"Imported {name} into {self.db_path} after it changed on disk")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "db_path": self.db_path,
+            "mirror_json": self.mirror_json,
+            "imports": self.imports,
+            "exports": self.exports,
+        }
+
+    # Records
+
+    def list_records(self, collection: str, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Records of a collection in file order, optionally only those with a given status"""
+        self._sync(_file_for(collection))
+        conn = self._connect()
+        if status is None:
+            rows = conn.execute(
+                "SELECT body FROM records WHERE collection = ? ORDER BY position", (collection,)
+            )
+        else:
+            rows = conn.execute(
+                "SELECT body FROM records WHERE collection = ? AND status = ? ORDER BY position", (collection, status)
+            )
+        return [json.loads(body) for (body,) in rows]
+
+    def get_record(self, collection: str, uid: Any) -> Optional[Dict[str, Any]]:
+        """First record whose uid (or id) matches"""
+        self._sync(_file_for(collection))
+        row = self._connect().execute(_FIND_RECORD, {"collection": collection, "uid": str(uid)}).fetchone()
+        return json.loads(row[2]) if row else None
+
+    def status_counts(self, collection: str) -> Dict[str, int]:
+        self._sync(_file_for(collection))
+        rows = self._connect().execute(
+            "SELECT status, COUNT(*) FROM records WHERE collection = ? GROUP BY status", (collection,)
+        )
+        return {status or "": count for status, count in rows}
+
+    def _ensure_document(self, conn: sqlite3.Connection, collection: str) -> None:
+        """Give a collection its file document, so a record added to a missing file can be exported"""
+        name = _file_for(collection)
+        _, key = DATA_FILES[name]
+        body = None if key == "" else json.dumps({key: None})
+        conn.execute(
+            "INSERT OR IGNORE INTO documents (name, body, records_type) VALUES (?, ?, 'list')", (name, body)
+        )
+
+    def _insert(self, conn: sqlite3.Connection, collection: str, position: int, record: Any, key: Optional[str] = None) -> None:
+        uid, alias, status, created_at = _record_columns(record, key)
+        conn.execute(
+            "INSERT INTO records (collection, uid, alias, position, status, created_at, body) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (collection, uid, alias, position, status, created_at, json.dumps(record, ensure_ascii=False)),
+        )
+
+    def append_record(self, collection: str, record: Dict[str, Any]) -> None:
+        with self.transaction() as conn:
+            self._sync(_file_for(collection))
+            self._ensure_document(conn, collection)
+            self._mark(_file_for(collection))
+            position = conn.execute(
+                "SELECT COALESCE(MAX(position) + 1, 0) FROM records WHERE collection = ?", (collection,)
+            ).fetchone()[0]
+            self._insert(conn, collection, position, record)
+
+    def update_record(self, collection: str, uid: Any, apply: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Replace the first record matching uid with apply(record); returns the new record, or None if not found"""
+        with self.transaction() as conn:
+            self._sync(_file_for(collection))
+            row = conn.execute(_FIND_RECORD, {"collection": collection, "uid": str(uid)}).fetchone()
+            if row is None:
+                return None
+            record_id, stored_uid, body, _ = row
+            updated = apply(json.loads(body))
+            if updated is None:
+                return None
+            # Records of a keyed container (hyperparameter configs) keep their key
+            keyed = conn.execute(
+                "SELECT 1 FROM documents WHERE records_type = 'dict' AND name = ?",
+                (_file_for(collection),),
+            ).fetchone()
+            uid_, alias, status, created_at = _record_columns(updated, stored_uid if keyed else None)
+            conn.execute(
+                "UPDATE records SET uid = ?, alias = ?, status = ?, created_at = ?, body = ? WHERE id = ?",
+                (uid_, alias, status, created_at, json.dumps(updated, ensure_ascii=False), record_id),
+            )
+            self._mark(_file_for(collection))
+            return updated
+
+    def delete_records(self, collection: str, uid: Any) -> int:
+        """Delete every record matching uid; returns how many were removed"""
+        with self.transaction() as conn:
+            self._sync(_file_for(collection))
+            deleted = conn.execute(
+                f"DELETE FROM records WHERE id IN ({_RECORD_IDS})", {"collection": collection, "uid": str(uid)}
+            ).rowcount
+            if deleted:
+                self._mark(_file_for(collection))
+            return deleted
+
+    # Whole documents
+
+    def load_document(self, name: str) -> Any:
+        """A data file as it would be read from src/data; raises FileNotFoundError if it was never stored"""
+        self._sync(name)
+        conn = self._connect()
+        if conn.in_transaction:
+            return self._load(conn, name)
+        # Read the document and its records from one snapshot
+        conn.execute("BEGIN")
+        try:
+            return self._load(conn, name)
+        finally:
+            conn.execute("COMMIT")
+
+    def _load(self, conn: sqlite3.Connection, name: str) -> Any:
+        row = conn.execute("SELECT body, records_type FROM documents WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise FileNotFoundError(name)
+        body, records_type = row
+        document = json.loads(body) if body is not None else None
+        collection, key = _collection_for(name)
+        if collection is None or records_type is None:
+            return document
+        rows = conn.execute(
+            "SELECT uid, body FROM records WHERE collection = ? ORDER BY position", (collection,)
+        ).fetchall()
+        if records_type == "dict":
+            records: Any = {uid: json.loads(record) for uid, record in rows}
+        else:
+            records = [json.loads(record) for _, record in rows]
+        if key == "":
+            return records
+        document[key] = records
+        return document
+
+    def save_document(self, name: str, document: Any) -> None:
+        """Replace a data file and all of its records"""
+        with self.transaction() as conn:
+            self._replace(conn, name, document)
+            self._mark(name)
+
+    def _replace(self, conn: sqlite3.Connection, name: str, document: Any) -> None:
+        collection, key = _collection_for(name)
+        records_type = None
+        body = document
+        if collection is not None:
+            conn.execute("DELETE FROM records WHERE collection = ?", (collection,))
+            container = document if key == "" else (document.get(key) if isinstance(document, dict) else None)
+            if isinstance(container, dict):
+                records_type = "dict"
+                for position, (uid, record) in enumerate(container.items()):
+                    self._insert(conn, collection, position, record, uid)
+            elif isinstance(container, list):
+                records_type = "list"
+                for position, record in enumerate(container):
+                    self._insert(conn, collection, position, record)
+            if records_type is not None:
+                body = None if key == "" else {**document, key: None}
+        conn.execute(
+            "INSERT OR REPLACE INTO documents (name, body, records_type) VALUES (?, ?, ?)",
+            (name, json.dumps(body, ensure_ascii=False) if body is not None else None, records_type),
+        )
+
+    def update_document(self, name: str, apply: Callable[[Any], Any], default: Any = None) -> Any:
+        """Read-modify-write of a whole data file in one transaction; apply returns None to skip the write"""
+        with self.transaction():
+            try:
+                document = self.load_document(name)
+            except FileNotFoundError:
+                if default is None:
+                    raise
+                document = copy.deepcopy(default)
+            updated = apply(document)
+            if updated is not None:
+                self.save_document(name, updated)
+            return updated
+
+    def load_fields(self, name: str) -> Dict[str, Any]:
+        """Top-level fields of a data file other than its records; raises FileNotFoundError if it was never stored"""
+        _, key = _collection_for(name)
+        self._sync(name)
+        row = self._connect().execute("SELECT body FROM documents WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise FileNotFoundError(name)
+        return {k: v for k, v in json.loads(row[0] or "{}").items() if k != key}
+
+    def update_fields(self, name: str, apply: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Dict[str, Any]:
+        """Update the top-level fields of a data file other than its records, leaving the records untouched"""
+        collection, key = _collection_for(name)
+        with self.transaction() as conn:
+            self._sync(name)
+            if collection is not None:
+                self._ensure_document(conn, collection)
+            row = conn.execute("SELECT body, records_type FROM documents WHERE name = ?", (name,)).fetchone()
+            stored = json.loads(row[0]) if row and row[0] else {}
+            updated = apply({k: v for k, v in stored.items() if k != key})
+            # Keep the record placeholder and the original field order
+            body = {k: None if k == key else updated[k] for k in stored if k == key or k in updated}
+            body.update((k, v) for k, v in updated.items() if k not in body)
+            conn.execute(
+                "INSERT OR REPLACE INTO documents (name, body, records_type) VALUES (?, ?, ?)",
+                (name, json.dumps(body, ensure_ascii=False), row[1] if row else None),
+            )
+            self._mark(name)
+            return updated
+
+    # Import / export
+
+    def import_json(self, data_dir: str = str(DATA_DIR)) -> Dict[str, int]:
+        """Load every known data file in data_dir, replacing what the database holds for it"""
+        imported = {}
+        for name in DATA_FILES:
+            path = os.path.join(data_dir, name)
+            if not os.path.exists(path):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                document = json.load(f)
+            self.save_document(name, document)
+            collection, _ = _collection_for(name)
+            imported[name] = len(self.list_records(collection)) if collection else 1
+        logger.info(f"Imported {imported} into {self.db_path}")
+        return imported
+
+    def export_json(self, data_dir: str = str(DATA_DIR)) -> List[str]:
+        """Write every stored data file back to data_dir in the JSON layout the Next.js routes read"""
+        written = []
+        for name in DATA_FILES:
+            try:
+                document = self.load_document(name)
+            except FileNotFoundError:
+                continue
+            path = os.path.join(data_dir, name)
+            write_durably(path, document)
+            written.append(path)
+        logger.info(f"Exported {len(written)} data files from {self.db_path} to {data_dir}")
+        return written
+
+
+# Shared instance used by the services when FTDP_STORAGE_BACKEND=sqlite
+sqlite_store = SqliteStore()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Copy the src/data JSON files into or out of the SQLite store")
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("--db", default=SQLITE_PATH, help="SQLite database path")
+    parser.add_argument("--data-dir", default=str(DATA_DIR), help="Directory holding the JSON data files")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    store = SqliteStore(args.db, mirror_json=False, import_on_create=False)
+    if args.command == "import":
+        for name, count in store.import_json(args.data_dir).items():
+            print(f"{name}: {count}")
+    else:
+        for path in store.export_json(args.data_dir):
+            print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from app.utils.file_utils import get_temp_directory, get_uploads_directory
+
+logger = logging.getLogger(__name__)
+
+SWEEP_INTERVAL_SECONDS = int(os.environ.get("FTDP_SWEEP_INTERVAL_SECONDS", "600"))
+# Anything used this recently is never removed (uploads being written, fresh spools)
+SWEEP_GRACE_SECONDS = int(os.environ.get("FTDP_SWEEP_GRACE_SECONDS", "300"))
+TEMP_MAX_AGE_HOURS = float(os.environ.get("FTDP_TEMP_MAX_AGE_HOURS", "24"))
+TEMP_QUOTA_MB = int(os.environ.get("FTDP_TEMP_QUOTA_MB", "2048"))
+UPLOADS_MAX_AGE_HOURS = float(os.environ.get("FTDP_UPLOADS_MAX_AGE_HOURS", "72"))
+UPLOADS_QUOTA_MB = int(os.environ.get("FTDP_UPLOADS_QUOTA_MB", "51200"))
+
+# Directories under the uploads root whose children are swept as one unit each
+_GROUPED_DIRS = (".sessions",)
+
+
+def _last_used(stat: os.stat_result) -> float:
+    return max(stat.st_atime, stat.st_mtime)
+
+
+def _session_in_progress(session_dir: str) -> bool:
+    """Whether an upload session is still receiving chunks, going by its manifest"""
+    try:
+        with open(os.path.join(session_dir, "manifest.json"), "r", encoding="utf-8") as f:
+            return json.load(f).get("status") != "completed"
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError):
+        return True
+
+
+def _scan_files(directory: str) -> Iterable[os.DirEntry]:
+    """All regular files below directory, using scandir's cached stat"""
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry
+        except FileNotFoundError:
+            continue
+
+
+def collect_artifacts(root: str, protected: Set[str]) -> List[Dict[str, Any]]:
+    """Files under root as removable artifacts; an upload session (<id>/ plus <id>.part) is one artifact.
+
+    Sessions that are not completed are flagged in_progress, so quota eviction passes over them.
+    """
+    artifacts: Dict[str, Dict[str, Any]] = {}
+    grouped_roots = [os.path.join(root, name) for name in _GROUPED_DIRS]
+    for entry in _scan_files(root):
+        stat = entry.stat(follow_symlinks=False)
+        key = entry.path
+        for grouped in grouped_roots:
+            if entry.path.startswith(grouped + os.sep):
+                child = entry.path[len(grouped) + 1:].split(os.sep, 1)[0]
+                key = os.path.join(grouped, child.split(".", 1)[0])
+        artifact = artifacts.setdefault(
+            key, {"paths": [], "size": 0, "last_used": 0.0, "protected": False, "in_progress": False}
+        )
+        artifact["paths"].append(entry.path)
+        artifact["size"] += stat.st_size
+        artifact["last_used"] = max(artifact["last_used"], _last_used(stat))
+        if os.path.realpath(entry.path) in protected:
+            artifact["protected"] = True
+    for key, artifact in artifacts.items():
+        if key != artifact["paths"][0] and os.path.isdir(key):
+            artifact["paths"].append(key)
+            artifact["in_progress"] = _session_in_progress(key)
+    return list(artifacts.values())
+
+
+def _remove(artifact: Dict[str, Any]) -> int:
+    freed = 0
+    for path in artifact["paths"]:
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                freed += os.path.getsize(path)
+                os.remove(path)
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            logger.warning(f"Could not remove {path}: {e}")
+    return freed
+
+
+class StorageSweeper:
+    """Periodically trims the temp and uploads directories.
+
+    Each sweep removes artifacts older than the root's age limit, then evicts
+    the least recently used ones until the root is under its byte quota.
+    Files referenced by datasets.json and anything used within the grace
+    period are never removed, and upload sessions still in progress are only
+    removed by the age limit.
+    """
+
+    def __init__(
+        self,
+        interval_seconds: int = SWEEP_INTERVAL_SECONDS,
+        grace_seconds: int = SWEEP_GRACE_SECONDS
+    ):
+        self.interval_seconds = interval_seconds
+        self.grace_seconds = grace_seconds
+        self.roots: List[Dict[str, Any]] = [
+            {
+                "name": "temp",
+                "get_path": get_temp_directory,
+                "max_age_hours": TEMP_MAX_AGE_HOURS,
+                "quota_bytes": TEMP_QUOTA_MB * 1024 * 1024,
+                "usage": {},
+            },
+            {
+                "name": "uploads",
+                "get_path": get_uploads_directory,
+                "max_age_hours": UPLOADS_MAX_AGE_HOURS,
+                "quota_bytes": UPLOADS_QUOTA_MB * 1024 * 1024,
+                "usage": {},
+            },
+        ]
+        self.protected_paths: Callable[[], Iterable[str]] = lambda: ()
+        self._task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        self.sweeps = 0
+        self.total_bytes_freed = 0
+        self.last_sweep: Dict[str, Any] = {}
+
+    def sweep(self) -> Dict[str, Any]:
+        """Run one sweep over every root; safe to call from a worker thread"""
+        with self._lock:
+            started = time.time()
+            protected = {os.path.realpath(path) for path in self.protected_paths()}
+            freed = 0
+            removed = 0
+            for root in self.roots:
+                root_freed, root_removed = self._sweep_root(root, protected, started)
+                freed += root_freed
+                removed += root_removed
+            self.sweeps += 1
+            self.total_bytes_freed += freed
+            self.last_sweep = {
+                "finished_at": time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime()),
+                "duration_ms": round((time.time() - started) * 1000, 2),
+                "bytes_freed": freed,
+                "artifacts_removed": removed,
+            }
+            if removed:
+                logger.info(f"Storage sweep removed {removed} artifact(s), freed {freed} bytes")
+            return self.last_sweep
+
+    def _sweep_root(self, root: Dict[str, Any], protected: Set[str], now: float):
+        path = root["get_path"]()
+        artifacts = collect_artifacts(path, protected)
+        usage = sum(a["size"] for a in artifacts)
+        freed = 0
+        removed = 0
+
+        removable = [a for a in artifacts if not a["protected"] and now - a["last_used"] > self.grace_seconds]
+        max_age_seconds = root["max_age_hours"] * 3600
+        survivors = []
+        for artifact in removable:
+            if max_age_seconds and now - artifact["last_used"] > max_age_seconds:
+                artifact["in_progress"] = False
+                freed += _remove(artifact)
+                usage -= artifact["size"]
+                removed += 1
+            else:
+                survivors.append(artifact)
+
+        quota = root["quota_bytes"]
+        if quota and usage > quota:
+            evictable = [a for a in survivors if not a["in_progress"]]
+            for artifact in sorted(evictable, key=lambda a: a["last_used"]):
+                if usage <= quota:
+                    break
+                freed += _remove(artifact)
+                usage -= artifact["size"]
+                removed += 1
+
+        root["usage"] = {
+            "path": path,
+            "usage_bytes": usage,
+            "artifacts": len(artifacts) - removed,
+            "quota_bytes": quota,
+            "max_age_hours": root["max_age_hours"],
+            "protected_bytes": sum(a["size"] for a in artifacts if a["protected"]),
+            "in_progress_bytes": sum(a["size"] for a in artifacts if a["in_progress"]),
+        }
+        return freed, removed
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                logger.error(f"Storage sweep failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    def start(self, protected_paths: Optional[Callable[[], Iterable[str]]] = None) -> None:
+        """Start sweeping in the background on the running event loop"""
+        if protected_paths is not None:
+            self.protected_paths = protected_paths
+        if self._task is None and self.interval_seconds > 0:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval_seconds": self.interval_seconds,
+            "sweeps": self.sweeps,
+            "total_bytes_freed": self.total_bytes_freed,
+            "last_sweep": self.last_sweep,
+            "roots": {root["name"]: root["usage"] for root in self.roots},
+        }
+
+
+# Shared sweeper started by the app lifespan
+storage_sweeper = StorageSweeper()
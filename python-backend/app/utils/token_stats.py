@@ -0,0 +1,346 @@
+import asyncio
+import csv
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from app.core.exceptions import FileProcessingError
+from app.utils.compression import open_dataset
+from app.utils.arrow_store import open_arrow_table
+from app.utils.csv_encoding import DecodingReader
+from app.utils.csv_scan import split_at_record_boundaries
+from app.utils.dataset_formats import cell_to_str, detect_format
+from app.utils.dataset_profile import read_cached_profile
+from app.utils.dataset_validation import PARALLEL_VALIDATION_MIN_BYTES, ByteRange, plan_csv_validation
+from app.utils.file_utils import UPLOADS_DIR, ensure_directory_exists, hash_file
+from app.utils.worker_pool import csv_pool
+
+logger = logging.getLogger(__name__)
+
+HEURISTIC = "heuristic"
+
+# Per-row token counts, one cache entry per (dataset content hash, tokenizer, columns)
+TOKEN_STATS_DIR = os.environ.get("FTDP_TOKEN_STATS_DIR", str(Path(UPLOADS_DIR) / ".tokens"))
+
+# Average characters per token assumed by the heuristic estimator
+CHARS_PER_TOKEN = float(os.environ.get("FTDP_CHARS_PER_TOKEN", "4.0"))
+
+# Texts passed to the estimator at once
+TOKEN_BATCH_ROWS = int(os.environ.get("FTDP_TOKEN_BATCH_ROWS", "10000"))
+
+# Row numbers listed per model whose context length is exceeded
+MAX_OVER_CONTEXT_SAMPLES = 20
+
+PERCENTILES = (50, 90, 99)
+
+# Tokenizers loaded in this worker process, by name (None when unavailable offline)
+_tokenizers: Dict[str, Any] = {}
+
+
+def load_tokenizer(name: str) -> Optional[Any]:
+    """A tokenizer from the local Hugging Face cache, or None if it is not available offline"""
+    if name not in _tokenizers:
+        try:
+            from transformers import AutoTokenizer
+            _tokenizers[name] = AutoTokenizer.from_pretrained(name, local_files_only=True)
+        except Exception as e:
+            logger.info(f"Tokenizer {name} not available offline, using the heuristic estimator: {e}")
+            _tokenizers[name] = None
+    return _tokenizers[name]
+
+
+def resolve_tokenizer(name: Optional[str]) -> str:
+    """The estimator actually used for a requested tokenizer"""
+    if not name or name == HEURISTIC:
+        return HEURISTIC
+    return name if load_tokenizer(name) is not None else HEURISTIC
+
+
+def estimate_tokens(texts: Sequence[Optional[str]], tokenizer: str = HEURISTIC) -> np.ndarray:
+    """Token count per text; missing values count as zero"""
+    series = pd.Series(texts, dtype=object)
+    if tokenizer != HEURISTIC:
+        present = series.notna()
+        counts = np.zeros(len(series), dtype=np.uint32)
+        if present.any():
+            encoded = load_tokenizer(tokenizer)(series[present].tolist(), add_special_tokens=False)["input_ids"]
+            counts[present.to_numpy()] = [len(ids) for ids in encoded]
+        return counts
+    chars = series.str.len().fillna(0).to_numpy()
+    words = series.str.count(r"\S+").fillna(0).to_numpy()
+    return np.maximum(np.ceil(chars / CHARS_PER_TOKEN), words).astype(np.uint32)
+
+
+class _TokenBatcher:
+    """Collects input/target texts and estimates them one batch at a time"""
+
+    def __init__(self, tokenizer: str):
+        self.tokenizer = tokenizer
+        self.inputs: List[Optional[str]] = []
+        self.targets: List[Optional[str]] = []
+        self.parts: List[np.ndarray] = []
+
+    def add(self, input_text: Optional[str], target_text: Optional[str]) -> None:
+        self.inputs.append(input_text)
+        self.targets.append(target_text)
+        if len(self.inputs) >= TOKEN_BATCH_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.inputs:
+            self.parts.append(np.column_stack([
+                estimate_tokens(self.inputs, self.tokenizer),
+                estimate_tokens(self.targets, self.tokenizer),
+            ]))
+            self.inputs, self.targets = [], []
+
+    def result(self) -> np.ndarray:
+        self.flush()
+        if not self.parts:
+            return np.zeros((0, 2), dtype=np.uint32)
+        return np.concatenate(self.parts)
+
+
+def count_csv_range_tokens(
+    file_path: str,
+    plan: Dict[str, Any],
+    start: int,
+    end: int,
+    input_column: str,
+    target_column: str,
+    tokenizer: str = HEURISTIC
+) -> np.ndarray:
+    """(input, target) token counts for every record in one byte range of a CSV file; runs in a worker process"""
+    header = plan["header"]
+    positions = [header.index(col) if col in header else None for col in (input_column, target_column)]
+    batcher = _TokenBatcher(tokenizer)
+    with open_dataset(file_path) as raw:
+        reader = csv.reader(
+            DecodingReader(ByteRange(raw, start, end), plan["encoding"]),
+            delimiter=plan["dialect"]["delimiter"],
+            quotechar=plan["dialect"]["quotechar"]
+        )
+        for row in reader:
+            if not row:
+                continue
+            batcher.add(*(row[i] if i is not None and i < len(row) else None for i in positions))
+    return batcher.result()
+
+
+def count_jsonl_range_tokens(
+    file_path: str,
+    start: int,
+    end: int,
+    input_column: str,
+    target_column: str,
+    tokenizer: str = HEURISTIC
+) -> np.ndarray:
+    """(input, target) token counts for every line in one byte range of a JSON Lines file; runs in a worker process"""
+    batcher = _TokenBatcher(tokenizer)
+    with open_dataset(file_path) as raw:
+        source = ByteRange(raw, start, end)
+        first = start == 0
+        while True:
+            data = source.readline()
+            if not data:
+                break
+            if not data.strip():
+                first = False
+                continue
+            try:
+                record = json.loads(data.decode('utf-8-sig' if first else 'utf-8', errors='replace'))
+            except json.JSONDecodeError:
+                record = None
+            first = False
+            if not isinstance(record, dict):
+                record = {}
+            batcher.add(cell_to_str(record.get(input_column)), cell_to_str(record.get(target_column)))
+    return batcher.result()
+
+
+def count_parquet_tokens(
+    file_path: str,
+    input_column: str,
+    target_column: str,
+    tokenizer: str = HEURISTIC
+) -> np.ndarray:
+    """(input, target) token counts for every row of a Parquet file, reading only those two columns"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise FileProcessingError("Parquet support requires the optional 'pyarrow' package")
+    parquet_file = pq.ParquetFile(file_path)
+    names = [str(name) for name in parquet_file.schema_arrow.names]
+    present = [col for col in (input_column, target_column) if col in names]
+    if not present:
+        return np.zeros((parquet_file.metadata.num_rows, 2), dtype=np.uint32)
+    parts = []
+    for batch in parquet_file.iter_batches(columns=present, batch_size=TOKEN_BATCH_ROWS):
+        frame = batch.to_pandas()
+        parts.append(np.column_stack([
+            estimate_tokens(frame[col].map(cell_to_str, na_action='ignore').tolist(), tokenizer)
+            if col in present else np.zeros(len(frame), dtype=np.uint32)
+            for col in (input_column, target_column)
+        ]))
+    if not parts:
+        return np.zeros((0, 2), dtype=np.uint32)
+    return np.concatenate(parts)
+
+
+def count_arrow_tokens(
+    file_path: str,
+    input_column: str,
+    target_column: str,
+    tokenizer: str = HEURISTIC
+) -> Optional[np.ndarray]:
+    """(input, target) token counts from the dataset's Arrow copy, or None if there is no current copy"""
+    table = open_arrow_table(file_path)
+    if table is None:
+        return None
+    parts = []
+    for batch in table.to_batches(max_chunksize=TOKEN_BATCH_ROWS):
+        parts.append(np.column_stack([
+            estimate_tokens(batch.column(col).to_pylist(), tokenizer)
+            if col in batch.schema.names else np.zeros(batch.num_rows, dtype=np.uint32)
+            for col in (input_column, target_column)
+        ]))
+    if not parts:
+        return np.zeros((0, 2), dtype=np.uint32)
+    return np.concatenate(parts)
+
+
+def token_cache_path(content_hash: str, tokenizer: str, input_column: str, target_column: str) -> str:
+    """Cache entry for one dataset content, tokenizer and column pair"""
+    slug = ".".join(re.sub(r'[^A-Za-z0-9_-]', '_', part) for part in (tokenizer, input_column, target_column))
+    return str(Path(TOKEN_STATS_DIR) / f"{content_hash}.{slug}.npy")
+
+
+def _distribution(counts: np.ndarray) -> Optional[Dict[str, Any]]:
+    if not len(counts):
+        return None
+    result = {
+        "min": int(counts.min()),
+        "max": int(counts.max()),
+        "mean": round(float(counts.mean()), 2),
+    }
+    for pct, value in zip(PERCENTILES, np.percentile(counts, PERCENTILES, method="lower")):
+        result[f"p{pct}"] = int(value)
+    return result
+
+
+def summarize_token_counts(cache_path: str, context_lengths: Dict[str, int]) -> Dict[str, Any]:
+    """Totals, per-row distributions and rows over each model's context length; runs in a worker process"""
+    counts = np.load(cache_path, mmap_mode='r')
+    inputs = counts[:, 0].astype(np.int64)
+    targets = counts[:, 1].astype(np.int64)
+    totals = inputs + targets
+    over_context = []
+    for model_id, context_length in context_lengths.items():
+        over = np.flatnonzero(totals > context_length)
+        over_context.append({
+            "model_id": model_id,
+            "context_length": context_length,
+            "rows": int(len(over)),
+            "samples": over[:MAX_OVER_CONTEXT_SAMPLES].tolist(),
+        })
+    return {
+        "rows": int(len(totals)),
+        "total_tokens": {
+            "input": int(inputs.sum()),
+            "target": int(targets.sum()),
+            "total": int(totals.sum()),
+        },
+        "distribution": {
+            "input": _distribution(inputs),
+            "target": _distribution(targets),
+            "row": _distribution(totals),
+        },
+        "over_context": over_context,
+    }
+
+
+def _content_hash(file_path: str) -> str:
+    profile = read_cached_profile(file_path)
+    return profile["sha256"] if profile and profile.get("sha256") else hash_file(file_path)
+
+
+def _save_counts(cache_path: str, counts: np.ndarray) -> None:
+    ensure_directory_exists(os.path.dirname(cache_path))
+    tmp_path = f"{cache_path}.{uuid.uuid4().hex[:8]}.tmp.npy"
+    np.save(tmp_path, counts)
+    os.replace(tmp_path, cache_path)
+
+
+async def run_token_stats(
+    file_path: str,
+    filename: str,
+    input_column: str = "input",
+    target_column: str = "output",
+    tokenizer: Optional[str] = None,
+    context_lengths: Optional[Dict[str, int]] = None,
+    refresh: bool = False
+) -> Dict[str, Any]:
+    """Token statistics for a dataset, counted across the worker pool and cached per content hash and tokenizer"""
+    started = time.time()
+    file_format = detect_format(filename)
+    if file_format not in ("csv", "jsonl", "parquet"):
+        raise FileProcessingError(f"Unsupported file type: {filename}")
+    used = await csv_pool.run(resolve_tokenizer, tokenizer)
+    content_hash = await csv_pool.run(_content_hash, file_path)
+    cache_path = token_cache_path(content_hash, used, input_column, target_column)
+    cached = not refresh and os.path.exists(cache_path)
+
+    workers = 1
+    if not cached:
+        parts = csv_pool.max_workers if os.path.getsize(file_path) >= PARALLEL_VALIDATION_MIN_BYTES else 1
+        counts = None
+        if file_format in ("csv", "jsonl"):
+            counts = await csv_pool.run(count_arrow_tokens, file_path, input_column, target_column, used)
+        if counts is not None:
+            results = [counts]
+        elif file_format == "csv":
+            plan = await csv_pool.run(plan_csv_validation, file_path, parts)
+            results = await asyncio.gather(*(
+                csv_pool.run(count_csv_range_tokens, file_path, plan, start, end, input_column, target_column, used)
+                for start, end, _ in plan["ranges"]
+            ))
+        elif file_format == "jsonl":
+            ranges = await csv_pool.run(split_at_record_boundaries, file_path, parts, None)
+            results = await asyncio.gather(*(
+                csv_pool.run(count_jsonl_range_tokens, file_path, start, end, input_column, target_column, used)
+                for start, end, _ in ranges
+            ))
+        else:
+            results = [await csv_pool.run(count_parquet_tokens, file_path, input_column, target_column, used)]
+        workers = len(results)
+        await asyncio.to_thread(_save_counts, cache_path, np.concatenate(list(results)))
+
+    summary = await csv_pool.run(summarize_token_counts, cache_path, context_lengths or {})
+    report = {
+        "filename": filename,
+        "format": file_format,
+        "sha256": content_hash,
+        "input_column": input_column,
+        "target_column": target_column,
+        "tokenizer": used,
+        "estimated": used == HEURISTIC,
+        **summary,
+        "cached": cached,
+        "workers": workers,
+        "duration_ms": round((time.time() - started) * 1000, 2),
+    }
+    if tokenizer and tokenizer != HEURISTIC and used == HEURISTIC:
+        report["warnings"] = [f"Tokenizer {tokenizer} is not available offline; counts are heuristic estimates"]
+    logger.info(
+        f"Token stats for {filename}: {report['total_tokens']['total']} tokens over {report['rows']} rows "
+        f"({used}, cached={cached}, {report['duration_ms']}ms)"
+    )
+    return report
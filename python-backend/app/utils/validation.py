@@ -1,5 +1,6 @@
 import re
 from pathlib import Path
+from typing import List, Optional
 
 def validate_file_path(file_path: str) -> bool:
     try:
@@ -12,3 +13,10 @@ def validate_file_path(file_path: str) -> bool:
 def sanitize_filename(filename: str) -> str:
     filename = re.sub(r'[<>:"/\\|?*]', '', filename)
     return filename.strip()
+
+def parse_column_list(columns: Optional[str]) -> Optional[List[str]]:
+    """Split a comma-separated column projection, or None when not given"""
+    if not columns:
+        return None
+    names = [name.strip() for name in columns.split(",") if name.strip()]
+    return names or None
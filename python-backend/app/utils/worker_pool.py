@@ -0,0 +1,82 @@
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.exceptions import WorkerPoolSaturated
+
+logger = logging.getLogger(__name__)
+
+CSV_WORKERS = int(os.environ.get("FTDP_CSV_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Tasks admitted at once (running plus waiting); anything beyond is rejected
+CSV_QUEUE_DEPTH = int(os.environ.get("FTDP_CSV_QUEUE_DEPTH", str(CSV_WORKERS * 4)))
+
+
+class BoundedProcessPool:
+    """Process pool for CPU-bound file work with a hard limit on queued tasks.
+
+    The executor is created lazily on first use so importing this module never
+    forks. When the queue is full, run() raises WorkerPoolSaturated instead of
+    letting requests pile up behind long parses.
+    """
+
+    def __init__(self, max_workers: int = CSV_WORKERS, max_queue: int = CSV_QUEUE_DEPTH):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(self.max_workers, max_queue)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                logger.info(f"Starting process pool with {self.max_workers} workers")
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run fn(*args, **kwargs) in a worker process, or raise WorkerPoolSaturated if the queue is full"""
+        with self._lock:
+            if self._pending >= self.max_queue:
+                self.rejected += 1
+                raise WorkerPoolSaturated(
+                    f"File processing queue is full ({self._pending} tasks pending), retry shortly"
+                )
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), functools.partial(fn, *args, **kwargs))
+            self.completed += 1
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.max_workers,
+            "queue_depth": self.max_queue,
+            "pending": self._pending,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+# Shared pool for CSV parsing and validation
+csv_pool = BoundedProcessPool()
@@ -1,25 +1,53 @@
 
 
-from fastapi import FastAPI, File, UploadFile, HTTPException
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-import pandas as pd
-import io
 import logging
-from typing import Dict, Any
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional
 
 from app.api.v1.datasets import router as datasets_router
 from app.api.v1.models import router as models_router
 from app.api.v1.jobs import router as jobs_router
 from app.api.v1.training import router as training_router
 from app.api.v1.metadata import router as metadata_router
+from app.api.v1.uploads import router as uploads_router
+from app.core.exceptions import FileProcessingError, WorkerPoolSaturated
+from app.utils.csv_preview import DEFAULT_PREVIEW_ROWS, MAX_PREVIEW_ROWS
+from app.utils.dataset_formats import PREVIEW_CELL_CHARS, SUPPORTED_DATASET_EXTENSIONS, detect_format
+from app.utils.dataset_validation import run_validation
+from app.utils.file_utils import delete_file_safe, spool_upload
+from app.utils.job_journal import job_journal
+from app.utils.json_store import json_store
+from app.utils.preview_cache import preview_cache, preview_cache_key
+from app.utils.row_count import run_dataset_preview
+from app.utils.sqlite_store import SQLITE_ENABLED, sqlite_store
+from app.utils.storage_sweeper import storage_sweeper
+from app.utils.validation import parse_column_list
+from app.utils.worker_pool import csv_pool
+from services.dataset_selection import DatasetSelection
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan manager."""
+    storage_sweeper.start(protected_paths=DatasetSelection.referenced_files)
+    if not SQLITE_ENABLED:
+        job_journal.start()
+    yield
+    # Shutdown
+    await storage_sweeper.stop()
+    await job_journal.stop()
+    csv_pool.shutdown()
+
+
 app = FastAPI(
     title="CSV Preview API",
     description="FastAPI backend for parsing and previewing CSV files",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -36,6 +64,7 @@ app.include_router(models_router)
 app.include_router(jobs_router)
 app.include_router(training_router)
 app.include_router(metadata_router)
+app.include_router(uploads_router)
 
 
 @app.get("/")
@@ -44,112 +73,92 @@ async def root():
     return {"message": "CSV Preview API is running", "status": "healthy"}
 
 @app.post("/api/preview-csv")
-async def preview_csv(file: UploadFile = File(...)) -> Dict[str, Any]:
+async def preview_csv(
+    file: UploadFile = File(...),
+    preview_rows: int = Query(DEFAULT_PREVIEW_ROWS, ge=1, le=MAX_PREVIEW_ROWS),
+    max_cell_chars: int = Query(PREVIEW_CELL_CHARS, ge=0),
+    columns: Optional[str] = Query(None, description="Comma-separated columns to return")
+) -> Dict[str, Any]:
+    spooled = None
+    projection = parse_column_list(columns)
     try:
-        if not file.filename or not file.filename.lower().endswith('.csv'):
+        if not detect_format(file.filename):
             raise HTTPException(
                 status_code=400, 
-                detail="Only CSV files are supported"
+                detail=f"Only {', '.join(SUPPORTED_DATASET_EXTENSIONS)} files are supported"
             )
-        content = await file.read()
-        try:
-            content_str = content.decode('utf-8')
-        except UnicodeDecodeError:
-            try:
-                content_str = content.decode('utf-8-sig')
-            except UnicodeDecodeError:
-                content_str = content.decode('latin-1')
-                logger.warning(f"File {file.filename} decoded with latin-1 encoding")
-        try:
-            csv_buffer = io.StringIO(content_str)
-            df = None
-            parsing_errors = []
-            try:
-                csv_buffer.seek(0)
-                df = pd.read_csv(
-                    csv_buffer,
-                    sep=None,
-                    engine='python',
-                    on_bad_lines='skip'
-                )
-            except Exception as e:
-                parsing_errors.append(f"Python engine: {str(e)}")
-            if df is None:
-                try:
-                    csv_buffer.seek(0)
-                    df = pd.read_csv(
-                        csv_buffer,
-                        engine='c',
-                        low_memory=False,
-                        on_bad_lines='skip'
-                    )
-                except Exception as e:
-                    parsing_errors.append(f"C engine: {str(e)}")
-            if df is None:
-                try:
-                    csv_buffer.seek(0)
-                    df = pd.read_csv(csv_buffer)
-                except Exception as e:
-                    parsing_errors.append(f"Default: {str(e)}")
-            if df is None:
-                error_msg = "Failed to parse CSV with all strategies: " + "; ".join(parsing_errors)
-                raise Exception(error_msg)
-        except Exception as csv_error:
-            logger.error(f"CSV parsing error for {file.filename}: {str(csv_error)}")
-            raise HTTPException(
-                status_code=400,
-                detail=f"Failed to parse CSV file: {str(csv_error)}"
-            )
-        if df.empty:
-            raise HTTPException(
-                status_code=400,
-                detail="CSV file appears to be empty or has no valid data"
-            )
-        columns = [col.strip() for col in df.columns.tolist()]
-        validation_errors = []
-        has_input = 'input' in columns
-        has_output = 'output' in columns
-        if not has_input:
-            validation_errors.append('Missing required "input" column')
-        if not has_output:
-            validation_errors.append('Missing required "output" column')
-        preview_rows = min(5, len(df))
-        preview_data = []
-        for i in range(preview_rows):
-            row = {}
-            for col in columns:
-                value = df.iloc[i][col]
-                if pd.isna(value):
-                    row[col] = None
-                else:
-                    row[col] = str(value)
-            preview_data.append(row)
-        total_rows = len(df)
-        file_size_kb = len(content) / 1024
-        response_data = {
-            "filename": file.filename,
-            "columns": columns,
-            "data": preview_data,
-            "validation_errors": validation_errors,
-            "statistics": {
-                "total_rows": total_rows,
-                "total_columns": len(columns),
-                "file_size_kb": round(file_size_kb, 2),
-                "preview_rows": preview_rows,
-                "has_required_columns": has_input and has_output
-            },
-            "isNewUpload": True
-        }
-        logger.info(f"Successfully parsed CSV: {file.filename} ({total_rows} rows, {len(columns)} columns)")
+        # The event loop only moves bytes to disk (hashing on the way);
+        # decoding, parsing and validation run in the process pool
+        spooled = await spool_upload(file)
+        content_hash = spooled["sha256"]
+        cache_key = preview_cache_key(
+            content_hash, file.filename, preview_rows=preview_rows, max_cell_chars=max_cell_chars, columns=projection
+        )
+        cached = preview_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Preview cache hit for {file.filename} ({content_hash[:12]})")
+            return {**cached, "filename": file.filename}
+        response_data = await run_dataset_preview(spooled["path"], file.filename, preview_rows, max_cell_chars, projection)
+        response_data["content_hash"] = content_hash
+        preview_cache.put(cache_key, response_data)
+        statistics = response_data["statistics"]
+        logger.info(f"Successfully parsed dataset: {file.filename} ({statistics['total_rows']} rows, {statistics['total_columns']} columns)")
         return response_data
     except HTTPException:
         raise
+    except FileProcessingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except WorkerPoolSaturated as e:
+        logger.warning(f"Rejected preview of {file.filename}: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         logger.error(f"Unexpected error processing file {file.filename}: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"An unexpected error occurred while processing the file: {str(e)}"
         )
+    finally:
+        if spooled is not None:
+            delete_file_safe(spooled["path"])
+
+
+@app.post("/api/validate-dataset")
+async def validate_dataset(
+    file: UploadFile = File(...),
+    input_column: str = Query("input"),
+    output_column: str = Query("output"),
+    columns: Optional[str] = Query(None, description="Comma-separated extra columns to inspect")
+) -> Dict[str, Any]:
+    """Scan every row of an uploaded dataset and report malformed, empty and over-long cells"""
+    spooled = None
+    try:
+        if not detect_format(file.filename):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Only {', '.join(SUPPORTED_DATASET_EXTENSIONS)} files are supported"
+            )
+        spooled = await spool_upload(file)
+        report = await run_validation(
+            spooled["path"], file.filename, input_column, output_column, projection=parse_column_list(columns)
+        )
+        report["content_hash"] = spooled["sha256"]
+        return report
+    except HTTPException:
+        raise
+    except FileProcessingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except WorkerPoolSaturated as e:
+        logger.warning(f"Rejected validation of {file.filename}: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except Exception as e:
+        logger.error(f"Unexpected error validating file {file.filename}: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"An unexpected error occurred while validating the file: {str(e)}"
+        )
+    finally:
+        if spooled is not None:
+            delete_file_safe(spooled["path"])
 
 
 @app.get("/api/health")
@@ -170,8 +179,16 @@ async def health_check():
             },
             "endpoints": {
                 "preview": "/api/preview-csv",
+                "validate": "/api/validate-dataset",
+                "uploads": "/api/uploads",
                 "health": "/api/health"
-            }
+            },
+            "preview_cache": preview_cache.stats(),
+            "csv_pool": csv_pool.stats(),
+            "storage": storage_sweeper.stats(),
+            "json_store": json_store.stats(),
+            "job_journal": job_journal.stats(),
+            "sqlite_store": sqlite_store.stats() if SQLITE_ENABLED else None
         }
     except Exception as e:
         return {
@@ -1,54 +1,109 @@
 
-import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Set
 from pathlib import Path
 
+from app.utils.arrow_store import arrow_path_for
+from app.utils.dataset_formats import PREVIEW_CELL_CHARS, truncate_cells
+from app.utils.dataset_profile import format_size, profile_path_for, read_cached_profile
+from app.utils.file_utils import resolve_upload_path
+from app.utils.json_store import index_records, json_store
+from app.utils.sqlite_store import SQLITE_ENABLED, sqlite_store
+
 DATASETS_PATH = Path(__file__).parent.parent.parent / "src" / "data" / "datasets.json"
 
 class DatasetSelection:
     @staticmethod
     def load_datasets() -> List[Dict[str, Any]]:
-        if DATASETS_PATH.exists():
-            with open(DATASETS_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return []
+        """Stored datasets, shared with other requests; modify them only through json_store.update()"""
+        if SQLITE_ENABLED:
+            return sqlite_store.list_records("datasets")
+        return json_store.load(DATASETS_PATH, [])
+
+    @staticmethod
+    def trim_preview(dataset: Dict[str, Any], max_chars: Optional[int] = PREVIEW_CELL_CHARS) -> Dict[str, Any]:
+        """Copy of a dataset whose preview rows have long cells truncated"""
+        preview = dataset.get("preview")
+        if not isinstance(preview, list):
+            return dataset
+        rows = [dict(row) if isinstance(row, dict) else row for row in preview]
+        truncated = truncate_cells([row for row in rows if isinstance(row, dict)], max_chars)
+        trimmed = {**dataset, "preview": rows}
+        if truncated:
+            trimmed["truncatedCells"] = truncated
+        return trimmed
+
+    @staticmethod
+    def referenced_files() -> Set[str]:
+        """Files on disk that stored datasets point to"""
+        paths = set()
+        for ds in DatasetSelection.load_datasets():
+            path = resolve_upload_path(ds.get("filePath", ""))
+            if path:
+                paths.add(path)
+                paths.add(profile_path_for(path))
+                paths.add(arrow_path_for(path))
+        return paths
+
+    @staticmethod
+    def with_profile(dataset: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a dataset with stats from its stored profile, if one is current; never reads the data file"""
+        path = resolve_upload_path(dataset.get("filePath", ""))
+        profile = read_cached_profile(path) if path else None
+        if not profile:
+            return dataset
+        return {
+            **dataset,
+            "samples": profile["rows"],
+            "size": format_size(profile["size_bytes"]),
+            "profile": profile,
+        }
 
     @staticmethod
     def get_dataset_by_uid(uid: str) -> Dict[str, Any]:
-        datasets = DatasetSelection.load_datasets()
-        for ds in datasets:
-            if ds.get("uid") == uid or ds.get("id") == uid:
-                return ds
-        return {}
+        if SQLITE_ENABLED:
+            return sqlite_store.get_record("datasets", uid) or {}
+        by_uid = json_store.index(DATASETS_PATH, "uid_or_id", lambda datasets: index_records(datasets, ("uid", "id")))
+        return by_uid.get(uid) or {}
 
     @staticmethod
     def add_dataset(dataset: Dict[str, Any]) -> bool:
-        datasets = DatasetSelection.load_datasets()
-        datasets.append(dataset)
-        with open(DATASETS_PATH, "w", encoding="utf-8") as f:
-            json.dump(datasets, f, indent=2, ensure_ascii=False)
+        trimmed = DatasetSelection.trim_preview(dataset)
+        if SQLITE_ENABLED:
+            sqlite_store.append_record("datasets", trimmed)
+            return True
+        json_store.update(DATASETS_PATH, lambda datasets: datasets + [trimmed], [])
+        return True
+
+    @staticmethod
+    def save_datasets(datasets: List[Dict[str, Any]]) -> bool:
+        """Replace every stored dataset, as the Next.js datasets route saves the whole list"""
+        trimmed = [DatasetSelection.trim_preview(ds) for ds in datasets]
+        if SQLITE_ENABLED:
+            sqlite_store.save_document("datasets.json", trimmed)
+            return True
+        json_store.save(DATASETS_PATH, trimmed)
         return True
 
     @staticmethod
     def update_dataset(uid: str, updates: Dict[str, Any]) -> bool:
-        datasets = DatasetSelection.load_datasets()
-        updated = False
-        for i, ds in enumerate(datasets):
-            if ds.get("uid") == uid or ds.get("id") == uid:
-                datasets[i].update(updates)
-                updated = True
-                break
-        if updated:
-            with open(DATASETS_PATH, "w", encoding="utf-8") as f:
-                json.dump(datasets, f, indent=2, ensure_ascii=False)
-        return updated
+        trimmed = DatasetSelection.trim_preview(updates)
+        if SQLITE_ENABLED:
+            return sqlite_store.update_record("datasets", uid, lambda ds: {**ds, **trimmed}) is not None
+
+        def apply(datasets: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+            for ds in datasets:
+                if ds.get("uid") == uid or ds.get("id") == uid:
+                    ds.update(trimmed)
+                    return datasets
+            return None
+        return json_store.update(DATASETS_PATH, apply, []) is not None
 
     @staticmethod
     def delete_dataset(uid: str) -> bool:
-        datasets = DatasetSelection.load_datasets()
-        new_datasets = [ds for ds in datasets if ds.get("uid") != uid and ds.get("id") != uid]
-        if len(new_datasets) != len(datasets):
-            with open(DATASETS_PATH, "w", encoding="utf-8") as f:
-                json.dump(new_datasets, f, indent=2, ensure_ascii=False)
-            return True
-        return False
+        if SQLITE_ENABLED:
+            return sqlite_store.delete_records("datasets", uid) > 0
+
+        def apply(datasets: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+            new_datasets = [ds for ds in datasets if ds.get("uid") != uid and ds.get("id") != uid]
+            return new_datasets if len(new_datasets) != len(datasets) else None
+        return json_store.update(DATASETS_PATH, apply, []) is not None
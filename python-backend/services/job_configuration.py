@@ -1,10 +1,14 @@
 import json
 import os
-from typing import Dict, Any, Optional
+from typing import Any, Callable, Dict, Optional
 import logging
 import time
 import hashlib
 
+from app.utils.job_journal import job_journal
+from app.utils.json_store import index_records, json_store
+from app.utils.sqlite_store import DATA_FILES, SQLITE_ENABLED, sqlite_store
+
 logger = logging.getLogger(__name__)
 
 class JobConfiguration:
@@ -17,13 +21,23 @@ class JobConfiguration:
     MODELS_PATH = "../../src/data/models.json"
     JOBS_PATH = "../../src/data/jobs.json"
     
+    @staticmethod
+    def _sqlite_name(file_path: str) -> Optional[str]:
+        """Data file name when the SQLite store holds it instead of src/data"""
+        name = os.path.basename(file_path)
+        return name if SQLITE_ENABLED and name in DATA_FILES else None
+    
     @classmethod
     def _load_json_file(cls, file_path: str) -> Dict[str, Any]:
-        """Load and parse a JSON file"""
+        """Load a JSON file through the shared cache; the result must not be modified"""
         try:
+            name = cls._sqlite_name(file_path)
+            if name:
+                return sqlite_store.load_document(name)
+            if os.path.basename(file_path) == "jobs.json":
+                return job_journal.load()
             full_path = os.path.join(os.path.dirname(__file__), file_path)
-            with open(full_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return json_store.load(full_path)
         except FileNotFoundError:
             logger.error(f"JSON file not found: {file_path}")
             raise FileNotFoundError(f"Configuration file not found: {file_path}")
@@ -34,18 +48,44 @@ class JobConfiguration:
             logger.error(f"Error loading JSON file {file_path}: {str(e)}")
             raise Exception(f"Failed to load {file_path}: {str(e)}")
     
+    @classmethod
+    def _index_json_file(cls, file_path: str, name: str, build: Callable[[Any], Dict[Any, Any]]) -> Dict[Any, Any]:
+        """Lookup table over a JSON file, rebuilt only when the file changes"""
+        full_path = os.path.join(os.path.dirname(__file__), file_path)
+        return json_store.index(full_path, name, build)
+    
     @classmethod
     def _save_json_file(cls, file_path: str, data: Dict[str, Any]) -> bool:
         """Save data to a JSON file"""
         try:
+            name = cls._sqlite_name(file_path)
+            if name:
+                sqlite_store.save_document(name, data)
+                return True
             full_path = os.path.join(os.path.dirname(__file__), file_path)
-            with open(full_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            json_store.save(full_path, data)
             return True
         except Exception as e:
             logger.error(f"Error saving JSON file {file_path}: {str(e)}")
             return False
     
+    @classmethod
+    def _update_json_file(cls, file_path: str, apply: Callable[[Any], Any], default: Any = None) -> bool:
+        """Optimistic read-modify-write of a JSON file; apply returns the new document, or None to skip the write"""
+        try:
+            name = cls._sqlite_name(file_path)
+            full_path = os.path.join(os.path.dirname(__file__), file_path)
+            if name:
+                updated = sqlite_store.update_document(name, apply, default)
+            elif default is None:
+                updated = json_store.update(full_path, apply)
+            else:
+                updated = json_store.update(full_path, apply, default)
+            return updated is not None
+        except Exception as e:
+            logger.error(f"Error updating JSON file {file_path}: {str(e)}")
+            return False
+    
     @classmethod
     def get_metadata(cls) -> Dict[str, Any]:
         """Load metadata.json"""
@@ -55,9 +95,7 @@ class JobConfiguration:
     def update_metadata(cls, updates: Dict[str, Any]) -> bool:
         """Update metadata.json with new data"""
         try:
-            current_metadata = cls.get_metadata()
-            current_metadata.update(updates)
-            return cls._save_json_file(cls.METADATA_PATH, current_metadata)
+            return cls._update_json_file(cls.METADATA_PATH, lambda metadata: {**metadata, **updates}, {})
         except Exception as e:
             logger.error(f"Failed to update metadata: {str(e)}")
             return False
@@ -76,6 +114,14 @@ class JobConfiguration:
     def get_hyperparameter_by_uid(cls, uid: str) -> Optional[Dict[str, Any]]:
         """Get specific hyperparameter configuration by UID"""
         try:
+            if SQLITE_ENABLED:
+                aliases = sqlite_store.load_fields("hyperparameter-config.json").get('aliases', {})
+                uid = aliases.get(uid, uid)
+                config = sqlite_store.get_record("hyperparameters", uid)
+                if config is None:
+                    logger.warning(f"Hyperparameter UID not found: {uid}")
+                return config
+            
             config_data = cls.get_hyperparameter_config()
             
             # Check if UID is an alias first
@@ -100,17 +146,23 @@ class JobConfiguration:
     def get_dataset_by_uid(cls, uid: str) -> Optional[Dict[str, Any]]:
         """Get dataset information by UID"""
         try:
-            datasets_data = cls._load_json_file(cls.DATASETS_PATH)
+            if SQLITE_ENABLED:
+                dataset = sqlite_store.get_record("datasets", uid)
+                if dataset is None:
+                    logger.warning(f"Dataset UID not found: {uid}")
+                return dataset
             
-            # Handle both array format and object format
-            if isinstance(datasets_data, list):
-                datasets = datasets_data
-            else:
-                datasets = datasets_data.get('datasets', [])
+            def build(datasets_data: Any) -> Dict[Any, Any]:
+                # Handle both array format and object format
+                if isinstance(datasets_data, list):
+                    datasets = datasets_data
+                else:
+                    datasets = datasets_data.get('datasets', [])
+                return index_records(datasets, ('uid',))
             
-            for dataset in datasets:
-                if dataset.get('uid') == uid:
-                    return dataset
+            dataset = cls._index_json_file(cls.DATASETS_PATH, "uid", build).get(uid)
+            if dataset is not None:
+                return dataset
             
             logger.warning(f"Dataset UID not found: {uid}")
             return None
@@ -123,21 +175,26 @@ class JobConfiguration:
     def get_model_by_uid(cls, uid: str) -> Optional[Dict[str, Any]]:
         """Get model information by UID"""
         try:
-            models_data = cls._load_json_file(cls.MODELS_PATH)
+            if SQLITE_ENABLED:
+                model = sqlite_store.get_record("models", uid)
+                if model is None:
+                    logger.warning(f"Model UID not found: {uid}")
+                return model
             
-            # Handle both array format and object format
-            if isinstance(models_data, dict) and 'models' in models_data:
-                models = models_data.get('models', [])
-            elif isinstance(models_data, list):
-                models = models_data
-            else:
-                models = []
+            def build(models_data: Any) -> Dict[Any, Any]:
+                # Handle both array format and object format
+                if isinstance(models_data, dict) and 'models' in models_data:
+                    models = models_data.get('models', [])
+                elif isinstance(models_data, list):
+                    models = models_data
+                else:
+                    models = []
+                # Both uid and id fields, keyed as strings so numeric ids match
+                return index_records(models, ('uid', 'id'), key=str)
             
-            for model in models:
-                # Check both uid and id fields, and handle string/number comparison
-                if (str(model.get('uid')) == str(uid) or 
-                    str(model.get('id')) == str(uid)):
-                    return model
+            model = cls._index_json_file(cls.MODELS_PATH, "uid_or_id", build).get(str(uid))
+            if model is not None:
+                return model
             
             logger.warning(f"Model UID not found: {uid}")
             return None
@@ -302,12 +359,6 @@ class JobConfiguration:
             Dictionary with success status and job UID
         """
         try:
-            # Load existing jobs
-            try:
-                jobs_data = cls._load_json_file(cls.JOBS_PATH)
-            except FileNotFoundError:
-                jobs_data = {"jobs": []}
-            
             # Generate unique job UID
             timestamp = int(time.time() * 1000)
             job_uid = cls.generate_job_uid(job_data)
@@ -338,28 +389,19 @@ class JobConfiguration:
                 }
             }
             
-            # Add to jobs list
-            if 'jobs' not in jobs_data:
-                jobs_data['jobs'] = []
-            
-            jobs_data['jobs'].append(job_record)
-            
-            # Save updated jobs data
-            success = cls._save_json_file(cls.JOBS_PATH, jobs_data)
-            
-            if success:
-                logger.info(f"Successfully created finetuning job: {job_uid}")
-                return {
-                    "success": True,
-                    "message": "Finetuning job created successfully",
-                    "jobUid": job_uid,
-                    "job": job_record
-                }
+            # Add to jobs list: one row, or one journal line folded into jobs.json later
+            if SQLITE_ENABLED:
+                sqlite_store.append_record("jobs", job_record)
             else:
-                return {
-                    "success": False,
-                    "message": "Failed to save job data"
-                }
+                job_journal.append_create(job_record)
+            
+            logger.info(f"Successfully created finetuning job: {job_uid}")
+            return {
+                "success": True,
+                "message": "Finetuning job created successfully",
+                "jobUid": job_uid,
+                "job": job_record
+            }
                 
         except Exception as e:
             logger.error(f"Error creating finetuning job: {str(e)}")
@@ -368,6 +410,18 @@ class JobConfiguration:
                 "message": f"Failed to create job: {str(e)}"
             }
     
+    @classmethod
+    def update_finetuning_job(cls, uid: str, updates: Dict[str, Any]) -> bool:
+        """Change fields of a job in jobs.json; False if no job has that UID"""
+        changes = {**updates, "lastModified": time.strftime('%Y-%m-%dT%H:%M:%S.000Z')}
+        try:
+            if SQLITE_ENABLED:
+                return sqlite_store.update_record("jobs", uid, lambda job: {**job, **changes}) is not None
+            return job_journal.append_update(uid, changes)
+        except Exception as e:
+            logger.error(f"Error updating finetuning job {uid}: {str(e)}")
+            return False
+    
     @classmethod
     def get_all_jobs(cls) -> Dict[str, Any]:
         """Get all finetuning jobs"""
@@ -379,23 +433,54 @@ class JobConfiguration:
             logger.error(f"Error loading jobs: {str(e)}")
             return {"jobs": []}
     
+    @classmethod
+    def _data_file_path(cls, filename: str) -> str:
+        """Path of a data file relative to this module"""
+        # Map common filenames to their paths
+        path_mapping = {
+            "current-jobs.json": "../../src/data/current-jobs.json",
+            "past-jobs.json": "../../src/data/past-jobs.json",
+            "metadata.json": cls.METADATA_PATH,
+            "hyperparameter-config.json": cls.HYPERPARAMETER_CONFIG_PATH,
+            "datasets.json": cls.DATASETS_PATH,
+            "models.json": cls.MODELS_PATH,
+            "jobs.json": cls.JOBS_PATH
+        }
+        return path_mapping.get(filename, f"../../src/data/{filename}")
+    
     @classmethod
     def load_json_file(cls, filename: str) -> Dict[str, Any]:
         """Load JSON file from data directory - public method for main.py"""
         try:
-            # Map common filenames to their paths
-            path_mapping = {
-                "current-jobs.json": "../../src/data/current-jobs.json",
-                "past-jobs.json": "../../src/data/past-jobs.json",
-                "metadata.json": cls.METADATA_PATH,
-                "hyperparameter-config.json": cls.HYPERPARAMETER_CONFIG_PATH,
-                "datasets.json": cls.DATASETS_PATH,
-                "models.json": cls.MODELS_PATH,
-                "jobs.json": cls.JOBS_PATH
-            }
-            
-            file_path = path_mapping.get(filename, f"../../src/data/{filename}")
-            return cls._load_json_file(file_path)
+            return cls._load_json_file(cls._data_file_path(filename))
         except Exception as e:
             logger.error(f"Error loading {filename}: {str(e)}")
             return {"jobs": [], "statistics": {}}
+    
+    @classmethod
+    def find_job(cls, filename: str, uid: str) -> Optional[Dict[str, Any]]:
+        """Job with the given UID in a jobs file (current-jobs.json, past-jobs.json or jobs.json)"""
+        if SQLITE_ENABLED and filename in DATA_FILES:
+            return sqlite_store.get_record(DATA_FILES[filename][0], uid)
+        if filename == "jobs.json":
+            return job_journal.get(uid)
+        try:
+            jobs = cls._index_json_file(
+                cls._data_file_path(filename), "uid",
+                lambda data: index_records(data.get("jobs", []) if isinstance(data, dict) else [], ("uid",))
+            )
+        except Exception as e:
+            logger.error(f"Error loading {filename}: {str(e)}")
+            return None
+        return jobs.get(uid)
+    
+    @classmethod
+    def job_status_counts(cls, filename: str) -> Dict[str, int]:
+        """Number of jobs per status in a jobs file"""
+        if SQLITE_ENABLED and filename in DATA_FILES:
+            return sqlite_store.status_counts(DATA_FILES[filename][0])
+        counts: Dict[str, int] = {}
+        for job in cls.load_json_file(filename).get("jobs", []):
+            status = job.get("status") or ""
+            counts[status] = counts.get(status, 0) + 1
+        return counts
@@ -1,53 +1,84 @@
 __all__ = ["ModelSelection"]
-import json
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 from huggingface_hub import HfApi, model_info
 import re
 
+from app.utils.json_store import index_records, json_store
+from app.utils.sqlite_store import SQLITE_ENABLED, sqlite_store
+
 MODELS_PATH = Path(__file__).parent.parent.parent / "src" / "data" / "models.json"
 
 class ModelSelection:
     @staticmethod
     def load_models() -> Dict[str, Any]:
         """Load complete models data including models, categories, and providers"""
-        if MODELS_PATH.exists():
-            with open(MODELS_PATH, "r", encoding="utf-8") as f:
-                return json.load(f)
-        return {"models": [], "categories": ["All Models"], "providers": ["All Providers"]}
+        default = {"models": [], "categories": ["All Models"], "providers": ["All Providers"]}
+        if SQLITE_ENABLED:
+            try:
+                return sqlite_store.load_document("models.json")
+            except FileNotFoundError:
+                return default
+        return json_store.load(MODELS_PATH, default)
     
     @staticmethod
     def get_models_list() -> List[Dict[str, Any]]:
         """Get just the models list for internal use"""
+        if SQLITE_ENABLED:
+            return sqlite_store.list_records("models")
         data = ModelSelection.load_models()
         return data.get("models", [])
 
+    @staticmethod
+    def context_lengths() -> Dict[str, int]:
+        """contextLength of every stored model that declares one, by model id"""
+        return {
+            model["id"]: int(model["contextLength"])
+            for model in ModelSelection.get_models_list()
+            if model.get("id") and isinstance(model.get("contextLength"), (int, float))
+        }
+
     @staticmethod
     def model_exists(model_id: str) -> bool:
         """Check if a model already exists in the collection"""
-        models = ModelSelection.get_models_list()
-        return any(model.get("id") == model_id for model in models)
+        if SQLITE_ENABLED:
+            return sqlite_store.get_record("models", model_id) is not None
+        by_id = json_store.index(
+            MODELS_PATH, "id", lambda data: index_records(data.get("models", []) if isinstance(data, dict) else [], ("id",))
+        )
+        return model_id in by_id
 
     @staticmethod
     def remove_model(model_id: str) -> Dict[str, Any]:
         """Remove a model from the collection"""
-        if MODELS_PATH.exists():
-            with open(MODELS_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        else:
+        if SQLITE_ENABLED:
+            if sqlite_store.delete_records("models", model_id):
+                return {
+                    "success": True,
+                    "message": f"Successfully removed model '{model_id}'"
+                }
+            return {
+                "success": False,
+                "message": f"Model '{model_id}' not found"
+            }
+
+        def apply(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            models = data.get("models", [])
+            remaining = [m for m in models if m.get("id") != model_id]
+            if len(remaining) == len(models):
+                return None
+            data["models"] = remaining
+            return data
+
+        try:
+            removed = json_store.update(MODELS_PATH, apply)
+        except FileNotFoundError:
             return {
                 "success": False,
                 "message": "Models file not found"
             }
         
-        models = data.get("models", [])
-        original_count = len(models)
-        models = [m for m in models if m.get("id") != model_id]
-        
-        if len(models) < original_count:
-            data["models"] = models
-            with open(MODELS_PATH, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+        if removed is not None:
             return {
                 "success": True,
                 "message": f"Successfully removed model '{model_id}'"
@@ -292,30 +323,34 @@ class ModelSelection:
         # Get enhanced model information
         enhanced_model = ModelSelection.get_enhanced_model_info(model_id)
         
-        # Load existing data
-        if MODELS_PATH.exists():
-            with open(MODELS_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        else:
-            data = {"models": [], "categories": [], "providers": []}
-        
-        models = data.get("models", [])
-        models.append(enhanced_model)
-        data["models"] = models
-        
-        # Update categories and providers lists
-        categories = set(data.get("categories", ["All Models"]))
-        providers = set(data.get("providers", ["All Providers"]))
+        if SQLITE_ENABLED:
+            return ModelSelection._add_model_sqlite(enhanced_model)
         
-        categories.add(enhanced_model["category"])
-        providers.add(enhanced_model["provider"])
-        
-        data["categories"] = sorted(list(categories))
-        data["providers"] = sorted(list(providers))
+        def apply(data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            models = data.get("models", [])
+            # Another request may have added the model since the check above
+            if any(model.get("id") == model_id for model in models):
+                return None
+            models.append(enhanced_model)
+            data["models"] = models
+            
+            # Update categories and providers lists
+            categories = set(data.get("categories", ["All Models"]))
+            providers = set(data.get("providers", ["All Providers"]))
+            
+            categories.add(enhanced_model["category"])
+            providers.add(enhanced_model["provider"])
+            
+            data["categories"] = sorted(list(categories))
+            data["providers"] = sorted(list(providers))
+            return data
         
-        # Save to file
-        with open(MODELS_PATH, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        if json_store.update(MODELS_PATH, apply, {"models": [], "categories": [], "providers": []}) is None:
+            return {
+                "success": False,
+                "error": "duplicate",
+                "message": f"Model '{model_id}' already exists in your collection"
+            }
         
         return {
             "success": True,
@@ -323,6 +358,29 @@ class ModelSelection:
             "message": f"Successfully added '{enhanced_model['name']}' to your collection"
         }
 
+    @staticmethod
+    def _add_model_sqlite(enhanced_model: Dict[str, Any]) -> Dict[str, Any]:
+        """Insert one model row and update the category/provider lists in a single transaction"""
+        model_id = enhanced_model.get("id")
+        with sqlite_store.transaction():
+            if sqlite_store.get_record("models", model_id) is not None:
+                return {
+                    "success": False,
+                    "error": "duplicate",
+                    "message": f"Model '{model_id}' already exists in your collection"
+                }
+            sqlite_store.append_record("models", enhanced_model)
+            sqlite_store.update_fields("models.json", lambda fields: {
+                **fields,
+                "categories": sorted(set(fields.get("categories", ["All Models"])) | {enhanced_model["category"]}),
+                "providers": sorted(set(fields.get("providers", ["All Providers"])) | {enhanced_model["provider"]}),
+            })
+        return {
+            "success": True,
+            "model": enhanced_model,
+            "message": f"Successfully added '{enhanced_model['name']}' to your collection"
+        }
+
     @staticmethod
     def search_huggingface_models(query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search HuggingFace models with enhanced data extraction"""
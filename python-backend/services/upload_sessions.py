@@ -0,0 +1,324 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import uuid
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import aiofiles
+
+from app.core.exceptions import UploadSessionConflict, UploadSessionNotFound, ValidationError
+from app.utils.file_utils import (
+    ensure_directory_exists,
+    get_uploads_directory,
+    to_upload_url_path,
+)
+from app.utils.dataset_formats import SUPPORTED_DATASET_EXTENSIONS
+from app.utils.json_store import file_lock, lock_path_for
+from app.utils.validation import sanitize_filename
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+
+_SESSION_ID = re.compile(r"^[0-9a-f]{32}$")
+
+# Read size when re-hashing chunks
+_HASH_BUFFER = 1024 * 1024
+
+
+def _verify_chunks(data_path: str, manifest: Dict[str, Any], received: Dict[int, str]) -> Tuple[str, List[int]]:
+    """SHA-256 of the whole file, and the chunks whose bytes no longer match their recorded digest"""
+    whole = hashlib.sha256()
+    corrupt = []
+    with open(data_path, 'rb') as f:
+        for index in range(manifest["total_chunks"]):
+            chunk = hashlib.sha256()
+            remaining = min(manifest["chunk_size"], manifest["total_size"] - index * manifest["chunk_size"])
+            while remaining:
+                data = f.read(min(_HASH_BUFFER, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                chunk.update(data)
+                whole.update(data)
+            if remaining or chunk.hexdigest() != received.get(index):
+                corrupt.append(index)
+    return whole.hexdigest(), corrupt
+
+
+class UploadSessions:
+    """Resumable chunked uploads written straight into the uploads directory.
+
+    Each session preallocates <uploads>/.sessions/<id>.part and records one
+    marker file per verified chunk, so chunks can arrive in any order, in
+    parallel, and survive a server restart. Chunk writes hold the session's
+    <id>.lock sidecar shared and complete()/abort() hold it exclusively, so the
+    file is never moved or removed under a write; whoever loses gets
+    UploadSessionConflict instead of waiting.
+    """
+
+    @staticmethod
+    def _sessions_dir() -> Path:
+        path = Path(get_uploads_directory()) / ".sessions"
+        ensure_directory_exists(str(path))
+        return path
+
+    @classmethod
+    def _session_dir(cls, session_id: str) -> Path:
+        if not _SESSION_ID.match(session_id or ""):
+            raise UploadSessionNotFound(f"Upload session not found: {session_id}")
+        return cls._sessions_dir() / session_id
+
+    @classmethod
+    def _data_path(cls, session_id: str) -> Path:
+        return cls._sessions_dir() / f"{session_id}.part"
+
+    @classmethod
+    def create(cls, filename: str, total_size: int, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+        """Start a session and preallocate the target file"""
+        filename = sanitize_filename(os.path.basename(filename or ""))
+        if not filename or not filename.lower().endswith(SUPPORTED_DATASET_EXTENSIONS):
+            raise ValidationError(f"Unsupported file type, expected one of: {', '.join(SUPPORTED_DATASET_EXTENSIONS)}")
+        if total_size <= 0:
+            raise ValidationError("total_size must be positive")
+        if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+            raise ValidationError(f"chunk_size must be between {MIN_CHUNK_SIZE} and {MAX_CHUNK_SIZE} bytes")
+
+        session_id = uuid.uuid4().hex
+        session_dir = cls._session_dir(session_id)
+        ensure_directory_exists(str(session_dir))
+        with open(cls._data_path(session_id), 'wb') as f:
+            f.truncate(total_size)
+
+        manifest = {
+            "id": session_id,
+            "filename": filename,
+            "total_size": total_size,
+            "chunk_size": chunk_size,
+            "total_chunks": (total_size + chunk_size - 1) // chunk_size,
+            "created_at": time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime()),
+            "status": "uploading",
+        }
+        with open(session_dir / "manifest.json", 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        logger.info(f"Created upload session {session_id} for {filename} ({total_size} bytes)")
+        return cls.get(session_id)
+
+    @classmethod
+    def _manifest(cls, session_id: str) -> Dict[str, Any]:
+        manifest_path = cls._session_dir(session_id) / "manifest.json"
+        if not manifest_path.exists():
+            raise UploadSessionNotFound(f"Upload session not found: {session_id}")
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    @classmethod
+    def _save_manifest(cls, session_id: str, manifest: Dict[str, Any]) -> None:
+        manifest_path = cls._session_dir(session_id) / "manifest.json"
+        tmp_path = manifest_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, manifest_path)
+
+    @classmethod
+    def _lock(cls, session_id: str, shared: bool) -> ExitStack:
+        """Session lock taken without waiting; raises UploadSessionConflict if the other side holds it"""
+        stack = ExitStack()
+        try:
+            stack.enter_context(file_lock(str(cls._session_dir(session_id)), shared=shared, blocking=False))
+        except BlockingIOError:
+            raise UploadSessionConflict(
+                f"Upload session {session_id} is being completed" if shared
+                else f"Upload session {session_id} has chunks or a completion in progress; try again"
+            )
+        return stack
+
+    @classmethod
+    def _marker_path(cls, session_id: str, index: int) -> Path:
+        return cls._session_dir(session_id) / f"chunk_{index:06d}.sha256"
+
+    @classmethod
+    def _received_chunks(cls, session_id: str) -> Dict[int, str]:
+        received = {}
+        with os.scandir(cls._session_dir(session_id)) as entries:
+            for entry in entries:
+                if entry.name.startswith("chunk_") and entry.name.endswith(".sha256"):
+                    with open(entry.path, 'r', encoding='utf-8') as f:
+                        received[int(entry.name[6:-7])] = f.read().strip()
+        return received
+
+    @classmethod
+    def get(cls, session_id: str) -> Dict[str, Any]:
+        """Session manifest plus the received and missing chunk numbers"""
+        manifest = cls._manifest(session_id)
+        received = cls._received_chunks(session_id)
+        missing = [i for i in range(manifest["total_chunks"]) if i not in received]
+        return {
+            **manifest,
+            "received_chunks": sorted(received),
+            "missing_chunks": missing,
+            "received_bytes": sum(cls._chunk_length(manifest, i) for i in received),
+            "contiguous_bytes": cls._contiguous_bytes(manifest, received),
+        }
+
+    @staticmethod
+    def _chunk_length(manifest: Dict[str, Any], index: int) -> int:
+        start = index * manifest["chunk_size"]
+        return min(manifest["chunk_size"], manifest["total_size"] - start)
+
+    @classmethod
+    def _contiguous_bytes(cls, manifest: Dict[str, Any], received: Dict[int, str]) -> int:
+        """Length of the prefix of the file covered by received chunks"""
+        index = 0
+        while index in received:
+            index += 1
+        return min(index * manifest["chunk_size"], manifest["total_size"])
+
+    @classmethod
+    async def write_chunk(
+        cls,
+        session_id: str,
+        index: int,
+        body: AsyncIterator[bytes],
+        expected_sha256: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Write one chunk straight into the session file at its offset, hashing it on the way.
+
+        The chunk's marker is dropped before the write and recorded only once its
+        length and (optionally) its SHA-256 check out, so a failed or aborted
+        re-send leaves the chunk missing rather than wrongly verified.
+        """
+        manifest = cls._manifest(session_id)
+        if not 0 <= index < manifest["total_chunks"]:
+            raise ValidationError(f"Chunk index must be between 0 and {manifest['total_chunks'] - 1}")
+
+        with cls._lock(session_id, shared=True):
+            manifest = cls._manifest(session_id)
+            if manifest["status"] != "uploading":
+                raise UploadSessionConflict(f"Upload session {session_id} is {manifest['status']}")
+            marker = cls._marker_path(session_id, index)
+            try:
+                os.remove(marker)
+            except FileNotFoundError:
+                pass
+
+            expected_length = cls._chunk_length(manifest, index)
+            hasher = hashlib.sha256()
+            written = 0
+            async with aiofiles.open(cls._data_path(session_id), 'r+b') as f:
+                await f.seek(index * manifest["chunk_size"])
+                async for piece in body:
+                    if not piece:
+                        continue
+                    written += len(piece)
+                    if written > expected_length:
+                        raise ValidationError(f"Chunk {index} exceeds its expected length of {expected_length} bytes")
+                    hasher.update(piece)
+                    await f.write(piece)
+                await f.flush()
+                await asyncio.to_thread(os.fsync, f.fileno())
+
+            if written != expected_length:
+                raise ValidationError(f"Chunk {index} has {written} bytes, expected {expected_length}")
+            digest = hasher.hexdigest()
+            if expected_sha256 and expected_sha256.lower() != digest:
+                raise ValidationError(f"Chunk {index} failed SHA-256 verification")
+
+            tmp_marker = marker.with_suffix(".tmp")
+            with open(tmp_marker, 'w', encoding='utf-8') as mf:
+                mf.write(digest)
+            os.replace(tmp_marker, marker)
+        return {"index": index, "size": written, "sha256": digest}
+
+    @classmethod
+    def data_path(cls, session_id: str) -> str:
+        manifest = cls._manifest(session_id)
+        return manifest.get("path") or str(cls._data_path(session_id))
+
+    @classmethod
+    async def complete(cls, session_id: str, expected_sha256: Optional[str] = None) -> Dict[str, Any]:
+        """Re-hash every chunk against its recorded digest and move the file into the datasets upload directory.
+
+        Completing an already completed session returns the same result again.
+        """
+        manifest = cls._manifest(session_id)
+        if manifest["status"] == "completed":
+            return cls._completed_result(manifest)
+
+        with cls._lock(session_id, shared=False):
+            # Another complete() may have finished between the first read and the lock
+            manifest = cls._manifest(session_id)
+            if manifest["status"] == "completed":
+                return cls._completed_result(manifest)
+            received = cls._received_chunks(session_id)
+            missing: List[int] = [i for i in range(manifest["total_chunks"]) if i not in received]
+            if missing:
+                raise ValidationError(f"Upload incomplete, {len(missing)} chunk(s) missing starting at {missing[0]}")
+
+            data_path = cls._data_path(session_id)
+            digest, corrupt = await asyncio.to_thread(_verify_chunks, str(data_path), manifest, received)
+            if corrupt:
+                for index in corrupt:
+                    try:
+                        os.remove(cls._marker_path(session_id, index))
+                    except FileNotFoundError:
+                        pass
+                raise ValidationError(
+                    f"{len(corrupt)} chunk(s) no longer match their SHA-256, starting at {corrupt[0]}; upload them again"
+                )
+            if expected_sha256 and expected_sha256.lower() != digest:
+                raise ValidationError("Uploaded file failed SHA-256 verification")
+
+            datasets_dir = Path(get_uploads_directory()) / "datasets"
+            ensure_directory_exists(str(datasets_dir))
+            final_path = datasets_dir / f"{session_id[:8]}_{manifest['filename']}"
+            os.replace(data_path, final_path)
+            # The manifest and chunk markers stay behind so a repeated complete returns the same result;
+            # the storage sweeper removes completed sessions
+            manifest.update({
+                "status": "completed",
+                "path": str(final_path),
+                "sha256": digest,
+                "completed_at": time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime()),
+            })
+            cls._save_manifest(session_id, manifest)
+        logger.info(f"Completed upload session {session_id}: {final_path}")
+        return cls._completed_result(manifest)
+
+    @staticmethod
+    def _completed_result(manifest: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": manifest["id"],
+            "filename": manifest["filename"],
+            "path": manifest["path"],
+            "filePath": to_upload_url_path(manifest["path"]),
+            "size_bytes": manifest["total_size"],
+            "sha256": manifest["sha256"],
+            "status": "completed",
+        }
+
+    @classmethod
+    def abort(cls, session_id: str) -> bool:
+        """Discard a session and its partial data"""
+        cls._manifest(session_id)
+        with cls._lock(session_id, shared=False):
+            try:
+                os.remove(cls._data_path(session_id))
+            except FileNotFoundError:
+                pass
+            shutil.rmtree(cls._session_dir(session_id), ignore_errors=True)
+        try:
+            os.remove(lock_path_for(str(cls._session_dir(session_id))))
+        except FileNotFoundError:
+            pass
+        logger.info(f"Aborted upload session {session_id}")
+        return True
@@ -1,10 +1,16 @@
 import { NextRequest, NextResponse } from 'next/server';
 import fs from 'fs';
 import path from 'path';
+import { fetchBackend, postToBackend, writeJsonFile } from '../../../utils/dataFiles';
 
 const DATASETS_FILE = path.join(process.cwd(), 'src', 'data', 'datasets.json');
 
 export async function GET() {
+  const response = await fetchBackend('/api/datasets?raw=true');
+  if (response?.ok) {
+    return NextResponse.json(await response.json());
+  }
+
   try {
     const data = fs.readFileSync(DATASETS_FILE, 'utf8');
     const datasets = JSON.parse(data);
@@ -18,7 +24,11 @@ export async function GET() {
 export async function POST(request: NextRequest) {
   try {
     const datasets = await request.json();
-    fs.writeFileSync(DATASETS_FILE, JSON.stringify(datasets, null, 2));
+    const response = await postToBackend('/api/datasets', 'PUT', datasets);
+    if (response) {
+      return NextResponse.json({ success: response.ok }, { status: response.ok ? 200 : response.status });
+    }
+    await writeJsonFile(DATASETS_FILE, datasets);
     return NextResponse.json({ success: true });
   } catch (error) {
     console.error('Error saving datasets:', error);
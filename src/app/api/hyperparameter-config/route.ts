@@ -1,10 +1,16 @@
 import { NextRequest, NextResponse } from 'next/server';
 import path from 'path';
 import fs from 'fs/promises';
+import { fetchBackend, postToBackend, writeJsonFile } from '../../../utils/dataFiles';
 
 const CONFIG_PATH = path.join(process.cwd(), 'src', 'data', 'hyperparameter-config.json');
 
 export async function GET() {
+  const response = await fetchBackend('/api/hyperparameter-config');
+  if (response?.ok) {
+    return NextResponse.json(await response.json());
+  }
+
   try {
     const data = await fs.readFile(CONFIG_PATH, 'utf8');
     const configData = JSON.parse(data);
@@ -18,7 +24,11 @@ export async function GET() {
 export async function POST(request: NextRequest) {
   try {
     const configData = await request.json();
-    await fs.writeFile(CONFIG_PATH, JSON.stringify(configData, null, 2));
+    const response = await postToBackend('/api/hyperparameter-config', 'POST', configData);
+    if (response) {
+      return NextResponse.json({ success: response.ok }, { status: response.ok ? 200 : response.status });
+    }
+    await writeJsonFile(CONFIG_PATH, configData);
     return NextResponse.json({ success: true });
   } catch (error) {
     console.error('Error writing hyperparameter config:', error);
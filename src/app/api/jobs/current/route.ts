@@ -1,8 +1,14 @@
 import { NextResponse } from 'next/server';
 import path from 'path';
 import { promises as fs } from 'fs';
+import { fetchBackend } from '../../../../utils/dataFiles';
 
 export async function GET() {
+  const response = await fetchBackend('/api/jobs/current');
+  if (response?.ok) {
+    return NextResponse.json(await response.json());
+  }
+
   try {
     const jsonDirectory = path.join(process.cwd(), 'src', 'data');
     const fileContents = await fs.readFile(path.join(jsonDirectory, 'current-jobs.json'), 'utf8');
@@ -1,8 +1,15 @@
 import { NextResponse } from 'next/server';
 import path from 'path';
 import { promises as fs } from 'fs';
+import { fetchBackend } from '../../../utils/dataFiles';
 
 export async function GET() {
+  // The backend journals new jobs and folds them into jobs.json later, so ask it first
+  const response = await fetchBackend('/api/jobs/master');
+  if (response?.ok) {
+    return NextResponse.json(await response.json());
+  }
+
   try {
     const jsonDirectory = path.join(process.cwd(), 'src', 'data');
     const fileContents = await fs.readFile(path.join(jsonDirectory, 'jobs.json'), 'utf8');
@@ -1,6 +1,7 @@
 import { NextRequest, NextResponse } from 'next/server';
 import fs from 'fs';
 import path from 'path';
+import { fetchBackend, postToBackend, writeJsonFile } from '../../../utils/dataFiles';
 
 const METADATA_FILE_PATH = path.join(process.cwd(), 'src', 'data', 'metadata.json');
 
@@ -8,6 +9,11 @@ const METADATA_FILE_PATH = path.join(process.cwd(), 'src', 'data', 'metadata.jso
 // This is a mock implementation for development purposes
 
 export async function GET() {
+  const response = await fetchBackend('/api/metadata');
+  if (response?.ok) {
+    return NextResponse.json(await response.json());
+  }
+
   try {
     // Check if metadata file exists
     if (!fs.existsSync(METADATA_FILE_PATH)) {
@@ -43,8 +49,10 @@ export async function GET() {
         }
       };
       
-      // Create the file with default metadata
-      fs.writeFileSync(METADATA_FILE_PATH, JSON.stringify(defaultMetadata, null, 2));
+      // Create the metadata with its defaults, through the backend when it is running
+      if (!response || !(await postToBackend('/api/metadata', 'POST', defaultMetadata))?.ok) {
+        await writeJsonFile(METADATA_FILE_PATH, defaultMetadata);
+      }
       return NextResponse.json(defaultMetadata);
     }
     
@@ -66,8 +74,13 @@ export async function POST(request: NextRequest) {
     // TODO: Add validation for metadata structure
     // TODO: In real implementation, save to database instead of file
     
-    // Write metadata to file
-    fs.writeFileSync(METADATA_FILE_PATH, JSON.stringify(metadata, null, 2));
+    const response = await postToBackend('/api/metadata', 'POST', metadata);
+    if (response && !response.ok) {
+      return NextResponse.json({ error: 'Failed to save metadata' }, { status: response.status });
+    }
+    if (!response) {
+      await writeJsonFile(METADATA_FILE_PATH, metadata);
+    }
     
     console.log('Metadata saved successfully:', {
       sessionId: metadata.finetuningSession?.id,
@@ -64,7 +64,7 @@ export const DatasetPreviewModal: React.FC<DatasetPreviewModalProps> = ({
         description: description || `Uploaded dataset from ${previewData.filename}`, // Use description or fallback
         format: 'CSV',
         taskType: taskType || 'Text Classification',
-        samples: previewData.data.length,
+        samples: previewData.statistics?.total_rows ?? previewData.data.length,
         size: `${(previewData.data.length * 0.1).toFixed(1)} KB`, // Rough estimate
         tags: selectedTags || [],
         inputColumn: 'input',
@@ -85,7 +85,7 @@ export const DatasetPreviewModal: React.FC<DatasetPreviewModalProps> = ({
           description: description || `Uploaded dataset from ${previewData.filename}`, // Use description or fallback
           format: 'CSV',
           taskType: taskType || 'Text Classification',
-          samples: previewData.data.length,
+          samples: previewData.statistics?.total_rows ?? previewData.data.length,
           size: `${(previewData.data.length * 0.1).toFixed(1)} KB`, // Rough estimate
           tags: selectedTags || [],
           inputColumn: 'input',
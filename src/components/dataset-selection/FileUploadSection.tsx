@@ -1,4 +1,5 @@
 import React from 'react';
+import { CSV_FILE_EXTENSIONS } from '../../utils/filePreviewUtils';
 
 interface FileUploadSectionProps {
   isUploading: boolean;
@@ -119,14 +120,14 @@ export const FileUploadSection: React.FC<FileUploadSectionProps> = ({
               Drop your CSV dataset file here
             </div>
             <p className="text-sm text-gray-500 dark:text-gray-400 mb-1">
-              Currently supports CSV files up to 100MB
+              Currently supports CSV files (.csv, .csv.gz, .csv.zst) up to 100MB
             </p>
             <p className="text-xs text-blue-600 dark:text-blue-400 mb-4">
               JSONL and TXT support coming soon!
             </p>
             <input
               type="file"
-              accept=".csv"
+              accept={CSV_FILE_EXTENSIONS.join(',')}
               onChange={onFileUpload}
               className="hidden"
               id="file-upload"
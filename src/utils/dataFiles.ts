@@ -0,0 +1,43 @@
+// Server-side helpers for the JSON files under src/data, used by the API routes
+import { promises as fs } from 'fs';
+
+export const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://127.0.0.1:8000';
+
+// The backend owns src/data while it runs (it may keep it in SQLite), so the routes go through it
+// first; null means it is not reachable and the route falls back to the file
+export async function fetchBackend(pathname: string, init?: RequestInit): Promise<Response | null> {
+  try {
+    return await fetch(`${API_BASE_URL}${pathname}`, { cache: 'no-store', ...init });
+  } catch (error) {
+    console.log(`Backend not available for ${pathname}, using src/data directly`);
+    return null;
+  }
+}
+
+// Forward a JSON write to the backend; null when it is not reachable
+export async function postToBackend(pathname: string, method: string, data: unknown): Promise<Response | null> {
+  return fetchBackend(pathname, {
+    method,
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(data),
+  });
+}
+
+// Write to a temp file next to the target, fsync it, then rename it over the target,
+// so readers (including the Python backend) never see a half-written file
+export async function writeJsonFile(filePath: string, data: unknown): Promise<void> {
+  const tmpPath = `${filePath}.${process.pid}.${Math.random().toString(36).slice(2, 10)}.tmp`;
+  try {
+    const handle = await fs.open(tmpPath, 'w');
+    try {
+      await handle.writeFile(JSON.stringify(data, null, 2));
+      await handle.sync();
+    } finally {
+      await handle.close();
+    }
+    await fs.rename(tmpPath, filePath);
+  } catch (error) {
+    await fs.rm(tmpPath, { force: true });
+    throw error;
+  }
+}
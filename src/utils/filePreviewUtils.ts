@@ -108,6 +108,11 @@ export function validatePreviewColumns(previewData: any): string[] {
   return errors;
 }
 
+/**
+ * CSV file extensions accepted for upload; compressed files are inflated by the backend
+ */
+export const CSV_FILE_EXTENSIONS = ['.csv', '.csv.gz', '.csv.zst'];
+
 /**
  * Validates CSV file before processing
  */
@@ -115,8 +120,9 @@ export function validateCsvFile(file: File): string[] {
   const errors: string[] = [];
   
   // Check file type
-  if (!file.name.toLowerCase().endsWith('.csv')) {
-    errors.push('Only CSV files are supported');
+  const name = file.name.toLowerCase();
+  if (!CSV_FILE_EXTENSIONS.some(extension => name.endsWith(extension))) {
+    errors.push('Only CSV files (optionally .gz or .zst compressed) are supported');
   }
   
   // Check file size (max 10MB)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Encoding Fallback Test Script
+Tests that datasets which stop being UTF-8 after the detection sample decode as latin-1, not U+FFFD
+"""
+
+import codecs
+import io
+import os
+import sys
+import tempfile
+
+# Run against the backend package directly; no running services needed
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-backend"))
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    BLUE = '\033[94m'
+    BOLD = '\033[1m'
+    END = '\033[0m'
+
+def print_test_header(test_name: str):
+    print(f"\n{Colors.BLUE}{Colors.BOLD}{'='*60}{Colors.END}")
+    print(f"{Colors.BLUE}{Colors.BOLD}Testing: {test_name}{Colors.END}")
+    print(f"{Colors.BLUE}{Colors.BOLD}{'='*60}{Colors.END}")
+
+def print_success(message: str):
+    print(f"{Colors.GREEN}✓ {message}{Colors.END}")
+
+def print_error(message: str):
+    print(f"{Colors.RED}✗ {message}{Colors.END}")
+
+def late_latin1_csv(rows: int = 3000) -> bytes:
+    """UTF-8 (with one multi-byte character) well past the 64 KB detection sample, then a latin-1 byte"""
+    head = "input,output\n" + "".join(f"question {i},naïve answer {i:040d}\n" for i in range(rows))
+    return head.encode("utf-8") + "late question,café\n".encode("latin-1")
+
+def test_decoding_reader_falls_back_to_latin1():
+    """A late latin-1 byte switches the rest of the stream to latin-1"""
+    print_test_header("DecodingReader Fallback")
+    from app.utils.csv_encoding import ENCODING_SAMPLE_BYTES, DecodingReader, detect_encoding
+
+    data = late_latin1_csv()
+    assert len(data) > ENCODING_SAMPLE_BYTES
+    assert detect_encoding(data[:ENCODING_SAMPLE_BYTES]) == "utf-8"
+    for encoding, raw in (("utf-8", data), ("utf-8-sig", codecs.BOM_UTF8 + data)):
+        text = DecodingReader(io.BytesIO(raw), encoding, chunk_size=4096).read()
+        assert "�" not in text
+        assert text.endswith("late question,café\n"), text[-40:]
+        assert "naïve answer" in text
+    print_success("Valid prefix kept as UTF-8, rest decoded as latin-1")
+
+def test_rows_decode_late_latin1():
+    """Validation and row pages see the latin-1 cell as text, not replacement characters"""
+    print_test_header("Rows with a Late latin-1 Byte")
+    from app.utils import row_index
+    from app.utils.dataset_validation import plan_csv_validation, validate_csv_range
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "late_latin1.csv")
+        with open(path, "wb") as f:
+            f.write(late_latin1_csv())
+        plan = plan_csv_validation(path, 1)
+        start, end, newlines = plan["ranges"][0]
+        report = validate_csv_range(path, plan, start, end, newlines, ["input", "output"])
+        index_dir, row_index.INDEX_DIR = row_index.INDEX_DIR, directory
+        try:
+            page = row_index.read_rows(path, "late_latin1.csv", 2999, 2)
+        finally:
+            row_index.INDEX_DIR = index_dir
+
+    assert report["rows"] == 3001 and report["malformed"]["count"] == 0, report
+    assert page["rows"][-1] == {"input": "late question", "output": "café"}, page["rows"]
+    print_success("Late latin-1 cell decoded as 'café'")
+
+def main():
+    """Run all encoding fallback tests"""
+    print(f"{Colors.BOLD}AI Fine-tuning Dashboard - Encoding Fallback Test{Colors.END}")
+
+    results = []
+    for test in (test_decoding_reader_falls_back_to_latin1, test_rows_decode_late_latin1):
+        try:
+            test()
+            results.append((test.__name__, True))
+        except Exception as e:
+            print_error(f"{test.__name__}: {e!r}")
+            results.append((test.__name__, False))
+
+    print_test_header("Test Results Summary")
+    for test_name, success in results:
+        status = f"{Colors.GREEN}PASS{Colors.END}" if success else f"{Colors.RED}FAIL{Colors.END}"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    print(f"\nOverall: {passed}/{len(results)} tests passed")
+    sys.exit(0 if passed == len(results) else 1)
+
+if __name__ == "__main__":
+    main()
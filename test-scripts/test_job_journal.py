@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Job Journal Test Script
+Tests replaying the jobs.json journal after a crash, and folding it into the snapshot
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+# Run against the backend package directly; no running services needed
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-backend"))
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    BLUE = '\033[94m'
+    BOLD = '\033[1m'
+    END = '\033[0m'
+
+def print_test_header(test_name: str):
+    print(f"\n{Colors.BLUE}{Colors.BOLD}{'='*60}{Colors.END}")
+    print(f"{Colors.BLUE}{Colors.BOLD}Testing: {test_name}{Colors.END}")
+    print(f"{Colors.BLUE}{Colors.BOLD}{'='*60}{Colors.END}")
+
+def print_success(message: str):
+    print(f"{Colors.GREEN}✓ {message}{Colors.END}")
+
+def print_error(message: str):
+    print(f"{Colors.RED}✗ {message}{Colors.END}")
+
+def new_journal(directory: str):
+    """A journal over jobs.json in directory, as a freshly started backend would open it"""
+    from app.utils.job_journal import JobJournal
+    return JobJournal(os.path.join(directory, "jobs.json"), compact_seconds=0)
+
+def record_jobs(journal, count: int):
+    """Create jobs job-0..job-N and move every other one to running"""
+    for i in range(count):
+        journal.append_create({"uid": f"job-{i}", "status": "pending"})
+    for i in range(0, count, 2):
+        journal.append_update(f"job-{i}", {"status": "running"})
+
+def expected_jobs(count: int):
+    return [{"uid": f"job-{i}", "status": "running" if i % 2 == 0 else "pending"} for i in range(count)]
+
+def read_snapshot(directory: str):
+    with open(os.path.join(directory, "jobs.json"), encoding="utf-8") as f:
+        return json.load(f)
+
+def test_replay_after_torn_append():
+    """A line cut short by a crash is ignored on replay and dropped by the next append"""
+    print_test_header("Replay After a Torn Append")
+    with tempfile.TemporaryDirectory() as directory:
+        journal = new_journal(directory)
+        record_jobs(journal, 5)
+        with open(journal.journal_path, "ab") as f:
+            f.write(b'{"seq": 99, "op": "create", "job": {"uid": "jo')
+
+        restarted = new_journal(directory)
+        assert restarted.load()["jobs"] == expected_jobs(5), restarted.load()
+        restarted.append_create({"uid": "job-5", "status": "pending"})
+
+        replayed = new_journal(directory)
+        assert [job["uid"] for job in replayed.load()["jobs"]] == [f"job-{i}" for i in range(6)]
+        with open(journal.journal_path, "rb") as f:
+            for line in f:
+                json.loads(line)
+    print_success("Torn line skipped on replay and truncated before the next append")
+
+def test_crash_between_snapshot_and_journal():
+    """Events already folded into jobs.json but still in the journal are not applied twice"""
+    print_test_header("Crash Between Snapshot and Journal Swap")
+    with tempfile.TemporaryDirectory() as directory:
+        journal = new_journal(directory)
+        record_jobs(journal, 4)
+
+        def crash(tail):
+            raise RuntimeError("simulated crash before the journal was replaced")
+
+        journal._replace_journal = crash
+        try:
+            journal.compact()
+            raise AssertionError("compaction did not crash")
+        except RuntimeError:
+            pass
+        assert read_snapshot(directory)["jobs"] == expected_jobs(4)
+
+        restarted = new_journal(directory)
+        assert restarted.load()["jobs"] == expected_jobs(4), restarted.load()
+        restarted.append_update("job-1", {"status": "completed"})
+        restarted.compact()
+
+        snapshot = read_snapshot(directory)
+        assert "_journalSeq" not in snapshot, snapshot
+        assert snapshot["jobs"][1] == {"uid": "job-1", "status": "completed"}
+        assert len(snapshot["jobs"]) == 4
+    print_success("Journal replayed over the newer snapshot without duplicates")
+
+def test_compaction():
+    """Compaction folds events into jobs.json and restarts the journal with only a header"""
+    print_test_header("Compaction")
+    with tempfile.TemporaryDirectory() as directory:
+        journal = new_journal(directory)
+        record_jobs(journal, 6)
+        result = journal.compact()
+        assert result["events"] == 9 and result["jobs"] == 6, result
+        assert read_snapshot(directory) == {"jobs": expected_jobs(6)}
+
+        with open(journal.journal_path, "rb") as f:
+            lines = f.read().splitlines()
+        assert [json.loads(line) for line in lines] == [{"folded": 9}], lines
+        assert journal.compact() == {"events": 0}
+        assert journal.stats()["pending_events"] == 0
+
+        journal.append_create({"uid": "job-6", "status": "pending"})
+        restarted = new_journal(directory)
+        assert restarted.load()["jobs"] == expected_jobs(6) + [{"uid": "job-6", "status": "pending"}]
+        assert restarted.stats()["pending_events"] == 1
+    print_success("Snapshot holds every job, journal keeps only the folded sequence number")
+
+def test_legacy_snapshot_sequence():
+    """A jobs.json written with _journalSeq skips the events it already holds, and loses the field on compaction"""
+    print_test_header("Legacy Snapshot Sequence")
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, "jobs.json"), "w", encoding="utf-8") as f:
+            json.dump({"jobs": [{"uid": "job-0", "status": "running"}], "_journalSeq": 2}, f)
+        with open(os.path.join(directory, "jobs.json.journal.jsonl"), "w", encoding="utf-8") as f:
+            f.write(json.dumps({"seq": 1, "op": "create", "job": {"uid": "job-0", "status": "pending"}}) + "\n")
+            f.write(json.dumps({"seq": 2, "op": "update", "uid": "job-0", "changes": {"status": "running"}}) + "\n")
+            f.write(json.dumps({"seq": 3, "op": "create", "job": {"uid": "job-1", "status": "pending"}}) + "\n")
+
+        journal = new_journal(directory)
+        assert journal.load() == {"jobs": [{"uid": "job-0", "status": "running"}, {"uid": "job-1", "status": "pending"}]}
+        assert journal.stats()["pending_events"] == 1
+        journal.compact()
+        assert "_journalSeq" not in read_snapshot(directory)
+    print_success("Folded events skipped, _journalSeq dropped from jobs.json")
+
+def main():
+    """Run all job journal tests"""
+    print(f"{Colors.BOLD}AI Fine-tuning Dashboard - Job Journal Test{Colors.END}")
+
+    results = []
+    for test in (test_replay_after_torn_append, test_crash_between_snapshot_and_journal, test_compaction, test_legacy_snapshot_sequence):
+        try:
+            test()
+            results.append((test.__name__, True))
+        except Exception as e:
+            print_error(f"{test.__name__}: {e!r}")
+            results.append((test.__name__, False))
+
+    print_test_header("Test Results Summary")
+    for test_name, success in results:
+        status = f"{Colors.GREEN}PASS{Colors.END}" if success else f"{Colors.RED}FAIL{Colors.END}"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    print(f"\nOverall: {passed}/{len(results)} tests passed")
+    sys.exit(0 if passed == len(results) else 1)
+
+if __name__ == "__main__":
+    main()
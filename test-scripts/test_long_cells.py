@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Long Cell Test Script
+Tests that dataset utilities handle cells longer than the csv module's default field limit
+"""
+
+import os
+import sys
+import tempfile
+
+# Run against the backend package directly; no running services needed
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-backend"))
+
+# Longer than csv.field_size_limit()'s default of 131072 characters
+LONG_CELL_CHARS = 200 * 1024
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    BLUE = '\033[94m'
+    BOLD = '\033[1m'
+    END = '\033[0m'
+
+def print_test_header(test_name: str):
+    print(f"\n{Colors.BLUE}{Colors.BOLD}{'='*60}{Colors.END}")
+    print(f"{Colors.BLUE}{Colors.BOLD}Testing: {test_name}{Colors.END}")
+    print(f"{Colors.BLUE}{Colors.BOLD}{'='*60}{Colors.END}")
+
+def print_success(message: str):
+    print(f"{Colors.GREEN}✓ {message}{Colors.END}")
+
+def print_error(message: str):
+    print(f"{Colors.RED}✗ {message}{Colors.END}")
+
+def write_long_cell_csv(directory: str) -> str:
+    """CSV whose second row has an output cell of LONG_CELL_CHARS characters"""
+    path = os.path.join(directory, "long_cells.csv")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write("input,output\n")
+        f.write("short question,short answer\n")
+        f.write(f'long question,"{"x" * LONG_CELL_CHARS}"\n')
+        f.write("last question,last answer\n")
+    return path
+
+def test_validation_reports_long_cells():
+    """A cell over 200 KB is reported under long_cells, not as a malformed row"""
+    print_test_header("Validation of Long Cells")
+    from app.utils.dataset_validation import plan_csv_validation, validate_csv_range
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_long_cell_csv(directory)
+        plan = plan_csv_validation(path, 1)
+        start, end, newlines = plan["ranges"][0]
+        report = validate_csv_range(path, plan, start, end, newlines, ["input", "output"])
+
+    assert report["rows"] == 3, report["rows"]
+    assert report["malformed"]["count"] == 0, report["malformed"]
+    assert report["long_cells"]["count"] == 1, report["long_cells"]
+    assert report["long_cells"]["samples"][0] == {"line": 3, "column": "output", "length": LONG_CELL_CHARS}
+    print_success("Long cell reported under long_cells on line 3")
+
+def test_row_index_reads_long_cells():
+    """A page containing a cell over 200 KB is returned whole by the row index"""
+    print_test_header("Row Index with Long Cells")
+    from app.utils import row_index
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_long_cell_csv(directory)
+        index_dir, row_index.INDEX_DIR = row_index.INDEX_DIR, directory
+        try:
+            page = row_index.read_rows(path, "long_cells.csv", 1, 2)
+        finally:
+            row_index.INDEX_DIR = index_dir
+
+    assert page["total_rows"] == 3, page["total_rows"]
+    assert [row["input"] for row in page["rows"]] == ["long question", "last question"]
+    assert len(page["rows"][0]["output"]) == LONG_CELL_CHARS
+    print_success("Row with a long cell returned whole")
+
+def test_reservoir_sample_reads_long_cells():
+    """Sampling a CSV without a row index streams past a cell over 200 KB"""
+    print_test_header("Reservoir Sample with Long Cells")
+    from app.utils.row_sample import sample_rows
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = write_long_cell_csv(directory)
+        sample = sample_rows(path, "long_cells.csv", 3, 7)
+
+    assert sample["method"] == "reservoir", sample["method"]
+    assert sample["total_rows"] == 3, sample["total_rows"]
+    assert sample["row_numbers"] == [0, 1, 2], sample["row_numbers"]
+    assert len(sample["rows"][1]["output"]) == LONG_CELL_CHARS
+    print_success("Reservoir sample includes the row with a long cell")
+
+def main():
+    """Run all long cell tests"""
+    print(f"{Colors.BOLD}AI Fine-tuning Dashboard - Long Cell Test{Colors.END}")
+
+    results = []
+    for test in (
+        test_validation_reports_long_cells,
+        test_row_index_reads_long_cells,
+        test_reservoir_sample_reads_long_cells,
+    ):
+        try:
+            test()
+            results.append((test.__name__, True))
+        except Exception as e:
+            print_error(f"{test.__name__}: {e!r}")
+            results.append((test.__name__, False))
+
+    print_test_header("Test Results Summary")
+    for test_name, success in results:
+        status = f"{Colors.GREEN}PASS{Colors.END}" if success else f"{Colors.RED}FAIL{Colors.END}"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    print(f"\nOverall: {passed}/{len(results)} tests passed")
+    sys.exit(0 if passed == len(results) else 1)
+
+if __name__ == "__main__":
+    main()
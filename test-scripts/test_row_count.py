@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Row Count Test Script
+Tests that counting byte ranges in parallel reconciles to the same total as one sequential pass
+"""
+
+import asyncio
+import itertools
+import os
+import sys
+import tempfile
+
+# Run against the backend package directly; no running services needed
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-backend"))
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    BLUE = '\033[94m'
+    BOLD = '\033[1m'
+    END = '\033[0m'
+
+def print_test_header(test_name: str):
+    print(f"\n{Colors.BLUE}{Colors.BOLD}{'='*60}{Colors.END}")
+    print(f"{Colors.BLUE}{Colors.BOLD}Testing: {test_name}{Colors.END}")
+    print(f"{Colors.BLUE}{Colors.BOLD}{'='*60}{Colors.END}")
+
+def print_success(message: str):
+    print(f"{Colors.GREEN}✓ {message}{Colors.END}")
+
+def print_error(message: str):
+    print(f"{Colors.RED}✗ {message}{Colors.END}")
+
+# Small files with the layouts that make range boundaries tricky, and their record counts (header included)
+SAMPLES = [
+    (b'input,output\n"multi\nline\nquestion","answer"\nq2,a2\n', 3),
+    (b'input,output\n"a ""quoted""\nvalue",b\n\n\nc,d', 3),
+    (b'input,output\r\n"x\r\ny",z\r\n\r\n"p","q"\r\n', 3),
+    (b'input,output\r\na,b\r\n\r\r\nc,d\r\n', 3),
+    (b'input,output\n"\n\n\n",x\n"",""\n', 3),
+]
+
+def single_pass(path: str) -> int:
+    from app.utils.csv_scan import count_records
+    with open(path, "rb") as f:
+        return count_records(f)
+
+def ranged(path: str, bounds) -> int:
+    from app.utils.csv_scan import count_range, reconcile_range_counts
+    return reconcile_range_counts([count_range(path, start, end, chunk_size=3) for start, end in zip(bounds[:-1], bounds[1:])])
+
+def test_every_split_point():
+    """Two and three ranges split at every byte offset, including inside quoted newlines"""
+    print_test_header("Range Boundaries Inside Quoted Fields")
+    with tempfile.TemporaryDirectory() as directory:
+        for number, (data, records) in enumerate(SAMPLES):
+            path = os.path.join(directory, f"sample_{number}.csv")
+            with open(path, "wb") as f:
+                f.write(data)
+            assert single_pass(path) == records, (data, single_pass(path))
+            for cut in range(1, len(data)):
+                assert ranged(path, [0, cut, len(data)]) == records, (data, cut)
+            for first, second in itertools.combinations(range(1, len(data)), 2):
+                assert ranged(path, [0, first, second, len(data)]) == records, (data, first, second)
+    print_success(f"{len(SAMPLES)} samples reconcile at every split point")
+
+def test_parallel_count_matches_single_pass():
+    """count_file_records across the worker pool agrees with a sequential count on a multi-megabyte file"""
+    print_test_header("Parallel Count vs Single Pass")
+    from app.utils.row_count import count_file_records
+
+    rows = 120000
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "large.csv")
+        with open(path, "wb") as f:
+            f.write(b"input,output\n")
+            for i in range(rows):
+                if i % 7 == 0:
+                    # Long quoted cells with embedded newlines make boundaries likely to land inside quotes
+                    f.write(b'"question %d\n' % i + b"spanning\n" * 8 + b'lines","answer ""%d"""\n' % i)
+                else:
+                    f.write(b"question %d,answer %d\n" % (i, i))
+                if i % 1000 == 0:
+                    f.write(b"\n")
+        size = os.path.getsize(path)
+        assert size > 4 * 1024 * 1024, size
+
+        expected = single_pass(path)
+        assert expected == rows + 1, expected
+        for parts in (2, 3, 4):
+            counted = asyncio.run(count_file_records(path, parts=parts))
+            assert counted == expected, (parts, counted, expected)
+    print_success(f"{rows} rows counted the same in 2, 3 and 4 ranges")
+
+def main():
+    """Run all row count tests"""
+    print(f"{Colors.BOLD}AI Fine-tuning Dashboard - Row Count Test{Colors.END}")
+
+    results = []
+    for test in (test_every_split_point, test_parallel_count_matches_single_pass):
+        try:
+            test()
+            results.append((test.__name__, True))
+        except Exception as e:
+            print_error(f"{test.__name__}: {e!r}")
+            results.append((test.__name__, False))
+
+    print_test_header("Test Results Summary")
+    for test_name, success in results:
+        status = f"{Colors.GREEN}PASS{Colors.END}" if success else f"{Colors.RED}FAIL{Colors.END}"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    print(f"\nOverall: {passed}/{len(results)} tests passed")
+    sys.exit(0 if passed == len(results) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Row Sample Test Script
+Tests that seeded row samples are reproducible, uniform over the file and consistent with their row numbers
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+
+# Run against the backend package directly; no running services needed
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-backend"))
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    BLUE = '\033[94m'
+    BOLD = '\033[1m'
+    END = '\033[0m'
+
+def print_test_header(test_name: str):
+    print(f"\n{Colors.BLUE}{Colors.BOLD}{'='*60}{Colors.END}")
+    print(f"{Colors.BLUE}{Colors.BOLD}Testing: {test_name}{Colors.END}")
+    print(f"{Colors.BLUE}{Colors.BOLD}{'='*60}{Colors.END}")
+
+def print_success(message: str):
+    print(f"{Colors.GREEN}✓ {message}{Colors.END}")
+
+def print_error(message: str):
+    print(f"{Colors.RED}✗ {message}{Colors.END}")
+
+ROWS = 5000
+
+def write_datasets(directory: str):
+    """The same rows as CSV (with a quoted multi-line cell) and as JSONL"""
+    csv_path = os.path.join(directory, "sample.csv")
+    jsonl_path = os.path.join(directory, "sample.jsonl")
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        f.write("input,output\n")
+        for i in range(ROWS):
+            output = f'"answer {i}\nsecond line"' if i % 10 == 0 else f"answer {i}"
+            f.write(f"question {i},{output}\n")
+    with open(jsonl_path, "w", encoding="utf-8") as f:
+        for i in range(ROWS):
+            f.write(json.dumps({"input": f"question {i}", "output": f"answer {i}"}) + "\n")
+    return csv_path, jsonl_path
+
+def check_sample(result, k: int):
+    """Row numbers are distinct, in range and sorted, and each row is the one its number names"""
+    numbers = result["row_numbers"]
+    assert len(numbers) == k and numbers == sorted(set(numbers)), numbers
+    assert all(0 <= n < ROWS for n in numbers) and result["total_rows"] == ROWS, result["total_rows"]
+    assert [row["input"] for row in result["rows"]] == [f"question {n}" for n in numbers]
+
+def test_reservoir_sample():
+    """reservoir_sample draws the same positions for the same seed, and every position over many seeds"""
+    print_test_header("Reservoir Sample Determinism")
+    from app.utils.row_sample import reservoir_sample
+
+    picked, total = reservoir_sample(iter(range(10000)), 50, random.Random(7))
+    again, _ = reservoir_sample(iter(range(10000)), 50, random.Random(7))
+    other, _ = reservoir_sample(iter(range(10000)), 50, random.Random(8))
+    assert total == 10000 and picked == again and picked != other
+    assert all(position == item for position, item in picked) and len({p for p, _ in picked}) == 50
+
+    short, total = reservoir_sample(iter("abc"), 10, random.Random(7))
+    assert short == [(0, "a"), (1, "b"), (2, "c")] and total == 3
+
+    # Every position of a small stream turns up across seeds, each close to k/n of the time
+    hits = [0] * 20
+    for seed in range(4000):
+        for position, _ in reservoir_sample(iter(range(20)), 5, random.Random(seed))[0]:
+            hits[position] += 1
+    assert all(800 <= count <= 1200 for count in hits), hits
+    print_success("Same seed, same sample; draws are spread evenly over the stream")
+
+def test_seeded_stream_sample():
+    """sample_rows without an index returns the same rows for the same seed (CSV and JSONL)"""
+    print_test_header("Seeded Reservoir Sample of a Dataset")
+    from app.utils.row_sample import sample_rows
+
+    with tempfile.TemporaryDirectory() as directory:
+        for path in write_datasets(directory):
+            first = sample_rows(path, os.path.basename(path), 25, seed=42)
+            second = sample_rows(path, os.path.basename(path), 25, seed=42)
+            other = sample_rows(path, os.path.basename(path), 25, seed=43)
+            assert first["method"] == "reservoir", first["method"]
+            assert first == second and first["row_numbers"] != other["row_numbers"]
+            check_sample(first, 25)
+    print_success("CSV and JSONL samples repeat exactly for a seed")
+
+def test_seeded_index_sample():
+    """With a row index, sampling is drawn directly, repeats for a seed and reads the right rows"""
+    print_test_header("Seeded Sample Through a Row Index")
+    from app.utils.row_index import build_row_index, delete_row_index
+    from app.utils.row_sample import sample_rows
+
+    with tempfile.TemporaryDirectory() as directory:
+        for path in write_datasets(directory):
+            build_row_index(path, os.path.basename(path))
+            try:
+                first = sample_rows(path, os.path.basename(path), 25, seed=42)
+                second = sample_rows(path, os.path.basename(path), 25, seed=42)
+                assert first["method"] == "index", first["method"]
+                assert first == second
+                check_sample(first, 25)
+                whole = sample_rows(path, os.path.basename(path), ROWS + 10, seed=1)
+                assert whole["row_numbers"] == list(range(ROWS))
+            finally:
+                delete_row_index(path)
+    print_success("Index samples repeat for a seed and a sample larger than the file returns every row")
+
+def main():
+    """Run all row sample tests"""
+    print(f"{Colors.BOLD}AI Fine-tuning Dashboard - Row Sample Test{Colors.END}")
+
+    results = []
+    for test in (test_reservoir_sample, test_seeded_stream_sample, test_seeded_index_sample):
+        try:
+            test()
+            results.append((test.__name__, True))
+        except Exception as e:
+            print_error(f"{test.__name__}: {e!r}")
+            results.append((test.__name__, False))
+
+    print_test_header("Test Results Summary")
+    for test_name, success in results:
+        status = f"{Colors.GREEN}PASS{Colors.END}" if success else f"{Colors.RED}FAIL{Colors.END}"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    print(f"\nOverall: {passed}/{len(results)} tests passed")
+    sys.exit(0 if passed == len(results) else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Upload Session Test Script
+Tests chunked upload sessions: out-of-order chunks, resuming after a failed chunk, and completion
+"""
+
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+
+# Run against the backend package directly; no running services needed
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python-backend"))
+
+class Colors:
+    GREEN = '\033[92m'
+    RED = '\033[91m'
+    BLUE = '\033[94m'
+    BOLD = '\033[1m'
+    END = '\033[0m'
+
+def print_test_header(test_name: str):
+    print(f"\n{Colors.BLUE}{Colors.BOLD}{'='*60}{Colors.END}")
+    print(f"{Colors.BLUE}{Colors.BOLD}Testing: {test_name}{Colors.END}")
+    print(f"{Colors.BLUE}{Colors.BOLD}{'='*60}{Colors.END}")
+
+def print_success(message: str):
+    print(f"{Colors.GREEN}✓ {message}{Colors.END}")
+
+def print_error(message: str):
+    print(f"{Colors.RED}✗ {message}{Colors.END}")
+
+def dataset_bytes(size: int) -> bytes:
+    """CSV content of exactly size bytes"""
+    rows = "".join(f"question {i},answer {i}\n" for i in range(size // 20 + 1))
+    return ("input,output\n" + rows).encode("utf-8")[:size]
+
+async def body(data: bytes, piece_size: int = 64 * 1024):
+    """Request body stream, as Starlette's request.stream() yields it"""
+    for start in range(0, len(data), piece_size):
+        yield data[start:start + piece_size]
+
+class UploadsDir:
+    """Point the backend's uploads directory at a temp directory for one test"""
+
+    def __enter__(self):
+        from app.utils import file_utils
+        self.temp = tempfile.TemporaryDirectory()
+        self.previous, file_utils.UPLOADS_DIR = file_utils.UPLOADS_DIR, self.temp.name
+        return self.temp.name
+
+    def __exit__(self, *exc):
+        from app.utils import file_utils
+        file_utils.UPLOADS_DIR = self.previous
+        self.temp.cleanup()
+
+def new_session(data: bytes):
+    from services.upload_sessions import MIN_CHUNK_SIZE, UploadSessions
+    session = UploadSessions.create("chunked.csv", len(data), MIN_CHUNK_SIZE)
+    chunks = [data[i:i + MIN_CHUNK_SIZE] for i in range(0, len(data), MIN_CHUNK_SIZE)]
+    return session["id"], chunks
+
+def test_out_of_order_chunks():
+    """Chunks sent last-to-first complete into the original file"""
+    print_test_header("Out-of-Order Chunks")
+    from services.upload_sessions import MIN_CHUNK_SIZE, UploadSessions
+
+    async def run():
+        data = dataset_bytes(MIN_CHUNK_SIZE * 2 + 1000)
+        session_id, chunks = new_session(data)
+        for index in reversed(range(len(chunks))):
+            sha = hashlib.sha256(chunks[index]).hexdigest()
+            result = await UploadSessions.write_chunk(session_id, index, body(chunks[index]), sha)
+            assert result == {"index": index, "size": len(chunks[index]), "sha256": sha}, result
+        session = UploadSessions.get(session_id)
+        assert session["missing_chunks"] == [] and session["contiguous_bytes"] == len(data), session
+        result = await UploadSessions.complete(session_id, hashlib.sha256(data).hexdigest())
+        with open(result["path"], "rb") as f:
+            assert f.read() == data
+        assert result["status"] == "completed" and result["filePath"].startswith("/uploads/datasets/")
+
+    with UploadsDir():
+        asyncio.run(run())
+    print_success("Chunks 2, 1, 0 completed into the original bytes")
+
+def test_resume_after_failed_chunk():
+    """A short or corrupt chunk stays missing until it is sent again"""
+    print_test_header("Resume After a Failed Chunk")
+    from app.core.exceptions import ValidationError
+    from services.upload_sessions import MIN_CHUNK_SIZE, UploadSessions
+
+    async def run():
+        data = dataset_bytes(MIN_CHUNK_SIZE * 3)
+        session_id, chunks = new_session(data)
+        await UploadSessions.write_chunk(session_id, 0, body(chunks[0]))
+        await UploadSessions.write_chunk(session_id, 1, body(chunks[1]))
+        # A dropped connection cuts the re-send of chunk 1 short
+        try:
+            await UploadSessions.write_chunk(session_id, 1, body(chunks[1][:1000]))
+            raise AssertionError("short chunk was accepted")
+        except ValidationError:
+            pass
+        # A chunk whose bytes do not match the client's digest is not recorded
+        try:
+            await UploadSessions.write_chunk(session_id, 2, body(chunks[2]), hashlib.sha256(b"other").hexdigest())
+            raise AssertionError("chunk with the wrong digest was accepted")
+        except ValidationError:
+            pass
+        session = UploadSessions.get(session_id)
+        assert session["received_chunks"] == [0] and session["missing_chunks"] == [1, 2], session
+        try:
+            await UploadSessions.complete(session_id)
+            raise AssertionError("incomplete upload was completed")
+        except ValidationError:
+            pass
+
+        for index in session["missing_chunks"]:
+            await UploadSessions.write_chunk(session_id, index, body(chunks[index]))
+        result = await UploadSessions.complete(session_id)
+        assert result["sha256"] == hashlib.sha256(data).hexdigest()
+
+    with UploadsDir():
+        asyncio.run(run())
+    print_success("Missing chunks re-sent, upload completed with the right SHA-256")
+
+def test_complete_conflicts():
+    """complete() never moves the file under a chunk write, and is idempotent once done"""
+    print_test_header("Completion Conflicts")
+    from app.core.exceptions import UploadSessionConflict
+    from services.upload_sessions import MIN_CHUNK_SIZE, UploadSessions
+
+    async def run():
+        data = dataset_bytes(MIN_CHUNK_SIZE * 2)
+        session_id, chunks = new_session(data)
+        await UploadSessions.write_chunk(session_id, 0, body(chunks[0]))
+
+        release = asyncio.Event()
+
+        async def slow_body():
+            yield chunks[1][:1000]
+            await release.wait()
+            yield chunks[1][1000:]
+
+        writer = asyncio.create_task(UploadSessions.write_chunk(session_id, 1, slow_body()))
+        await asyncio.sleep(0.05)
+        try:
+            await UploadSessions.complete(session_id)
+            raise AssertionError("completed while a chunk was being written")
+        except UploadSessionConflict:
+            pass
+        release.set()
+        await writer
+
+        first, second = await asyncio.gather(UploadSessions.complete(session_id), UploadSessions.complete(session_id), return_exceptions=True)
+        results = [r for r in (first, second) if isinstance(r, dict)]
+        assert results and all(isinstance(r, (dict, UploadSessionConflict)) for r in (first, second)), (first, second)
+        again = await UploadSessions.complete(session_id)
+        assert again == results[0], (again, results[0])
+        try:
+            await UploadSessions.write_chunk(session_id, 0, body(chunks[0]))
+            raise AssertionError("chunk accepted after completion")
+        except UploadSessionConflict:
+            pass
+
+    with UploadsDir():
+        asyncio.run(run())
+    print_success("409 while writing, same result on repeated complete, no chunks after completion")
+
+def main():
+    """Run all upload session tests"""
+    print(f"{Colors.BOLD}AI Fine-tuning Dashboard - Upload Session Test{Colors.END}")
+
+    results = []
+    for test in (test_out_of_order_chunks, test_resume_after_failed_chunk, test_complete_conflicts):
+        try:
+            test()
+            results.append((test.__name__, True))
+        except Exception as e:
+            print_error(f"{test.__name__}: {e!r}")
+            results.append((test.__name__, False))
+
+    print_test_header("Test Results Summary")
+    for test_name, success in results:
+        status = f"{Colors.GREEN}PASS{Colors.END}" if success else f"{Colors.RED}FAIL{Colors.END}"
+        print(f"{test_name}: {status}")
+
+    passed = sum(1 for _, success in results if success)
+    print(f"\nOverall: {passed}/{len(results)} tests passed")
+    sys.exit(0 if passed == len(results) else 1)
+
+if __name__ == "__main__":
+    main()